@@ -0,0 +1,109 @@
+"""
+Time to import an album through the single-file upload endpoint, one request per photo, against one request to
+the bulk upload endpoint.
+
+Runs the application in process on a temporary SQLite database, with local storage behind a simulated
+round-trip of ``--latency`` ms per stored file, the part a remote storage API like Cloudinary adds. The current
+user is injected, so per-request authentication is not part of either timing.
+
+Usage:
+    python -m benchmarks.album_import --photos 100 --size 200 --latency 80 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from main import app
+from src.conf.config import settings
+from src.database.db import get_db
+from src.entity.models import Base, Role, User
+from src.services.auth_service import auth_service
+from src.services.storage_service import LocalStorage
+
+
+class RemoteLikeStorage(LocalStorage):
+    def __init__(self, root: str, latency: float):
+        super().__init__(root, "/api/storage")
+        self.latency = latency
+
+    async def put(self, file, public_id: str, overwrite: bool = False):
+        await asyncio.sleep(self.latency)
+        return await super().put(file, public_id, overwrite)
+
+
+def make_album(count: int, size: int) -> list[bytes]:
+    return [b"\xff\xd8\xff\xe0" + os.urandom(size - 4) for _ in range(count)]
+
+
+async def import_serial(client: httpx.AsyncClient, album: list[bytes]):
+    for i, photo in enumerate(album):
+        response = await client.post("/api/images/upload?description=serial",
+                                     files={"file": (f"{i}.jpg", photo, "image/jpeg")})
+        response.raise_for_status()
+
+
+async def import_bulk(client: httpx.AsyncClient, album: list[bytes]):
+    response = await client.post("/api/images/upload/bulk?description=bulk",
+                                 files=[("files", (f"{i}.jpg", photo, "image/jpeg")) for i, photo in enumerate(album)])
+    response.raise_for_status()
+    assert all(item["status_code"] == 201 for item in response.json())
+
+
+async def run(args, root: str) -> dict:
+    database = os.path.join(root, "album.db")
+    Base.metadata.create_all(create_engine(f"sqlite:///{database}"))
+    sessions = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool),
+                                  expire_on_commit=False)
+    async with sessions() as db:
+        user = User(username="bench", email="bench@example.com", password="secret", confirmed=True, role=Role.user)
+        db.add(user)
+        await db.commit()
+
+    async def get_bench_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = get_bench_db
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    storage = RemoteLikeStorage(os.path.join(root, "storage"), args.latency / 1000)
+    timings = {}
+    with patch("src.routes.photo.storage", storage), patch("src.repository.photo.storage", storage), \
+            patch.object(settings, "upload_bulk_concurrency", args.concurrency):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     timeout=None) as client:
+            for name, importer in (("serial", import_serial), ("bulk", import_bulk)):
+                # fresh content for each path, so neither is served by deduplication
+                album = make_album(args.photos, args.size * 1024)
+                start = time.perf_counter()
+                await importer(client, album)
+                timings[name] = time.perf_counter() - start
+    app.dependency_overrides.clear()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--photos", type=int, default=100)
+    parser.add_argument("--size", type=int, default=200, help="photo size in KB")
+    parser.add_argument("--latency", type=float, default=80, help="simulated storage round-trip in ms")
+    parser.add_argument("--concurrency", type=int, default=8, help="storage writes in flight for the bulk path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        timings = asyncio.run(run(args, root))
+    print(f"{args.photos} photos of {args.size} KB, {args.latency:.0f} ms storage round-trip")
+    for name, elapsed in timings.items():
+        print(f"{name:>7}: {elapsed:6.2f} s, {args.photos / elapsed:7.1f} photos/s")
+    print(f"speedup: {timings['serial'] / timings['bulk']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Per-request latency of the user lookup done by Auth.get_current_user under concurrent load.
+
+"blocking" replays the original code path: JWT decode plus a synchronous redis.Redis GET inside the event loop.
+"async" calls Auth.get_current_user itself with the in-process tier of the user cache disabled, so every call
+goes to Redis through a redis.asyncio client with a shared blocking pool. "two-tier" keeps the in-process tier
+on. Every simulated request also awaits --io-ms of other I/O, which is what the blocking client keeps from
+overlapping.
+
+Against a loopback Redis a round-trip costs microseconds and the blocking client looks fine; --rtt-ms routes
+both clients through a local proxy that delays every packet to model a Redis on another host.
+Needs a Redis server reachable with the application settings.
+
+Usage:
+    python -m benchmarks.auth_cache_latency --requests 5000 --concurrency 200 --rtt-ms 0.5
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import redis
+import redis.asyncio as aioredis
+from jose import jwt
+
+from src.conf.config import settings
+from src.entity.models import User
+from src.services.auth_service import auth_service
+from src.services.user_cache_service import deserialize_user
+from src.utils.ttl_cache import TTLCache
+
+
+def start_delay_proxy(host: str, port: int, delay: float) -> int:
+    """
+    Run a TCP proxy in a background thread that holds every chunk for ``delay`` seconds each way.
+    """
+    ready = threading.Event()
+    bound = {}
+
+    async def pipe(reader, writer):
+        try:
+            while data := await reader.read(65536):
+                await asyncio.sleep(delay)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(host, port)
+        await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer))
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        bound["port"] = server.sockets[0].getsockname()[1]
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
+    return bound["port"]
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def run(mode: str, token: str, requests: int, concurrency: int, io_delay: float, sync_client: redis.Redis):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            if mode == "blocking":
+                payload = jwt.decode(token, auth_service.SECRET_KEY, algorithms=[auth_service.ALGORITHM])
+                deserialize_user(sync_client.get(payload["sub"]))
+            else:
+                await auth_service.get_current_user(token, db=None)
+            await asyncio.sleep(io_delay)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, requests / (time.perf_counter() - start)
+
+
+async def main_async(args):
+    host, port = settings.redis_domain, int(settings.redis_port)
+    if args.rtt_ms:
+        host, port = "127.0.0.1", start_delay_proxy(host, port, args.rtt_ms / 2000)
+
+    sync_client = redis.Redis(host=host, port=port, password=settings.redis_password)
+    user_cache = auth_service.cache
+    user_cache.redis = aioredis.Redis(connection_pool=aioredis.BlockingConnectionPool(
+        host=host, port=port, password=settings.redis_password, max_connections=settings.redis_max_connections,
+    ))
+
+    email = "bench@example.com"
+    await user_cache.set(User(id=1, username="bench", email=email))
+    token = await auth_service.create_access_token(data={"sub": email}, expires_delta=600)
+    two_tier = user_cache.local
+
+    for mode in ("blocking", "async", "two-tier"):
+        user_cache.local = two_tier if mode == "two-tier" else TTLCache(maxsize=0, ttl=0)
+        latencies, rps = await run(mode, token, args.requests, args.concurrency, args.io_ms / 1000, sync_client)
+        print(f"{mode:>8}: p50 {percentile(latencies, 0.5) * 1000:7.2f} ms, "
+              f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms, "
+              f"mean {statistics.fmean(latencies) * 1000:7.2f} ms, {rps:8.1f} req/s "
+              f"(rtt {args.rtt_ms} ms, concurrency {args.concurrency})")
+
+    sync_client.close()
+    await user_cache.redis.aclose()
+    print(user_cache.snapshot_stats())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--io-ms", type=float, default=2.0, help="Other awaited I/O per request")
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="Extra Redis round-trip time added by a proxy")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
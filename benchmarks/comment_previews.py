@@ -0,0 +1,113 @@
+"""
+Cost of a page of the image list when one image on it has a very large number of comments, with every comment
+embedded in each image against the comment count plus the latest few comments.
+
+"embedded" loads the page with all comments of each image through selectinload, as the list endpoints did before
+the previews, and validates it into a list of full images. "previews" is get_photo_all, which fills the latest
+``comment_preview_size`` comments of each image with one window function query, encoded by the compiled
+serializer of ImageAllResponse. The data lives in a temporary SQLite database: ``--images`` images with
+``--comments`` comments each, and one with ``--viral`` comments on the first page.
+
+Usage:
+    python -m benchmarks.comment_previews --images 100 --comments 5 --viral 50000 --limit 20 --rounds 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.pool import NullPool
+
+from src.entity.models import Base, Comment, Image, Role, User
+from src.repository.photo import get_photo_all, paginate
+from src.schemas.comment_schemas import CommentForPhotoSchema
+from src.schemas.photo_schemas import ImageAllResponse
+from src.utils.serializers import compile_serializer
+
+
+class EmbeddedImage(BaseModel):
+    """
+    An image list entry that embeds all of its comments.
+    """
+    id: int
+    user_id: int
+    url: str
+    description: str
+    comments: List[CommentForPhotoSchema]
+
+
+def seed_database(database: str, args):
+    with Session(create_engine(f"sqlite:///{database}")) as session:
+        Base.metadata.create_all(session.get_bind())
+        user = User(username="bench", email="bench@example.com", password="secret", confirmed=True, role=Role.user)
+        session.add(user)
+        session.flush()
+        images = [Image(url=f"https://res.cloudinary.com/demo/image/upload/v1/photo_share/bench{i}",
+                        public_id=f"photo_share/bench{i}", description=f"benchmark photo number {i}",
+                        user_id=user.id, comment_count=args.viral if i == 0 else args.comments)
+                  for i in range(args.images)]
+        session.add_all(images)
+        session.flush()
+        rows = [{"comment": f"comment {j} on photo {image.id}", "user_id": user.id, "image_id": image.id}
+                for image in images for j in range(args.viral if image is images[0] else args.comments)]
+        session.execute(insert(Comment), rows)
+        session.commit()
+
+
+async def embedded(db, limit: int) -> bytes:
+    stmt = paginate(select(Image).options(selectinload(Image.comments)), 0, limit, None)
+    images = (await db.execute(stmt)).scalars().all()
+    return orjson.dumps([EmbeddedImage.model_validate(image, from_attributes=True).model_dump() for image in images])
+
+
+async def previews(db, limit: int, serializer) -> bytes:
+    images = await get_photo_all(0, limit, db)
+    return orjson.dumps([serializer(image) for image in images])
+
+
+async def run(args, root: str) -> dict:
+    database = os.path.join(root, "previews.db")
+    seed_database(database, args)
+    sessions = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool))
+    serializer = compile_serializer(ImageAllResponse)
+    paths = {
+        "embedded": lambda db: embedded(db, args.limit),
+        "previews": lambda db: previews(db, args.limit, serializer),
+    }
+    results = {}
+    for name, page in paths.items():
+        timings = []
+        for _ in range(args.rounds):
+            async with sessions() as db:
+                start = time.perf_counter()
+                body = await page(db)
+                timings.append(time.perf_counter() - start)
+        results[name] = {"ms": 1000 * sum(timings) / len(timings), "bytes": len(body)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--comments", type=int, default=5, help="comments of every other image")
+    parser.add_argument("--viral", type=int, default=50000, help="comments of the first image")
+    parser.add_argument("--limit", type=int, default=20, help="images per page")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        results = asyncio.run(run(args, root))
+    print(f"page of {args.limit} images, one with {args.viral} comments, the others with {args.comments}")
+    for name, result in results.items():
+        print(f"{name:>9}: {result['ms']:8.2f} ms per page, {result['bytes'] / 1024:9.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Bandwidth and latency of the image and tag read endpoints on a replayed traffic trace, with clients that
+revalidate what they hold through If-None-Match against clients that always download the full body.
+
+The trace is generated from ``--seed``: reads of image details with Zipf-distributed popularity, of the first
+pages of the image list and of the tag list, spread over ``--clients`` clients, with a comment written on an
+image every ``1 / --write-ratio`` requests. Both modes replay the same trace on the same data, in process on a
+temporary SQLite database; the current user is injected, so authentication is not part of either timing.
+Needs a Redis server reachable with the application settings, for the image cache and the resource versions.
+
+Usage:
+    python -m benchmarks.conditional_replay --requests 5000 --images 300 --clients 50 --write-ratio 0.02
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from main import app
+from src.database.db import get_db
+from src.entity.models import Base, Comment, Image, Role, Tag, User
+from src.services.auth_service import auth_service
+from src.services.image_cache_service import image_cache
+from src.services.versions_service import TAGS, versions
+
+
+def seed_database(database: str, images: int) -> User:
+    with Session(create_engine(f"sqlite:///{database}")) as session:
+        Base.metadata.create_all(session.get_bind())
+        user = User(username="bench", email="bench@example.com", password="secret", confirmed=True, role=Role.admin)
+        tags = [Tag(tag_name=f"tag{i}") for i in range(20)]
+        session.add_all([user, *tags])
+        session.flush()
+        for i in range(images):
+            image = Image(url=f"https://res.cloudinary.com/demo/image/upload/v1/photo_share/bench{i}",
+                          public_id=f"photo_share/bench{i}", description=f"benchmark photo number {i}",
+                          user_id=user.id, tags=random.sample(tags, 3), comment_count=5)
+            image.comments = [Comment(comment=f"comment {j} on photo {i}", user_id=user.id) for j in range(5)]
+            session.add(image)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+    return user
+
+
+def make_trace(args) -> list[tuple[int, str, str]]:
+    rng = random.Random(args.seed)
+    weights = [1 / rank ** args.zipf for rank in range(1, args.images + 1)]
+    trace = []
+    for _ in range(args.requests):
+        client = rng.randrange(args.clients)
+        if rng.random() < args.write_ratio:
+            image_id = rng.choices(range(1, args.images + 1), weights)[0]
+            trace.append((client, "POST", f"/api/comments/?image_id={image_id}"))
+            continue
+        kind = rng.random()
+        if kind < 0.7:
+            trace.append((client, "GET", f"/api/images/{rng.choices(range(1, args.images + 1), weights)[0]}"))
+        elif kind < 0.9:
+            trace.append((client, "GET", f"/api/images/get_all?limit=20&skip={20 * rng.randrange(3)}"))
+        else:
+            trace.append((client, "GET", "/api/tags/"))
+    return trace
+
+
+async def replay(client: httpx.AsyncClient, trace: list[tuple[int, str, str]], conditional: bool) -> dict:
+    etags: dict[tuple[int, str], str] = {}
+    latencies, body_bytes, not_modified = [], 0, 0
+    for client_id, method, url in trace:
+        if method == "POST":
+            response = await client.post(url, json={"comment": "written during the replay"})
+            response.raise_for_status()
+            continue
+        headers = {}
+        if conditional and (client_id, url) in etags:
+            headers["If-None-Match"] = etags[client_id, url]
+        start = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code == 304:
+            not_modified += 1
+        else:
+            response.raise_for_status()
+            etags[client_id, url] = response.headers["etag"]
+        body_bytes += len(response.content)
+    latencies.sort()
+    return {"reads": len(latencies), "not_modified": not_modified, "bytes": body_bytes,
+            "mean": statistics.fmean(latencies), "p95": latencies[int(len(latencies) * 0.95)]}
+
+
+async def run(args, root: str) -> dict:
+    database = os.path.join(root, "replay.db")
+    user = seed_database(database, args.images)
+    sessions = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool),
+                                  expire_on_commit=False)
+
+    async def get_bench_db():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = get_bench_db
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    # image IDs of the temporary database may have entries and versions left by an earlier run
+    await image_cache.invalidate(*range(1, args.images + 1))
+    await versions.bump(TAGS)
+    trace = make_trace(args)
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        for name, conditional in (("full", False), ("conditional", True)):
+            results[name] = await replay(client, trace, conditional)
+    app.dependency_overrides.clear()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--images", type=int, default=300)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--write-ratio", type=float, default=0.02, help="share of requests that add a comment")
+    parser.add_argument("--zipf", type=float, default=1.1, help="skew of image popularity")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as root:
+        results = asyncio.run(run(args, root))
+    print(f"{args.requests} requests, {args.images} images, {args.clients} clients, "
+          f"{args.write_ratio:.0%} writes")
+    for name, result in results.items():
+        print(f"{name:>11}: {result['bytes'] / 1024:9.1f} KB sent, {result['not_modified']:5} of "
+              f"{result['reads']} reads 304, mean {result['mean'] * 1000:6.2f} ms, p95 {result['p95'] * 1000:6.2f} ms")
+    full, conditional = results["full"], results["conditional"]
+    print(f"bytes saved: {1 - conditional['bytes'] / full['bytes']:.0%}, "
+          f"mean latency: {conditional['mean'] / full['mean']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Throughput of the local image engine against the number of worker processes.
+
+Renders the three derived-image transformations (resize, vignette, black and white) over a corpus of generated
+photos, submitting everything at once as a burst of edit requests would, and reports images per second for each
+pool size. "inline" renders in the calling process, as an async route doing the work itself would.
+
+Usage:
+    python -m benchmarks.image_engine_throughput --images 48 --size 1600x1200 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from src.services.image_engine import ImageEngine, render_image
+
+
+TRANSFORMATIONS = ([{"width": 800, "crop": "pad"}], [{"effect": "vignette"}], [{"effect": "art:audrey"}])
+
+
+def make_corpus(count: int, size: tuple[int, int]) -> list[bytes]:
+    corpus = []
+    for i in range(count):
+        # noise keeps JPEG decoding and encoding as expensive as for a real photo
+        image = Image.merge("RGB", [Image.effect_noise(size, 40 + i % 20) for _ in range(3)])
+        output = BytesIO()
+        image.save(output, format="JPEG", quality=90)
+        corpus.append(output.getvalue())
+    return corpus
+
+
+async def run(engine: ImageEngine, jobs) -> float:
+    await engine.render(jobs[0][0], jobs[0][1])  # start the worker processes
+    start = time.perf_counter()
+    await asyncio.gather(*(engine.render(data, steps) for data, steps in jobs))
+    return len(jobs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=48)
+    parser.add_argument("--size", default="1600x1200", help="WIDTHxHEIGHT of the generated photos")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    width, height = map(int, args.size.split("x"))
+    corpus = make_corpus(args.images, (width, height))
+    jobs = [(data, TRANSFORMATIONS[i % len(TRANSFORMATIONS)]) for i, data in enumerate(corpus)]
+    print(f"{len(jobs)} renders of {args.size} JPEGs on {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    for data, steps in jobs:
+        render_image(data, steps)
+    print(f"  inline: {len(jobs) / (time.perf_counter() - start):7.2f} images/s")
+
+    for workers in args.workers:
+        engine = ImageEngine(max_workers=workers)
+        rate = asyncio.run(run(engine, jobs))
+        engine.shutdown()
+        print(f"{workers:>2} procs: {rate:7.2f} images/s")
+
+
+if __name__ == "__main__":
+    main()
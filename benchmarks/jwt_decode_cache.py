@@ -0,0 +1,47 @@
+"""
+Calls per second of the auth dependency alone, with and without the verified-JWT cache.
+
+The user is served from the in-process tier of the user cache, so the numbers isolate the token checks done by
+Auth.get_current_user: a signature verification on every call against a digest lookup once the token is known.
+
+Usage:
+    python -m benchmarks.jwt_decode_cache --number 20000
+"""
+import argparse
+import asyncio
+import time
+
+from src.entity.models import User
+from src.services.auth_service import auth_service
+from src.services.user_cache_service import CachedUser
+from src.utils.ttl_cache import TTLCache
+
+
+async def run(token: str, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await auth_service.get_current_user(token, db=None)
+    return number / (time.perf_counter() - start)
+
+
+async def main_async(args):
+    email = "bench@example.com"
+    auth_service.cache.local = TTLCache(maxsize=1, ttl=3600)
+    auth_service.cache.local.set(email, CachedUser.from_user(User(id=1, username="bench", email=email)))
+    token = await auth_service.create_access_token(data={"sub": email})
+    cached = auth_service.token_cache
+
+    for name, token_cache in (("uncached", TTLCache(maxsize=0, ttl=0)), ("cached", cached)):
+        auth_service.token_cache = token_cache
+        rate = await run(token, args.number)
+        print(f"{name:>8}: {rate:10.1f} calls/s, {1e6 / rate:7.2f} us/call ({args.number} calls)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Time to turn one page of image list rows into a response body, per encoding path.
+
+"fastapi" is the default path of a route with response_model=List[ImageAllResponse]: validation of every row
+and nested tag and comment into the models, jsonable_encoder, then JSONResponse. "fastapi+orjson" is the same
+with ORJSONResponse, what the app-wide default response class alone changes. "compiled" is the path the list
+routes take: serializers compiled from the response models read the ORM rows directly and orjson encodes the
+result. Rows are built in memory with ``--tags`` tags and ``--comments`` comments each, so only encoding is timed.
+
+Usage:
+    python -m benchmarks.list_encode --limit 100 --tags 5 --comments 10 --rounds 200
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.entity.models import Comment, Image, Tag
+from src.schemas.photo_schemas import ImageAllResponse
+from src.utils.serializers import compile_serializer
+
+
+def make_page(limit: int, tags: int, comments: int) -> list[Image]:
+    tag_rows = [Tag(id=i, tag_name=f"tag{i}") for i in range(tags)]
+    return [Image(id=i, user_id=1, url=f"https://res.cloudinary.com/demo/image/upload/v1/photo_share/{i}",
+                  description=f"benchmark photo number {i}", qr_url=None, tags=list(tag_rows),
+                  renditions={name: f"https://res.cloudinary.com/demo/image/upload/c_limit,w_{width}/photo_share/{i}"
+                              for name, width in (("thumbnail", 320), ("medium", 800), ("large", 1600))},
+                  placeholder="data:image/webp;base64," + "A" * 120,
+                  comment_count=comments,
+                  recent_comments=[Comment(id=i * comments + j, user_id=2, comment=f"comment {j} on photo {i}")
+                                   for j in range(comments)])
+            for i in range(limit)]
+
+
+async def fastapi_path(rows: list[Image], response_class) -> bytes:
+    field = create_response_field(name="response", type_=List[ImageAllResponse])
+    content = await serialize_response(field=field, response_content=rows, is_coroutine=True)
+    return response_class(content).body
+
+
+def compiled_path(rows: list[Image], serializer) -> bytes:
+    return ORJSONResponse([serializer(row) for row in rows]).body
+
+
+def measure(encode, rounds: int) -> tuple[float, int]:
+    body = encode()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode()
+    return (time.perf_counter() - start) / rounds, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100, help="rows per page")
+    parser.add_argument("--tags", type=int, default=5)
+    parser.add_argument("--comments", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_page(args.limit, args.tags, args.comments)
+    serializer = compile_serializer(ImageAllResponse)
+    loop = asyncio.new_event_loop()
+    paths = {
+        "fastapi": lambda: loop.run_until_complete(fastapi_path(rows, JSONResponse)),
+        "fastapi+orjson": lambda: loop.run_until_complete(fastapi_path(rows, ORJSONResponse)),
+        "compiled": lambda: compiled_path(rows, serializer),
+    }
+    timings = {name: measure(encode, args.rounds) for name, encode in paths.items()}
+    loop.close()
+
+    print(f"page of {args.limit} images, {args.tags} tags and {args.comments} comments each")
+    for name, (elapsed, size) in timings.items():
+        print(f"{name:>15}: {elapsed * 1000:7.2f} ms per page, {size / 1024:6.1f} KB, "
+              f"{timings['fastapi'][0] / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
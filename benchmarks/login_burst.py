@@ -0,0 +1,90 @@
+"""
+Latency of a cheap endpoint while the worker handles a burst of logins.
+
+"inline" verifies the bcrypt hash in the request handler, as the login route used to; "pool" awaits
+Auth.verify_password, which runs it on the bounded hashing pool. A probe requests /ping every --probe-ms
+during the burst and reports its latency, which stays flat only when hashing leaves the event loop free.
+
+Usage:
+    python -m benchmarks.login_burst --logins 64 --concurrency 32
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from src.services.auth_service import auth_service
+
+
+def build_app(hashed: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/inline")
+    async def inline_login():
+        return {"ok": auth_service.pwd_context.verify("secret-password", hashed)}
+
+    @app.post("/pool")
+    async def pool_login():
+        return {"ok": await auth_service.verify_password("secret-password", hashed)}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def run(app: FastAPI, path: str, logins: int, concurrency: int, probe_interval: float):
+    semaphore = asyncio.Semaphore(concurrency)
+    probes = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def login():
+            async with semaphore:
+                response = await client.post(path)
+                response.raise_for_status()
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/ping")
+                probes.append(time.perf_counter() - start)
+                await asyncio.sleep(probe_interval)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+    return probes, logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--probe-ms", type=float, default=10.0, help="Interval between /ping requests")
+    args = parser.parse_args()
+
+    hashed = auth_service.pwd_context.hash("secret-password")
+    app = build_app(hashed)
+    for path in ("/inline", "/pool"):
+        probes, rate = asyncio.run(run(app, path, args.logins, args.concurrency, args.probe_ms / 1000))
+        print(f"{path:>7}: {rate:6.1f} logins/s, /ping p50 {percentile(probes, 0.5) * 1000:8.2f} ms, "
+              f"p99 {percentile(probes, 0.99) * 1000:8.2f} ms, max {max(probes) * 1000:8.2f} ms, "
+              f"mean {statistics.fmean(probes) * 1000:8.2f} ms ({len(probes)} probes)")
+    print(f"hashing pool peak queue depth: {auth_service.hasher.snapshot()['peak_queued']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Peak resident memory of concurrent large uploads through the different upload paths.
+
+Sends ``--concurrency`` uploads of ``--size`` MB at once to an in-process app storing into a temporary local
+storage, and samples the RSS of the process while they run (Linux only, from /proc/self/statm).
+
+- buffered: form parsing, then ``await file.read()`` and storing the bytes, as uploader SDKs reading the whole
+  file do;
+- form: form parsing into Starlette's spooled files, then storing the file object;
+- stream: ``receive_upload``, validating, hashing and spooling the file while it streams in.
+
+The client generates the bodies on the fly, so they do not count towards the peak.
+
+Usage:
+    python -m benchmarks.upload_memory --size 20 --concurrency 8 --spool-threshold 1
+"""
+import argparse
+import asyncio
+import gc
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+from fastapi import FastAPI, File, Request, UploadFile
+
+from src.services.storage_service import LocalStorage
+from src.utils.upload_stream import receive_upload
+
+
+CHUNK = 64 * 1024
+BOUNDARY = "benchmark-boundary"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE
+
+
+class PeakSampler(threading.Thread):
+    def __init__(self, interval: float = 0.002):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = rss()
+        self.running = True
+
+    def run(self):
+        while self.running:
+            self.peak = max(self.peak, rss())
+            time.sleep(self.interval)
+
+    def stop(self) -> int:
+        self.running = False
+        self.join()
+        return self.peak
+
+
+def build_app(storage: LocalStorage, max_size: int, spool_threshold: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/buffered")
+    async def buffered(file: UploadFile = File()):
+        await storage.put(await file.read(), f"bench/{os.urandom(8).hex()}")
+
+    @app.post("/form")
+    async def form(file: UploadFile = File()):
+        await storage.put(file.file, f"bench/{os.urandom(8).hex()}")
+
+    @app.post("/stream")
+    async def stream(request: Request):
+        upload = await receive_upload(request, "file", max_size=max_size, spool_threshold=spool_threshold)
+        try:
+            await storage.put(upload.file, f"bench/{os.urandom(8).hex()}")
+        finally:
+            upload.close()
+
+    return app
+
+
+async def body(size: int):
+    yield (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.jpg\"\r\n"
+           f"Content-Type: image/jpeg\r\n\r\n").encode() + b"\xff\xd8\xff\xe0" + b"\x00" * 12
+    filler = os.urandom(CHUNK)
+    for offset in range(16, size, CHUNK):
+        yield filler[:min(CHUNK, size - offset)]
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def run(app: FastAPI, mode: str, size: int, concurrency: int) -> tuple[int, float]:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        gc.collect()
+        baseline = rss()
+        sampler = PeakSampler()
+        sampler.start()
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.post(f"/{mode}", content=body(size), headers=headers)
+                                           for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        peak = sampler.stop()
+    failed = [response.status_code for response in responses if response.status_code != 200]
+    if failed:
+        raise SystemExit(f"{mode}: uploads failed with {failed}")
+    return peak - baseline, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20, help="upload size in MB")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--spool-threshold", type=float, default=1, help="in-memory spool limit in MB")
+    parser.add_argument("--modes", nargs="+", default=["buffered", "form", "stream"],
+                        choices=["buffered", "form", "stream"])
+    args = parser.parse_args()
+
+    size = args.size * 1024 * 1024
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalStorage(root, "/api/storage")
+        app = build_app(storage, max_size=size + CHUNK, spool_threshold=int(args.spool_threshold * 1024 * 1024))
+        print(f"{args.concurrency} concurrent uploads of {args.size} MB")
+        for mode in args.modes:
+            growth, elapsed = asyncio.run(run(app, mode, size, args.concurrency))
+            print(f"{mode:>9}: peak RSS +{growth / 1024 / 1024:7.1f} MB, {elapsed:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
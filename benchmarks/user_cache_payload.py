@@ -0,0 +1,58 @@
+"""
+Payload size and decode time of the user cache entry: pickled ORM User against the versioned snapshot.
+
+The User is loaded through a real Session so the pickle carries ``_sa_instance_state`` as it did in
+Auth.get_current_user.
+
+Usage:
+    python -m benchmarks.user_cache_payload --number 20000
+"""
+import argparse
+import pickle
+import timeit
+from datetime import datetime
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from src.entity.models import Base, Role, User
+from src.services.user_cache_service import CachedUser, deserialize_user, serialize_user
+
+
+def load_user() -> User:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(username="agent007", first_name="andrii", last_name="drovorub", sex="male",
+                         email="agent007@gmail.com", password="$2b$12$" + "x" * 53, confirmed=True, role=Role.user,
+                         refresh_token="r" * 180, avatar="https://www.gravatar.com/avatar/" + "a" * 32,
+                         created_at=datetime(2024, 3, 1), updated_at=datetime(2024, 3, 2)))
+        session.commit()
+        user = session.execute(select(User)).scalar_one()
+        session.expunge(user)
+    return user
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    user = load_user()
+    snapshot = CachedUser.from_user(user)
+    pickled = pickle.dumps(user)
+    compact = serialize_user(snapshot)
+
+    rows = [
+        ("pickle(User)", len(pickled), timeit.timeit(lambda: pickle.dumps(user), number=args.number),
+         timeit.timeit(lambda: pickle.loads(pickled), number=args.number)),
+        ("CachedUser v1", len(compact), timeit.timeit(lambda: serialize_user(snapshot), number=args.number),
+         timeit.timeit(lambda: deserialize_user(compact), number=args.number)),
+    ]
+    for name, size, encode, decode in rows:
+        print(f"{name:>14}: {size:5d} bytes, encode {encode / args.number * 1e6:6.2f} us, "
+              f"decode {decode / args.number * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
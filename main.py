@@ -1,15 +1,24 @@
+import asyncio
+
 import redis.asyncio as redis
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 import uvicorn
 import logging
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_limiter import FastAPILimiter
 
 from src.conf.config import settings
-from src.routes import photo, tags, comments, links, auth, users
+from src.database.cache import redis_pool
+from src.routes import photo, tags, comments, links, auth, users, internal, storage, jobs, uploads
+from src.services.auth_service import auth_service
+from src.services import storage_service
+from src.services.job_queue import job_queue
+from src.services.upload_session_service import upload_sessions
+from src.services.user_cache_service import user_cache
 
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 
 app.add_middleware(
@@ -18,15 +27,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(photo.router, prefix='/api')
+app.include_router(uploads.router, prefix='/api')
 app.include_router(tags.router, prefix='/api')
 app.include_router(comments.router, prefix='/api')
 app.include_router(links.router, prefix='/api')
+app.include_router(internal.router, prefix='/api')
+app.include_router(storage.router, prefix='/api')
+app.include_router(jobs.router, prefix='/api')
 
 
 @app.on_event("startup")
@@ -37,6 +51,23 @@ async def startup():
                           encoding="utf-8",
                           decode_responses=True)
     await FastAPILimiter.init(r)
+    app.state.user_cache_listener = asyncio.create_task(user_cache.listen())
+    app.state.upload_session_cleaner = asyncio.create_task(
+        upload_sessions.run_cleanup(settings.upload_session_cleanup_interval)
+    )
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    for name in ("user_cache_listener", "upload_session_cleaner"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    await job_queue.stop()
+    await redis_pool.disconnect()
+    auth_service.hasher.shutdown()
+    await storage_service.storage.aclose()
 
 
 @app.get("/")
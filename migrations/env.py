@@ -27,6 +27,8 @@ target_metadata = Base.metadata
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
+# Migrations keep running on the synchronous driver from the settings,
+# the application swaps it for an async one in src.database.db.
 config.set_main_option("sqlalchemy.url", settings.sqlalchemy_database_url)
 
 
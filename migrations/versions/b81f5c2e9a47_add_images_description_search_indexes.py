@@ -0,0 +1,36 @@
+"""add images description search indexes
+
+Revision ID: b81f5c2e9a47
+Revises: 4d445dd2acbd
+Create Date: 2026-10-17 11:02:19.604517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f5c2e9a47'
+down_revision: Union[str, None] = '4d445dd2acbd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_images_description_tsv', 'images',
+                    [sa.text("to_tsvector('simple'::regconfig, coalesce(description, ''))")],
+                    unique=False, postgresql_using='gin')
+    op.create_index('ix_images_description_trgm', 'images', [sa.text('lower(description) gin_trgm_ops')],
+                    unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_images_description_trgm', table_name='images')
+    op.drop_index('ix_images_description_tsv', table_name='images')
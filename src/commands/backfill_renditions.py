@@ -0,0 +1,103 @@
+"""
+Fill in the renditions and placeholders of images added before they were computed at upload.
+
+Rendition URLs are built without touching the storage. Placeholders need the original of every uploaded image,
+downloaded ``--concurrency`` at a time; derived images get none, and images that cannot be fetched or decoded are
+tried again on the next run. Rows are processed in batches of ``--batch-size``, each committed on its own, so an
+interrupted run resumes where it stopped.
+
+Usage:
+    python -m src.commands.backfill_renditions --batch-size 200 --concurrency 8
+    python -m src.commands.backfill_renditions --skip-placeholders
+"""
+import argparse
+import asyncio
+import logging
+from io import BytesIO
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database.db import SessionLocal
+from src.entity.models import Image
+from src.services.image_cache_service import image_cache
+from src.services.renditions import make_placeholder, rendition_urls
+from src.services.storage_service import storage
+
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_placeholder(public_id: str, semaphore: asyncio.Semaphore) -> str | None:
+    async with semaphore:
+        try:
+            data = await storage.get(public_id)
+        except HTTPException as err:
+            logger.warning("Could not fetch %s for its placeholder: %s", public_id, err.detail)
+            return None
+    return await make_placeholder(BytesIO(data))
+
+
+async def backfill_batch(images: list[Image], placeholders: bool, semaphore: asyncio.Semaphore, db: AsyncSession):
+    # images sharing an asset, deduplicated uploads, share one download
+    public_ids = {image.public_id for image in images
+                  if placeholders and image.transformation is None and image.placeholder is None}
+    fetched = await asyncio.gather(*(fetch_placeholder(public_id, semaphore) for public_id in public_ids))
+    found = dict(zip(public_ids, fetched))
+    for image in images:
+        image.renditions = rendition_urls(image.public_id, image.transformation)
+        if image.public_id in found and image.transformation is None and image.placeholder is None:
+            image.placeholder = found[image.public_id]
+    image_ids = [image.id for image in images]
+    await db.commit()
+    # cached details and ETags were made from the rows without renditions
+    await image_cache.invalidate(*image_ids)
+
+
+async def backfill(session_factory: async_sessionmaker, batch_size: int = 200, concurrency: int = 8,
+                   placeholders: bool = True) -> int:
+    """
+    Fill in the renditions, and unless disabled the placeholders, of the images missing them.
+
+    Args:
+        session_factory (async_sessionmaker): Factory of database sessions.
+        batch_size (int): Images loaded and committed together.
+        concurrency (int): Most storage downloads in flight.
+        placeholders (bool): Download originals to render their placeholders.
+
+    Returns:
+        int: Number of updated images.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    missing = Image.renditions.is_(None)
+    if placeholders:
+        missing = or_(missing, and_(Image.placeholder.is_(None), Image.transformation.is_(None)))
+    updated, last_id = 0, 0
+    async with session_factory() as db:
+        while True:
+            stmt = (select(Image).filter(Image.id > last_id, Image.public_id.isnot(None), missing)
+                    .order_by(Image.id).limit(batch_size))
+            images = list((await db.execute(stmt)).scalars().all())
+            if not images:
+                return updated
+            last_id = images[-1].id
+            await backfill_batch(images, placeholders, semaphore, db)
+            updated += len(images)
+            logger.info("Backfilled %s images, up to id %s", updated, last_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8, help="storage downloads in flight")
+    parser.add_argument("--skip-placeholders", action="store_true", help="only build the rendition URLs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    updated = asyncio.run(backfill(SessionLocal, args.batch_size, args.concurrency, not args.skip_placeholders))
+    print(f"{updated} images backfilled")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,14 +9,59 @@ class Settings(BaseSettings):
     postgres_password: str
     postgres_port: int
     sqlalchemy_database_url: str
-    cloud_name: str
-    api_key: str
-    api_secret: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800
+    storage_backend: Literal["cloudinary", "local"] = "cloudinary"
+    storage_local_root: str = "./storage"
+    storage_local_url: str = "/api/storage"
+    # signs the transformed URLs of local storage; unset, a key is derived from secret_key_jwt
+    storage_signing_key: str | None = None
+    image_engine_workers: int = 2
+    upload_max_size: int = 25 * 1024 * 1024
+    upload_spool_threshold: int = 1024 * 1024
+    upload_spool_dir: str | None = None
+    upload_dedup_scope: Literal["user", "global"] = "user"
+    upload_bulk_max_files: int = 100
+    upload_bulk_concurrency: int = 8
+    upload_session_dir: str = "./uploads"
+    upload_session_ttl: int = 86400
+    upload_session_cleanup_interval: float = 600
+    cloud_name: str | None = None
+    api_key: str | None = None
+    api_secret: str | None = None
+    cloudinary_api_url: str = "https://api.cloudinary.com/v1_1"
+    cloudinary_max_connections: int = 20
+    cloudinary_timeout: float = 30
+    cloudinary_connect_timeout: float = 5
     secret_key_jwt: str
     algorithm: str
     redis_domain: str
     redis_port: str
     redis_password:  str | None = None
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 5
+    user_cache_ttl: int = 300
+    user_cache_local_size: int = 1024
+    user_cache_local_ttl: float = 5
+    image_cache_ttl: int = 300
+    image_cache_lock_timeout: float = 2
+    # seconds a version token lives without a change, well above image_cache_ttl so unchanged images keep their ETags
+    version_ttl: int = 86400
+    comment_preview_size: int = 3
+    jwt_cache_size: int = 4096
+    password_hash_workers: int = 2
+    job_queue_backend: Literal["memory", "redis"] = "memory"
+    job_max_retries: int = 3
+    job_retry_backoff: float = 1
+    job_ttl: int = 86400
+    job_visibility_timeout: float = 600
+    job_concurrency_upload: int = 4
+    job_concurrency_transform: int = 4
+    job_concurrency_qr: int = 2
+    job_spool_dir: str | None = None
     mail_username: str
     mail_password:  str
     mail_from: str
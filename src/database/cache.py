@@ -0,0 +1,25 @@
+import redis.asyncio as redis
+
+from src.conf.config import settings
+
+
+# One pool per worker shared by every async Redis client of the app.
+# Blocking pool: a burst waits for a free connection instead of failing with "Too many connections".
+redis_pool = redis.BlockingConnectionPool(
+    host=settings.redis_domain,
+    port=settings.redis_port,
+    password=settings.redis_password,
+    db=0,
+    max_connections=settings.redis_max_connections,
+    timeout=settings.redis_pool_timeout,
+)
+
+
+def get_redis() -> redis.Redis:
+    """
+    Get an async Redis client backed by the shared connection pool.
+
+    Returns:
+        redis.Redis: Client returning raw bytes.
+    """
+    return redis.Redis(connection_pool=redis_pool)
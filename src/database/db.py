@@ -1,17 +1,63 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from src.conf.config import settings
+from src.database.pool import InstrumentedAsyncQueuePool
 
 
-SQLALCHEMY_DATABASE_URL = settings.sqlalchemy_database_url
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+def get_async_database_url(database_url: str) -> URL:
+    """
+    Swap the driver of a database URL for its asyncio counterpart.
+
+    The configured URL is shared with Alembic, which keeps using the synchronous driver,
+    so the application engine derives its own URL from it.
+
+    Args:
+        database_url (str): Database URL from the settings.
+
+    Returns:
+        URL: The same URL with an async driver.
+    """
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername)
+
+
+def get_engine_options(url: URL) -> dict:
+    """
+    Build the pool arguments for the application engine from the settings.
+
+    SQLite keeps the pool SQLAlchemy picks for it, the sizing knobs only make sense for a server database.
+
+    Args:
+        url (URL): Async database URL.
+
+    Returns:
+        dict: Keyword arguments for create_async_engine.
+    """
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
+SQLALCHEMY_DATABASE_URL = get_async_database_url(settings.sqlalchemy_database_url)
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL, **get_engine_options(SQLALCHEMY_DATABASE_URL))
+SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
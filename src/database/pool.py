@@ -0,0 +1,90 @@
+import time
+from bisect import bisect_left
+from typing import Tuple
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of durations, bucket bounds are upper limits in seconds.
+    """
+    DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def snapshot(self) -> dict:
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(self.max, 6),
+            "buckets": [{"le": le, "count": count} for le, count in zip(bounds, self.counts)],
+        }
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+        self.wait_time = LatencyHistogram()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long callers wait for a connection.
+
+    The wait covers queueing for a free slot, opening overflow connections and the pre-ping,
+    which is everything a request spends in front of the pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.wait_time.observe(time.perf_counter() - start)
+        self.stats.checkouts += 1
+        self.stats.peak_checked_out = max(self.stats.peak_checked_out, self.checkedout())
+        return connection
+
+
+def get_pool_stats(pool: Pool) -> dict:
+    """
+    Collect the current state of a connection pool.
+
+    Args:
+        pool (Pool): Pool of the application engine.
+
+    Returns:
+        dict: Pool occupancy and, for instrumented pools, checkout counters and the wait time histogram.
+    """
+    data = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        data.update(size=pool.size(), checked_in=pool.checkedin(), checked_out=pool.checkedout(),
+                    overflow=max(pool.overflow(), 0), timeout=pool.timeout())
+    stats = getattr(pool, "stats", None)
+    if isinstance(stats, PoolStats):
+        data.update(checkouts=stats.checkouts, timeouts=stats.timeouts, peak_checked_out=stats.peak_checked_out,
+                    wait_time=stats.wait_time.snapshot())
+    return data
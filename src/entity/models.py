@@ -1,6 +1,9 @@
 import enum
 
-from sqlalchemy import Column, Integer, String, func, DateTime, ForeignKey, Table, Enum, Boolean
+from sqlalchemy import (
+    Column, Integer, String, func, DateTime, ForeignKey, Table, Enum, Boolean, Index, JSON, Text, text
+)
+from sqlalchemy.dialects import postgresql  # noqa: F401, registers the full text search functions used below
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -52,7 +55,52 @@ class Image(Base):
     updated_at = Column("updated_at", DateTime, default=func.now(), onupdate=func.now())
     tags = relationship("Tag", secondary=image_m2m_tag, back_populates="images")
     comments = relationship("Comment", cascade="all,delete", backref="images")
+    # Denormalized number of comments, kept by src/repository/comments.py in the transaction of each change
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # The latest comments shown in image responses, never lazy loaded: see load_recent_comments in the photo repository
+    recent_comments = relationship("Comment", viewonly=True, lazy="raise")
     qr_url = Column(String(255), nullable=True)
+    # Derived images share the asset of their source and only record the transformation steps applied to it
+    transformation = Column(JSON, nullable=True)
+    # SHA-256 of the uploaded bytes, identical uploads reuse the stored asset
+    content_hash = Column(String(64), nullable=True)
+    # Scaled-down rendition URLs by name and a tiny blurred preview as a data URI, see src/services/renditions.py
+    renditions = Column(JSON, nullable=True)
+    placeholder = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_images_created_at_id", "created_at", "id"),
+        Index("ix_images_content_hash_user_id", "content_hash", "user_id"),
+        Index("ix_images_public_id", "public_id"),
+    )
+
+
+# Description search indexes, PostgreSQL only: the repository falls back to LIKE on other databases.
+# Queries must use these exact expressions for the planner to pick the indexes up.
+description_tsvector = func.to_tsvector(text("'simple'::regconfig"), func.coalesce(Image.description, text("''")))
+description_lower = func.lower(Image.description)
+
+Index("ix_images_description_tsv", description_tsvector, postgresql_using="gin").ddl_if(dialect="postgresql")
+Index("ix_images_description_trgm", description_lower.label("description_lower"), postgresql_using="gin",
+      postgresql_ops={"description_lower": "gin_trgm_ops"}).ddl_if(dialect="postgresql")
+
+
+class ImageDerivative(Base):
+    """
+    Derived image made from a source image by one transformation, one row per (source, kind, params).
+    """
+    __tablename__ = "image_derivatives"
+    id = Column(Integer, primary_key=True)
+    source_image_id = Column(ForeignKey("images.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(20), nullable=False)
+    params = Column(String(100), nullable=False)
+    image_id = Column(ForeignKey("images.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index("ix_image_derivatives_source_kind_params", "source_image_id", "kind", "params", unique=True),
+        Index("ix_image_derivatives_image_id", "image_id"),
+    )
 
 
 class Tag(Base):
@@ -70,3 +118,7 @@ class Comment(Base):
     image_id = Column("image_id", ForeignKey("images.id", ondelete="CASCADE"), default=None)
     created_at = Column("created_at", DateTime, default=func.now())
     updated_at = Column("updated_at", DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_comments_image_id_created_at_id", "image_id", "created_at", "id"),
+    )
@@ -1,19 +1,22 @@
 from datetime import datetime
+from typing import Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.entity.models import Comment, User
+from src.entity.models import Comment, Image, User
 from src.schemas.comment_schemas import DeleteComment
+from src.services.image_cache_service import image_cache
 
 
-async def create_comment(image_id: int, comment_data: str, db: Session, user: User):
+async def create_comment(image_id: int, comment_data: str, db: AsyncSession, user: User):
     """
-    Create a new comment associated with an image.
+    Create a new comment associated with an image and count it in the image's comment_count.
 
     Args:
         image_id (int): The ID of the image the comment is associated with.
         comment_data (str): The content of the comment.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         user (User): User who is creating the comment.
 
     Returns:
@@ -22,25 +25,28 @@ async def create_comment(image_id: int, comment_data: str, db: Session, user: Us
     
     comment = Comment(comment=comment_data, image_id=image_id, user_id=user.id)
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.execute(update(Image).where(Image.id == image_id).values(comment_count=Image.comment_count + 1))
+    await db.commit()
+    await image_cache.invalidate(image_id)
+    await db.refresh(comment)
     return comment
 
 
-async def update_comment(comment_id: int, some_comment: str, db: Session, user: User):
+async def update_comment(comment_id: int, some_comment: str, db: AsyncSession, user: User):
     """
     Update an existing comment.
 
     Args:
         comment_id (int): The ID of the comment to be updated.
         some_comment (str): The updated content of the comment.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         user (User): User who is updating the comment.
 
     Returns:
         Comment | None: The updated comment if successful, None otherwise.
     """
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    result = await db.execute(select(Comment).filter(Comment.id == comment_id))
+    comment = result.scalar_one_or_none()
 
     if user.role.name == "user" and comment.user_id != user.id:
         return None
@@ -48,26 +54,28 @@ async def update_comment(comment_id: int, some_comment: str, db: Session, user:
     if comment:
         comment.comment = some_comment
         comment.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(comment)
+        await db.commit()
+        await image_cache.invalidate(comment.image_id)
+        await db.refresh(comment)
         return comment
     else:
         return None
 
 
-async def delete_comment(comment_id: int, db: Session, user: User):
+async def delete_comment(comment_id: int, db: AsyncSession, user: User):
     """
-    Delete a comment.
+    Delete a comment and uncount it from the image's comment_count.
 
     Args:
         comment_id (int): The ID of the comment to be deleted.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         user (User): User who is deleting the comment.
 
     Returns:
         DeleteComment | None: Information about the deleted comment if successful, None otherwise.
     """
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    result = await db.execute(select(Comment).filter(Comment.id == comment_id))
+    comment = result.scalar_one_or_none()
 
     if not comment:
         return None
@@ -76,6 +84,42 @@ async def delete_comment(comment_id: int, db: Session, user: User):
         return None
 
     if user.role.name == "admin" or user.role.name == "moderator":
-        db.delete(comment)
-        db.commit()
+        await db.delete(comment)
+        await db.execute(
+            update(Image).where(Image.id == comment.image_id).values(comment_count=Image.comment_count - 1)
+        )
+        await db.commit()
+        await image_cache.invalidate(comment.image_id)
         return DeleteComment(id=comment.id, image_id=comment.image_id, comment=comment.comment)
+
+
+async def get_comments(image_id: int, skip: int, limit: int, db: AsyncSession,
+                       after: Tuple[datetime, int] | None = None):
+    """
+    Retrieve a page of the comments of an image, newest first.
+
+    Comments are ordered by (created_at, id) descending, read backwards from the (image_id, created_at, id)
+    index. When ``after`` is given the page starts right after that key and ``skip`` is ignored.
+
+    Args:
+        image_id (int): ID of the image.
+        skip (int): Number of comments to skip.
+        limit (int): Maximum number of comments to retrieve.
+        db (AsyncSession): Database session.
+        after (Tuple[datetime, int] | None): Creation time and ID of the last comment of the previous page.
+
+    Returns:
+        Sequence[Comment]: The comments of the page.
+    """
+    stmt = (
+        select(Comment)
+        .filter(Comment.image_id == image_id)
+        .order_by(Comment.created_at.desc(), Comment.id.desc())
+        .limit(limit)
+    )
+    if after is None:
+        stmt = stmt.offset(skip)
+    else:
+        stmt = stmt.filter(tuple_(Comment.created_at, Comment.id) < tuple_(*after))
+    result = await db.execute(stmt)
+    return result.scalars().all()
@@ -1,20 +1,22 @@
 from fastapi import HTTPException, status
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.schemas.link_schemas import ImageTransformModel, ImageLinkQR
 
 from src.entity.models import Image, User
 from src.utils.qrcode import generate_qr_code
-from src.services.cloudinary_service import CloudImage
+from src.services.image_cache_service import image_cache
+from src.services.storage_service import generate_public_id, storage
 
 
-async def create_qr(body: ImageTransformModel, db: Session, user: User):
+async def create_qr(body: ImageTransformModel, db: AsyncSession, user: User):
     """
     Generate a QR code for an image and associate it with the image.
 
     Args:
         body (ImageTransformModel): Data model containing information about the image.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         user (User): Currently authenticated user.
 
     Raises:
@@ -24,7 +26,8 @@ async def create_qr(body: ImageTransformModel, db: Session, user: User):
         ImageLinkQR: Information about the generated QR code and its associated image.
     """
     
-    image = db.query(Image).filter(Image.id == body.id).first()
+    result = await db.execute(select(Image).filter(Image.id == body.id))
+    image = result.scalar_one_or_none()
 
     if image is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
@@ -34,15 +37,16 @@ async def create_qr(body: ImageTransformModel, db: Session, user: User):
 
     qr_code_img = generate_qr_code(image.url)
 
-    new_public_id = CloudImage.generate_name_image(user.email)
+    new_public_id = generate_public_id(user.email)
 
-    upload_file = CloudImage.upload_image(qr_code_img, new_public_id)
+    stored = await storage.put(qr_code_img, new_public_id)
 
-    qr_code_url = CloudImage.get_url_for_image(new_public_id, upload_file)
+    qr_code_url = stored.url
 
     image.qr_url = qr_code_url
 
-    db.commit()
-    db.refresh(image)
+    await db.commit()
+    await image_cache.invalidate(image.id)
+    await db.refresh(image)
 
     return ImageLinkQR(image_id=image.id, qr_code_url=qr_code_url)
@@ -1,89 +1,399 @@
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import Select, delete, func, or_, select, text, tuple_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import status, HTTPException
 
-from src.entity.models import Image, Tag, User
-from src.services.cloudinary_service import CloudImage
-from src.schemas.photo_schemas import ImageChangeResponse, ImageModel
+from src.conf.config import settings
+from src.entity.models import Comment, Image, ImageDerivative, Tag, User, description_lower, description_tsvector
+from src.services.image_cache_service import image_cache
+from src.services.renditions import make_placeholder, rendition_urls
+from src.services.versions_service import image_version, versions
+from src.services.storage_service import StoredImage, generate_public_id, storage, transformation_to_string
+from src.schemas.photo_schemas import BulkUploadItem, ImageChangeResponse, ImageModel
 from src.schemas.tag_schemas import TagModel, AddTagToPhoto
 from src.routes.tags import create_tag
+from src.utils.upload_stream import RejectedUpload, StreamedUpload
 
 
-async def add_image(url: str, public_id: str, description: str, db: Session, user: User) -> Image | None:
+logger = logging.getLogger(__name__)
+
+
+# Relationships rendered by ImageURLResponse and ImageAllResponse: one extra query each, whatever the page size.
+# Comments are not among them, responses only show the latest few: see load_recent_comments.
+IMAGE_RELATIONS = (selectinload(Image.tags),)
+
+
+async def add_image(url: str, public_id: str, description: str, db: AsyncSession, user: User,
+                    content_hash: str | None = None, placeholder: str | None = None) -> Image | None:
     """
-    Add a new image to the database.
+    Add a new image to the database, with the URLs of its renditions.
 
     Args:
         url (str): URL of the image.
         public_id (str): Public ID of the image.
         description (str): Description of the image.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         user (User): Currently authenticated user.
+        content_hash (str | None): SHA-256 of the uploaded bytes.
+        placeholder (str | None): Blurred preview of the image, see ``make_placeholder``.
 
     Returns:
         Image | None: The added image.
     """
     if not user:
         return None
-    image = Image(url=url, public_id=public_id, user_id=user.id, description=description)
+    image = Image(url=url, public_id=public_id, user_id=user.id, description=description, content_hash=content_hash,
+                  renditions=rendition_urls(public_id), placeholder=placeholder)
     db.add(image)
-    db.commit()
-    db.refresh(image)
+    await db.commit()
+    await db.refresh(image)
     return image
 
 
-async def get_photo_by_id(image_id: int, db: Session) -> Image | None:
+async def add_images(images: List[dict], db: AsyncSession, user: User) -> List[Image]:
+    """
+    Add several new images to the database in one transaction, with the URLs of their renditions.
+
+    Args:
+        images (List[dict]): ``url``, ``public_id``, ``description``, ``content_hash`` and ``placeholder`` of
+            every image.
+        db (AsyncSession): Database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        List[Image]: The added images, in the given order.
+    """
+    new_images = [Image(user_id=user.id, renditions=rendition_urls(image["public_id"]), **image) for image in images]
+    db.add_all(new_images)
+    await db.commit()
+    return new_images
+
+
+async def get_photo_by_content_hash(content_hash: str, db: AsyncSession, user: User | None = None) -> Image | None:
+    """
+    Find an uploaded image with the given content.
+
+    Args:
+        content_hash (str): SHA-256 of the image bytes.
+        db (AsyncSession): Database session.
+        user (User | None): Only look among the images of this user, among everyone's if None.
+
+    Returns:
+        Image | None: The oldest matching image that is not derived from another one.
+    """
+    stmt = select(Image).filter(Image.content_hash == content_hash, Image.transformation.is_(None))
+    if user is not None:
+        stmt = stmt.filter(Image.user_id == user.id)
+    result = await db.execute(stmt.order_by(Image.id).limit(1))
+    return result.scalar_one_or_none()
+
+
+async def get_photos_by_content_hashes(content_hashes: set[str], db: AsyncSession,
+                                       user: User | None = None) -> dict[str, Image]:
+    """
+    Find uploaded images for several contents at once, see ``get_photo_by_content_hash``.
+
+    Args:
+        content_hashes (set[str]): SHA-256 digests of the contents.
+        db (AsyncSession): Database session.
+        user (User | None): Only look among the images of this user, among everyone's if None.
+
+    Returns:
+        dict[str, Image]: The oldest matching image by content hash, for the contents that have one.
+    """
+    if not content_hashes:
+        return {}
+    stmt = select(Image).filter(Image.content_hash.in_(content_hashes), Image.transformation.is_(None))
+    if user is not None:
+        stmt = stmt.filter(Image.user_id == user.id)
+    result = await db.execute(stmt.order_by(Image.id))
+    found = {}
+    for image in result.scalars().all():
+        found.setdefault(image.content_hash, image)
+    return found
+
+
+async def bulk_add_images(uploads: List[StreamedUpload | RejectedUpload], description: str | None, db: AsyncSession,
+                          user: User, concurrency: int, dedup_scope: str = "user") -> List[BulkUploadItem]:
+    """
+    Store several uploaded files and add their images in one transaction.
+
+    Files are deduplicated like single uploads: content the user already has returns the existing image,
+    content stored by someone else is shared when ``dedup_scope`` is "global", and a file repeated in the batch
+    is stored once. The rest is written to storage ``concurrency`` files at a time.
+
+    Args:
+        uploads (List[StreamedUpload | RejectedUpload]): Files read from the request, see ``receive_uploads``.
+        description (str | None): Description of every image, the file name if None.
+        db (AsyncSession): Database session.
+        user (User): Currently authenticated user.
+        concurrency (int): Most storage writes in flight.
+        dedup_scope (str): "user" or "global".
+
+    Returns:
+        List[BulkUploadItem]: Outcome of every file, in upload order: 201 for a new image, 200 for an existing
+        one, the error status otherwise.
+
+    Raises:
+        HTTPException: If the images cannot be saved; the files stored by this call are deleted again.
+    """
+    accepted = [upload for upload in uploads if isinstance(upload, StreamedUpload)]
+    hashes = {upload.sha256 for upload in accepted}
+    own = await get_photos_by_content_hashes(hashes, db, user)
+    shared = await get_photos_by_content_hashes(hashes - own.keys(), db) if dedup_scope == "global" else {}
+
+    to_store = {}
+    for upload in accepted:
+        if upload.sha256 not in own and upload.sha256 not in shared:
+            to_store.setdefault(upload.sha256, upload)
+    semaphore = asyncio.Semaphore(concurrency)
+    stored: dict[str, StoredImage | HTTPException] = {}
+    placeholders = {content_hash: image.placeholder for content_hash, image in shared.items()}
+
+    async def put(index: int, upload: StreamedUpload):
+        async with semaphore:
+            try:
+                # the index keeps public IDs generated within the same instant apart
+                stored[upload.sha256] = await storage.put(upload.file, f"{generate_public_id(user.email)}-{index}")
+            except HTTPException as err:
+                stored[upload.sha256] = err
+                return
+            placeholders[upload.sha256] = await make_placeholder(upload.file)
+
+    await asyncio.gather(*(put(index, upload) for index, upload in enumerate(to_store.values())))
+
+    rows, pending = [], {}
+    for upload in accepted:
+        if upload.sha256 in own or upload.sha256 in pending:
+            continue
+        source = shared.get(upload.sha256) or stored[upload.sha256]
+        if isinstance(source, HTTPException):
+            continue
+        pending[upload.sha256] = len(rows)
+        rows.append({"url": source.url, "public_id": source.public_id, "content_hash": upload.sha256,
+                     "description": description or upload.filename, "placeholder": placeholders[upload.sha256]})
+    try:
+        new_images = await add_images(rows, db, user) if rows else []
+    except SQLAlchemyError:
+        await db.rollback()
+        await asyncio.gather(*(storage.delete(item.public_id) for item in stored.values()
+                               if isinstance(item, StoredImage)), return_exceptions=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Images could not be saved")
+
+    items, created = [], set()
+    for upload in uploads:
+        if isinstance(upload, RejectedUpload):
+            items.append(BulkUploadItem(filename=upload.filename, status_code=upload.status_code,
+                                        detail=upload.detail))
+        elif isinstance(stored.get(upload.sha256), HTTPException):
+            error = stored[upload.sha256]
+            items.append(BulkUploadItem(filename=upload.filename, status_code=error.status_code, detail=error.detail))
+        else:
+            image = own.get(upload.sha256) or new_images[pending[upload.sha256]]
+            repeated = upload.sha256 in own or upload.sha256 in created
+            status_code = status.HTTP_200_OK if repeated else status.HTTP_201_CREATED
+            created.add(upload.sha256)
+            items.append(BulkUploadItem(filename=upload.filename, status_code=status_code,
+                                        image=ImageModel.model_validate(image, from_attributes=True)))
+    return items
+
+
+async def get_photo_by_id(image_id: int, db: AsyncSession) -> Image | None:
     """
     Retrieve an image by its ID.
 
     Args:
         image_id (int): ID of the image.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         Image | None: The retrieved image.
     """
 
-    return db.query(Image).filter(Image.id == image_id).first()
+    stmt = select(Image).filter(Image.id == image_id).options(*IMAGE_RELATIONS)
+    result = await db.execute(stmt)
+    image = result.scalar_one_or_none()
+    if image is not None:
+        await load_recent_comments([image], db)
+    return image
+
+
+async def load_recent_comments(images: Sequence[Image], db: AsyncSession, size: int | None = None):
+    """
+    Fill ``recent_comments`` of images with their latest comments, newest first, in one query for all of them.
+
+    Comments are numbered per image by a window function that walks the (image_id, created_at, id) index
+    backwards, and only the first ``size`` of each image are fetched: an image with thousands of comments
+    adds no more rows to a page than one with a few. The full history is paged by the comments repository.
+
+    Args:
+        images (Sequence[Image]): Images to fill.
+        db (AsyncSession): Database session.
+        size (int | None): Comments per image. Defaults to the comment_preview_size setting.
+    """
+    if not images:
+        return
+    size = settings.comment_preview_size if size is None else size
+    position = func.row_number().over(partition_by=Comment.image_id,
+                                      order_by=(Comment.created_at.desc(), Comment.id.desc()))
+    ranked = (
+        select(Comment, position.label("position"))
+        .filter(Comment.image_id.in_([image.id for image in images]))
+        .subquery()
+    )
+    recent = aliased(Comment, ranked)
+    result = await db.execute(
+        select(recent).filter(ranked.c.position <= size).order_by(ranked.c.image_id, ranked.c.position)
+    )
+    by_image = defaultdict(list)
+    for comment in result.scalars().all():
+        by_image[comment.image_id].append(comment)
+    for image in images:
+        set_committed_value(image, "recent_comments", by_image[image.id])
+
+
+def description_search(description: str, dialect_name: str) -> Select:
+    """
+    Build the description search query for a database dialect.
+
+    On PostgreSQL an image matches when its description contains the words of the query, contains the query
+    as a substring or is trigram-similar to it, and results are ranked by text rank plus similarity. Every
+    condition is served by the GIN indexes on images. Other databases get a case-insensitive substring match.
+
+    Args:
+        description (str): Text to search for.
+        dialect_name (str): Name of the database dialect.
+
+    Returns:
+        Select: Query selecting matching images, best matches first.
+    """
+    needle = description.strip().lower()
+    pattern = "%" + needle.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+    substring = description_lower.like(pattern, escape="/")
+
+    if dialect_name != "postgresql":
+        return select(Image).filter(substring).order_by(Image.id)
+
+    query = func.plainto_tsquery(text("'simple'::regconfig"), needle)
+    rank = func.ts_rank(description_tsvector, query) + func.similarity(description_lower, needle)
+    return (
+        select(Image)
+        .filter(or_(description_tsvector.op("@@")(query), substring, description_lower.op("%")(needle)))
+        .order_by(rank.desc(), Image.id)
+    )
 
 
-async def get_photo_by_desc(description: str, db: Session):
+async def get_photo_by_desc(description: str, db: AsyncSession, skip: int = 0, limit: int = 10):
     """
     Retrieve images by their descriptions.
 
     Args:
         description (str): Description to search for.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
+        skip (int): Number of matches to skip.
+        limit (int): Maximum number of matches to retrieve.
 
     Returns:
-        Any: List of images matching the description.
+        Any: List of images matching the description, best matches first.
     """
-    return db.query(Image).filter(Image.description.contains(description.lower())).all()
+    stmt = description_search(description, db.get_bind().dialect.name)
+    stmt = stmt.offset(skip).limit(limit).options(*IMAGE_RELATIONS)
+    result = await db.execute(stmt)
+    images = result.scalars().all()
+    await load_recent_comments(images, db)
+    return images
 
 
-async def get_photo_all(skip: int, limit: int, db: Session):
+def paginate(stmt: Select, skip: int, limit: int, after: Tuple[datetime, int] | None) -> Select:
+    """
+    Restrict an image query to one page, in (created_at, id) order.
+
+    Args:
+        stmt (Select): Query over images.
+        skip (int): Number of images to skip, ignored when ``after`` is given.
+        limit (int): Maximum number of images on the page.
+        after (Tuple[datetime, int] | None): Creation time and ID of the last image of the previous page.
+
+    Returns:
+        Select: The paginated query.
+    """
+    stmt = stmt.order_by(Image.created_at, Image.id).limit(limit)
+    if after is None:
+        return stmt.offset(skip)
+    return stmt.filter(tuple_(Image.created_at, Image.id) > tuple_(*after))
+
+
+async def get_photo_all(skip: int, limit: int, db: AsyncSession, after: Tuple[datetime, int] | None = None):
     """
     Retrieve all images with pagination.
 
+    Images are ordered by (created_at, id). When ``after`` is given the page starts right after that key,
+    which the (created_at, id) index answers without walking the skipped rows, and ``skip`` is ignored.
+
     Args:
         skip (int): Number of images to skip.
         limit (int): Maximum number of images to retrieve.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
+        after (Tuple[datetime, int] | None): Creation time and ID of the last image of the previous page.
 
     Returns:
         Any: List of images retrieved with pagination.
     """
-    return db.query(Image).offset(skip).limit(limit).all()
+    stmt = paginate(select(Image).options(*IMAGE_RELATIONS), skip, limit, after)
+    result = await db.execute(stmt)
+    images = result.scalars().all()
+    await load_recent_comments(images, db)
+    return images
+
+
+async def photo_exists(image_id: int, db: AsyncSession) -> bool:
+    """
+    Check that an image exists, reading its ID only.
+
+    Args:
+        image_id (int): ID of the image.
+        db (AsyncSession): Database session.
+
+    Returns:
+        bool: True if the image exists.
+    """
+    result = await db.execute(select(Image.id).filter(Image.id == image_id))
+    return result.scalar_one_or_none() is not None
 
 
-async def update_photo(image_id: int, description: str, db: Session):
+async def get_photo_ids(skip: int, limit: int, db: AsyncSession, after: Tuple[datetime, int] | None = None):
+    """
+    Retrieve the IDs of the images of a page of ``get_photo_all``, answered from the (created_at, id) index.
+
+    Args:
+        skip (int): Number of images to skip.
+        limit (int): Maximum number of images to retrieve.
+        db (AsyncSession): Database session.
+        after (Tuple[datetime, int] | None): Creation time and ID of the last image of the previous page.
+
+    Returns:
+        Sequence[int]: IDs of the images of the page, in page order.
+    """
+    result = await db.execute(paginate(select(Image.id), skip, limit, after))
+    return result.scalars().all()
+
+
+async def update_photo(image_id: int, description: str, db: AsyncSession):
     """
     Update the description of an image.
 
     Args:
         image_id (int): ID of the image to update.
         description (str): New description for the image.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         Image | None: The updated image.
@@ -91,41 +401,118 @@ async def update_photo(image_id: int, description: str, db: Session):
     image = await get_photo_by_id(image_id, db)
     if image:
         image.description = description
-        db.commit()
+        await db.commit()
+        await image_cache.invalidate(image_id)
     return image
 
 
-async def delete_photo(image_id: int, db: Session):
+async def collect_derived_ids(image_id: int, db: AsyncSession) -> List[int]:
     """
-    Delete an image by its ID.
+    Find the images derived from an image, directly or through other derived images.
+
+    Args:
+        image_id (int): ID of the source image.
+        db (AsyncSession): Database session.
+
+    Returns:
+        List[int]: IDs of the derived images.
+    """
+    derived, frontier = [], [image_id]
+    while frontier:
+        result = await db.execute(
+            select(ImageDerivative.image_id).filter(ImageDerivative.source_image_id.in_(frontier))
+        )
+        frontier = [derived_id for derived_id in result.scalars().all() if derived_id not in derived]
+        derived.extend(frontier)
+    return derived
+
+
+async def delete_photo(image_id: int, db: AsyncSession):
+    """
+    Delete an image by its ID, together with the images derived from it.
+
+    The stored asset is removed with the last image that uses it: derived images share the asset of their source,
+    and uploads of identical content share the asset of the first one. Counting those rows is the reference count,
+    served by the public_id index. The asset goes after the commit, and a failure to delete it is only logged.
 
     Args:
         image_id (int): ID of the image to delete.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         Image | None: The deleted image.
     """
     image = await get_photo_by_id(image_id, db)
     if image:
-        CloudImage.delete_image(image.public_id)
-        db.delete(image)
-        db.commit()
+        removed = [image.id, *await collect_derived_ids(image.id, db)]
+        await db.execute(delete(ImageDerivative).where(
+            or_(ImageDerivative.image_id.in_(removed), ImageDerivative.source_image_id.in_(removed))
+        ))
+        derived = await db.execute(select(Image).filter(Image.id.in_(removed[1:])))
+        for derived_image in derived.scalars().all():
+            await db.delete(derived_image)
+
+        shared = await db.execute(
+            select(func.count()).select_from(Image).filter(Image.public_id == image.public_id,
+                                                           Image.id.not_in(removed))
+        )
+        orphaned = not shared.scalar()
+        await db.delete(image)
+        await db.commit()
+        await image_cache.invalidate(*removed)
+        await versions.forget(*map(image_version, removed))
+        # only once the rows are gone: a failed delete leaves an orphaned asset rather than images without one
+        if orphaned:
+            try:
+                await storage.delete(image.public_id)
+            except (HTTPException, OSError) as err:
+                logger.warning("Could not delete the stored asset %s: %s", image.public_id, err)
     return image
 
 
-async def change_size_photo(image_id: int, width: int, db: Session, user: User):
+async def get_derivative(image_id: int, kind: str, params: str, db: AsyncSession) -> Image | None:
     """
-    Change the size of an image.
+    Look up an image already derived from a source by the same transformation.
 
     Args:
-        image_id (int): ID of the image to resize.
-        width (int): New width for the image.
-        db (Session): Database session.
+        image_id (int): ID of the source image.
+        kind (str): Kind of transformation.
+        params (str): Canonical transformation parameters.
+        db (AsyncSession): Database session.
+
+    Returns:
+        Image | None: The derived image.
+    """
+    stmt = (
+        select(Image)
+        .join(ImageDerivative, ImageDerivative.image_id == Image.id)
+        .filter(ImageDerivative.source_image_id == image_id, ImageDerivative.kind == kind,
+                ImageDerivative.params == params)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def derive_photo(image_id: int, kind: str, transformation: dict, db: AsyncSession, user: User) -> Image:
+    """
+    Add an image derived from an existing one by a transformation, or return the one derived before.
+
+    Nothing is uploaded: the new image keeps the asset of its source and records the transformation,
+    and its URL asks the storage to apply it when the image is fetched. Derivatives are keyed by
+    (source image, kind, parameters), so repeating a request returns the same image.
+
+    Args:
+        image_id (int): ID of the source image.
+        kind (str): Kind of transformation.
+        transformation (dict): Transformation to apply.
+        db (AsyncSession): Database session.
         user (User): Currently authenticated user.
 
     Returns:
-        ImageChangeResponse: Response containing information about the resized image.
+        Image: The derived image.
+
+    Raises:
+        HTTPException: If the source image does not exist or belongs to someone else.
     """
     image = await get_photo_by_id(image_id, db)
 
@@ -135,105 +522,100 @@ async def change_size_photo(image_id: int, width: int, db: Session, user: User):
     if image.user_id != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Can`t update someones picture")
 
-    url, public_id = CloudImage.change_size(image.public_id, width)
-    new_image = Image(url=url, public_id=public_id, user_id=user.id, description=image.description)
-    db.add(new_image)
-    db.commit()
-    db.refresh(new_image)
+    params = transformation_to_string(transformation)
+    existing = await get_derivative(image.id, kind, params, db)
+    if existing is not None:
+        return existing
 
+    steps = [*(image.transformation or []), transformation]
+    # the placeholder of the source would not show the transformation, derived images go without one
+    new_image = Image(url=storage.url(image.public_id, transformation=steps), public_id=image.public_id,
+                      user_id=user.id, description=image.description, transformation=steps,
+                      renditions=rendition_urls(image.public_id, steps))
+    db.add(new_image)
+    try:
+        await db.flush()
+        db.add(ImageDerivative(source_image_id=image.id, kind=kind, params=params, image_id=new_image.id))
+        await db.commit()
+    except IntegrityError:
+        # a concurrent request derived the same image first
+        await db.rollback()
+        return await get_derivative(image_id, kind, params, db)
+    await db.refresh(new_image)
+    return new_image
+
+
+def image_change_response(image: Image, detail: str) -> ImageChangeResponse:
     image_model = ImageModel(
-        id=new_image.id,
-        url=new_image.url,
-        description=new_image.description,
-        public_id=new_image.public_id,
-        user_id=user.id
+        id=image.id,
+        url=image.url,
+        description=image.description,
+        public_id=image.public_id,
+        user_id=image.user_id,
+        transformation=image.transformation,
+        renditions=image.renditions,
+        placeholder=image.placeholder
     )
-
-    return ImageChangeResponse(image=image_model, detail="Image has been resized and added")
+    return ImageChangeResponse(image=image_model, detail=detail)
 
 
-async def fade_edge_photo(image_id, db: Session, user: User):
+async def change_size_photo(image_id: int, width: int, db: AsyncSession, user: User):
     """
-    Apply a fade effect to an image.
+    Change the size of an image.
 
     Args:
-        image_id: ID of the image to apply the fade effect.
-        db (Session): Database session.
+        image_id (int): ID of the image to resize.
+        width (int): New width for the image.
+        db (AsyncSession): Database session.
         user (User): Currently authenticated user.
 
     Returns:
-        ImageChangeResponse: Response containing information about the image with the fade effect.
+        ImageChangeResponse: Response containing information about the resized image.
     """
-    image = await get_photo_by_id(image_id, db)
+    new_image = await derive_photo(image_id, "resize", {"width": width, "crop": "pad"}, db, user)
+    return image_change_response(new_image, "Image has been resized and added")
 
-    if image is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
 
-    if image.user_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Can`t update someones picture")
-
-    url, public_id = CloudImage.fade_edge(image.public_id)
-    new_image = Image(url=url, public_id=public_id, user_id=user.id, description=image.description)
-    db.add(new_image)
-    db.commit()
-    db.refresh(new_image)
+async def fade_edge_photo(image_id, db: AsyncSession, user: User):
+    """
+    Apply a fade effect to an image.
 
-    image_model = ImageModel(
-        id=new_image.id,
-        url=new_image.url,
-        description=new_image.description,
-        public_id=new_image.public_id,
-        user_id=user.id
-    )
+    Args:
+        image_id: ID of the image to apply the fade effect.
+        db (AsyncSession): Database session.
+        user (User): Currently authenticated user.
 
-    return ImageChangeResponse(image=image_model, detail="Image with fade effect has been added")
+    Returns:
+        ImageChangeResponse: Response containing information about the image with the fade effect.
+    """
+    new_image = await derive_photo(image_id, "fade_edge", {"effect": "vignette"}, db, user)
+    return image_change_response(new_image, "Image with fade effect has been added")
 
 
-async def black_white_photo(image_id, db: Session, user: User):
+async def black_white_photo(image_id, db: AsyncSession, user: User):
     """
     Convert an image to black and white.
 
     Args:
         image_id: ID of the image to convert.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         user (User): Currently authenticated user.
 
     Returns:
         ImageChangeResponse: Response containing information about the converted image.
     """
-    image = await get_photo_by_id(image_id, db)
-
-    if image is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
-
-    if image.user_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Can`t update someones picture")
-
-    url, public_id = CloudImage.black_white(image.public_id)
-    new_image = Image(url=url, public_id=public_id, user_id=user.id, description=image.description)
-    db.add(new_image)
-    db.commit()
-    db.refresh(new_image)
-
-    image_model = ImageModel(
-        id=new_image.id,
-        url=new_image.url,
-        description=new_image.description,
-        public_id=new_image.public_id,
-        user_id=user.id
-    )
-
-    return ImageChangeResponse(image=image_model, detail="Image with black_white effect has been added")
+    new_image = await derive_photo(image_id, "black_white", {"effect": "art:audrey"}, db, user)
+    return image_change_response(new_image, "Image with black_white effect has been added")
 
 
-async def add_tag(image_id: int, tag_name: str, db: Session, user: User):
+async def add_tag(image_id: int, tag_name: str, db: AsyncSession, user: User):
     """
     Add a tag to an image.
 
     Args:
         image_id (int): ID of the image to add the tag to.
         tag_name (str): Name of the tag to add.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
         user (User): Currently authenticated user.
 
     Returns:
@@ -251,7 +633,7 @@ async def add_tag(image_id: int, tag_name: str, db: Session, user: User):
         raise HTTPException(
             status_code=status.HTTP_406_NOT_ACCEPTABLE, detail="Only five tags allowed")
 
-    tag = db.execute(select(Tag).filter(Tag.tag_name == tag_name.lower()))
+    tag = await db.execute(select(Tag).filter(Tag.tag_name == tag_name.lower()))
     tag = tag.scalar()
 
     if tag is None:
@@ -260,7 +642,8 @@ async def add_tag(image_id: int, tag_name: str, db: Session, user: User):
 
     image.tags.append(tag)
 
-    db.commit()
-    db.refresh(image)
+    await db.commit()
+    await image_cache.invalidate(image.id)
+    await db.refresh(image)
 
     return AddTagToPhoto(tag=tag.tag_name)
@@ -1,112 +1,136 @@
 from typing import Sequence
 
 from sqlalchemy.future import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.entity.models import Tag
+from src.entity.models import Tag, image_m2m_tag
 from src.schemas.tag_schemas import TagModel
+from src.services.image_cache_service import image_cache
+from src.services.versions_service import TAGS, versions
 
 
-async def tag_create(body: TagModel, db: Session) -> Tag:
+async def tag_create(body: TagModel, db: AsyncSession) -> Tag:
     """
     Create a new tag.
 
     Args:
         body (TagModel): Tag data.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         Tag: Created tag.
     """
     tag = Tag(tag_name=body.tag_name.lower())
     db.add(tag)
-    db.commit()
-    db.refresh(tag)
+    await db.commit()
+    await versions.bump(TAGS)
+    await db.refresh(tag)
     return tag
 
 
-async def get_tag_by_id(tag_id: int, db: Session) -> Tag | None:
+async def get_tag_by_id(tag_id: int, db: AsyncSession) -> Tag | None:
     """
     Retrieve a tag by its ID.
 
     Args:
         tag_id (int): Tag ID.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         Tag | None: Retrieved tag.
     """
-    result = db.execute(select(Tag).filter(Tag.id == tag_id))
+    result = await db.execute(select(Tag).filter(Tag.id == tag_id))
     tag = result.scalar()
     return tag
 
 
-async def get_tag_by_name(tag_name: str, db: Session) -> Tag | None:
+async def get_tag_by_name(tag_name: str, db: AsyncSession) -> Tag | None:
     """
     Retrieve a tag by its name.
 
     Args:
         tag_name (str): Tag name.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         Tag | None: Retrieved tag.
     """
-    result = db.execute(select(Tag).filter(Tag.tag_name == tag_name))
+    result = await db.execute(select(Tag).filter(Tag.tag_name == tag_name))
     tag = result.scalar()
     return tag
 
 
-async def get_tags(db: Session) -> Sequence[Tag]:
+async def get_tags(db: AsyncSession) -> Sequence[Tag]:
     """
     Retrieve all tags.
 
     Args:
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         Sequence[Tag]: Sequence of tags.
     """
-    result = db.execute(select(Tag))
+    result = await db.execute(select(Tag))
     tags = result.scalars().all()
     return tags
 
 
-async def update_tag(tag_id: int, body: TagModel, db: Session) -> Tag | None:
+async def tagged_image_ids(tag_id: int, db: AsyncSession) -> Sequence[int]:
+    """
+    Get the IDs of the images carrying a tag, whose cached details show its name.
+
+    Args:
+        tag_id (int): Tag ID.
+        db (AsyncSession): Database session.
+
+    Returns:
+        Sequence[int]: Image IDs.
+    """
+    result = await db.execute(select(image_m2m_tag.c.image_id).filter(image_m2m_tag.c.tag_id == tag_id))
+    return result.scalars().all()
+
+
+async def update_tag(tag_id: int, body: TagModel, db: AsyncSession) -> Tag | None:
     """
     Update a tag by its ID.
 
     Args:
         tag_id (int): Tag ID.
         body (TagModel): New tag data.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         Tag | None: Updated tag.
     """
-    result = db.execute(select(Tag).filter(Tag.id == tag_id))
+    result = await db.execute(select(Tag).filter(Tag.id == tag_id))
     tag = result.scalar()
     if not tag:
         return None
     tag.tag_name = body.tag_name.lower()
-    db.commit()
+    image_ids = await tagged_image_ids(tag.id, db)
+    await db.commit()
+    await versions.bump(TAGS)
+    await image_cache.invalidate(*image_ids)
     return tag
 
 
-async def remove_tag_by_name(tag_name: str, db: Session) -> Tag | None:
+async def remove_tag_by_name(tag_name: str, db: AsyncSession) -> Tag | None:
     """
     Remove a tag by its name.
 
     Args:
         tag_name (str): Tag name.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         Tag | None: Removed tag.
     """
-    result = db.execute(select(Tag).filter(Tag.tag_name == tag_name))
+    result = await db.execute(select(Tag).filter(Tag.tag_name == tag_name))
     tag = result.scalar()
     if tag:
-        db.delete(tag)
-        db.commit()
+        image_ids = await tagged_image_ids(tag.id, db)
+        await db.delete(tag)
+        await db.commit()
+        await versions.bump(TAGS)
+        await image_cache.invalidate(*image_ids)
     return tag
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, Security, status, BackgroundTasks, Request
 from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordRequestForm, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.services.email_service import send_email
 from src.entity.models import Role
@@ -16,7 +16,7 @@ get_refresh_token = HTTPBearer()
 
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED, name="Create new user")
-async def signup(body: UserSchema, bt: BackgroundTasks, request: Request, db: Session = Depends(get_db)):
+async def signup(body: UserSchema, bt: BackgroundTasks, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Endpoint to sign up a new user.
 
@@ -24,7 +24,7 @@ async def signup(body: UserSchema, bt: BackgroundTasks, request: Request, db: Se
         body (UserSchema): User data.
         bt (BackgroundTasks): Background tasks.
         request (Request): Request object.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
 
     Returns:
         UserResponse: Created user.
@@ -42,7 +42,7 @@ async def signup(body: UserSchema, bt: BackgroundTasks, request: Request, db: Se
 
     if exist_user or exist_username:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Account is already exist")
-    body.password = auth_service.get_password_hash(body.password)
+    body.password = await auth_service.get_password_hash(body.password)
     new_user = await repository_users.create_user(body, db)
     bt.add_task(send_email, new_user.email, new_user.username, str(request.base_url))
 
@@ -50,13 +50,13 @@ async def signup(body: UserSchema, bt: BackgroundTasks, request: Request, db: Se
 
 
 @router.post("/login", response_model=TokenSchema, status_code=status.HTTP_202_ACCEPTED, name="Login")
-async def login(body: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(body: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """
     Endpoint to log in a user.
 
     Args:
         body (OAuth2PasswordRequestForm, optional): Login form data. Defaults to Depends().
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
 
     Returns:
         TokenSchema: Access and refresh tokens.
@@ -67,7 +67,7 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: Session = Depen
     if not user.confirmed:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Email not confirmed")
 
-    if not auth_service.verify_password(body.password, user.password):
+    if not await auth_service.verify_password(body.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password")
     # Generate JWT
     access_token = await auth_service.create_access_token(data={"sub": user.email, "test": "My token"})  # payload
@@ -79,13 +79,13 @@ async def login(body: OAuth2PasswordRequestForm = Depends(), db: Session = Depen
 
 @router.get('/refresh_token', response_model=TokenSchema, status_code=status.HTTP_202_ACCEPTED, name="Update token")
 async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(get_refresh_token),
-                        db: Session = Depends(get_db)):
+                        db: AsyncSession = Depends(get_db)):
     """
     Endpoint to refresh an access token.
 
     Args:
         credentials (HTTPAuthorizationCredentials, optional): Token credentials. Defaults to Security(get_refresh_token).
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
 
     Returns:
         TokenSchema: New access and refresh tokens.
@@ -96,7 +96,7 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(get
     if user.refresh_token != token:
         await repository_users.update_token(user=user, db=db, token=None)
         user.refresh_token = None
-        db.commit()
+        await db.commit()
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
     access_token = await auth_service.create_access_token(data={"sub": email})
@@ -106,13 +106,13 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Security(get
 
 
 @router.get('/confirmed_email/{token}', name="Email confirmation with token")
-async def confirmed_email(token: str, db: Session = Depends(get_db)):
+async def confirmed_email(token: str, db: AsyncSession = Depends(get_db)):
     """
     Endpoint to confirm user email using a token.
 
     Args:
         token (str): Confirmation token.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
 
     Returns:
         dict: Confirmation message.
@@ -129,7 +129,7 @@ async def confirmed_email(token: str, db: Session = Depends(get_db)):
 
 @router.post('/request_email', name="Request email confirmation")
 async def request_email(body: RequestEmail, background_tasks: BackgroundTasks, request: Request,
-                        db: Session = Depends(get_db)):
+                        db: AsyncSession = Depends(get_db)):
     """
     Endpoint to request email confirmation.
 
@@ -137,7 +137,7 @@ async def request_email(body: RequestEmail, background_tasks: BackgroundTasks, r
         body (RequestEmail): Email request data.
         background_tasks (BackgroundTasks): Background tasks.
         request (Request): Request object.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
 
     Returns:
         dict: Confirmation message.
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.entity.models import User
 from src.repository.comments import create_comment, update_comment, delete_comment
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/comments", tags=["comments"])
 
 # Створюємо коментарі
 @router.post("/", response_model=CommentsResponse, status_code=status.HTTP_201_CREATED)
-async def create_comments(comment_data: CommentSchema, image_id: int, db: Session = Depends(get_db),
+async def create_comments(comment_data: CommentSchema, image_id: int, db: AsyncSession = Depends(get_db),
                           current_user: User = Depends(get_current_user)):
     """
     Create a new comment.
@@ -22,7 +22,7 @@ async def create_comments(comment_data: CommentSchema, image_id: int, db: Sessio
     Args:
         comment_data (CommentSchema): Comment data.
         image_id (int): Image ID.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Returns:
@@ -37,7 +37,7 @@ async def create_comments(comment_data: CommentSchema, image_id: int, db: Sessio
 
 # Оновлюємо коментарі
 @router.put("/{comment_id}/update", response_model=CommentsResponse, status_code=status.HTTP_201_CREATED)
-async def update_comments(comment_id: int, comment: CommentSchema, db: Session = Depends(get_db),
+async def update_comments(comment_id: int, comment: CommentSchema, db: AsyncSession = Depends(get_db),
                           current_user: User = Depends(get_current_user)):
     """
     Update a comment.
@@ -45,7 +45,7 @@ async def update_comments(comment_id: int, comment: CommentSchema, db: Session =
     Args:
         comment_id (int): Comment ID.
         comment (CommentSchema): Comment data.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Returns:
@@ -65,14 +65,14 @@ async def update_comments(comment_id: int, comment: CommentSchema, db: Session =
 # Видаляємо коментарі
 @router.delete("/{comment_id}", response_model=DeleteComment, status_code=status.HTTP_201_CREATED,
                dependencies=[Depends(admin_and_moder)])
-async def delete_comments(comment_id: int, db: Session = Depends(get_db),
+async def delete_comments(comment_id: int, db: AsyncSession = Depends(get_db),
                           current_user: User = Depends(get_current_user)):
     """
     Delete a comment.
 
     Args:
         comment_id (int): Comment ID.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Returns:
@@ -0,0 +1,77 @@
+from typing import Dict
+
+from fastapi import APIRouter, Depends
+
+from src.database.db import engine
+from src.database.pool import get_pool_stats
+from src.schemas.internal_schemas import (
+    ExecutorStatsResponse,
+    ImageCacheStatsResponse,
+    PoolStatsResponse,
+    UserCacheStatsResponse
+)
+from src.schemas.job_schemas import JobTypeStatsResponse
+from src.services.auth_service import auth_service
+from src.services.image_cache_service import image_cache
+from src.services.job_queue import job_queue
+from src.services.role_service import only_admin
+from src.services.user_cache_service import user_cache
+
+
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(only_admin)])
+
+
+@router.get("/db/pool", response_model=PoolStatsResponse)
+async def db_pool_stats():
+    """
+    Get the state of the database connection pool of this worker.
+
+    Returns:
+        PoolStatsResponse: Checked-out and overflow connections, checkout counters and the wait time histogram.
+    """
+    return get_pool_stats(engine.pool)
+
+
+@router.get("/cache/users", response_model=UserCacheStatsResponse)
+async def user_cache_stats():
+    """
+    Get the hit and miss counters of the authenticated user cache of this worker.
+
+    Returns:
+        UserCacheStatsResponse: Hits and misses per tier, invalidations and the size of the local tier.
+    """
+    return user_cache.snapshot_stats()
+
+
+@router.get("/cache/images", response_model=ImageCacheStatsResponse)
+async def image_cache_stats():
+    """
+    Get the hit and miss counters of the image detail cache of this worker.
+
+    Returns:
+        ImageCacheStatsResponse: Hits, misses and the hit rate, loads shared by concurrent misses, fills, waits on
+        another worker's fill, Redis errors, invalidations and the loads in flight.
+    """
+    return image_cache.snapshot_stats()
+
+
+@router.get("/auth/hashing", response_model=ExecutorStatsResponse)
+async def password_hashing_stats():
+    """
+    Get the state of the password hashing pool of this worker.
+
+    Returns:
+        ExecutorStatsResponse: Running and queued hashes, the peak queue depth and wait and run time histograms.
+    """
+    return auth_service.hasher.snapshot()
+
+
+@router.get("/jobs", response_model=Dict[str, JobTypeStatsResponse])
+async def job_queue_stats():
+    """
+    Get the queue depth of every background job type and the job counters of this worker.
+
+    Returns:
+        Dict[str, JobTypeStatsResponse]: Queued and running jobs, the concurrency cap and outcome counters by type.
+    """
+    return await job_queue.stats()
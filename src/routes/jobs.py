@@ -0,0 +1,47 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+
+from src.entity.models import Role, User
+from src.schemas.job_schemas import JobResponse
+from src.services.auth_service import get_current_user
+from src.services.job_queue import Job, job_queue
+
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_accepted(job: Job) -> JSONResponse:
+    """
+    Build the response of a request that queued a background job.
+
+    Args:
+        job (Job): The queued job.
+
+    Returns:
+        JSONResponse: 202 with the job, its status URL in the Location header.
+    """
+    content = JobResponse(**asdict(job)).model_dump(mode="json")
+    return JSONResponse(content, status_code=status.HTTP_202_ACCEPTED, headers={"Location": f"/api/jobs/{job.id}"})
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """
+    Get the status of a background job, and its result once it has succeeded.
+
+    Args:
+        job_id (str): ID of the job.
+        current_user (User, optional): Current user. Defaults to Depends(get_current_user).
+
+    Raises:
+        HTTPException: If the job does not exist, has expired or belongs to another user.
+
+    Returns:
+        JobResponse: Status, attempts, and the result or the last error of the job.
+    """
+    job = await job_queue.get(job_id)
+    if job is None or (job.user_id != current_user.id and current_user.role != Role.admin):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return JobResponse(**asdict(job))
@@ -1,18 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.entity.models import User
 from src.repository.image_link import create_qr
+from src.routes.jobs import job_accepted
+from src.schemas.job_schemas import JobResponse
 from src.schemas.link_schemas import ImageTransformModel, ImageLinkQR
 from src.services.auth_service import get_current_user
+from src.services.job_queue import job_queue
+from src.services.photo_jobs import CREATE_QR
 
 
 router = APIRouter(prefix="/qr_code", tags=["qr_code"])
 
 
-@router.post("/image_links/", response_model=ImageLinkQR)
-async def create_image_link(body: ImageTransformModel, db: Session = Depends(get_db),
+@router.post("/image_links/", response_model=ImageLinkQR, responses={202: {"model": JobResponse}})
+async def create_image_link(body: ImageTransformModel, background: bool = False, db: AsyncSession = Depends(get_db),
                             current_user: User = Depends(get_current_user)):
 
     """
@@ -20,15 +24,20 @@ async def create_image_link(body: ImageTransformModel, db: Session = Depends(get
 
     Args:
         body (ImageTransformModel): Image transformation data.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        background (bool, optional): Queue the work and answer 202 with a job to poll. Defaults to False.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
         HTTPException: If the image is not found.
 
     Returns:
-        ImageLinkQR: QR code image link.
+        ImageLinkQR: QR code image link, or the queued job when ``background`` is set.
     """
+    if background:
+        job = await job_queue.enqueue(CREATE_QR, {"image_id": body.id, "user_id": current_user.id}, current_user.id)
+        return job_accepted(job)
+
     image = await create_qr(body, db, current_user)
 
     if image is None:
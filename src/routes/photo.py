@@ -1,66 +1,206 @@
+import asyncio
 from typing import List
 
-from fastapi import APIRouter, Depends, status, UploadFile, File, HTTPException, Query
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.entity.models import User, Role
+from src.entity.models import Image, User, Role
 from src.schemas.photo_schemas import (
     ImageModel,
     ImageURLResponse,
     ImageUpdateResponse,
     ImageDeleteModel,
     ImageAllResponse,
-    ImageChangeResponse
+    ImageChangeResponse,
+    BulkUploadItem
 )
+from src.schemas.comment_schemas import CommentsResponse
+from src.schemas.job_schemas import JobResponse
 from src.schemas.tag_schemas import AddTag
+from src.conf.config import settings
 from src.database.db import get_db
-from src.services.cloudinary_service import CloudImage
+from src.services.storage_service import generate_public_id, storage
+from src.repository import comments as repository_comments
 from src.repository import photo as repository_photo
+from src.routes.jobs import job_accepted
+from src.services.job_queue import job_queue
+from src.services.photo_jobs import TRANSFORM_PHOTO, UPLOAD_PHOTO, spool_upload
+from src.services.renditions import make_placeholder
+from src.services.versions_service import cache_validators, image_version, not_modified, versions
 from src.services.auth_service import get_current_user
+from src.services.image_cache_service import image_cache
 from src.services.role_service import all_roles
+from src.utils.pagination import decode_cursor, encode_cursor
+from src.utils.serializers import compile_serializer
+from src.utils.upload_stream import StreamedUpload, receive_upload, receive_uploads
 
 
 router = APIRouter(prefix="/images", tags=["images"])
 
+# the body is parsed by receive_upload, not by FastAPI, so the form is described by hand
+UPLOAD_REQUEST_BODY = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "required": ["file"], "properties": {"file": {"type": "string", "format": "binary"}},
+}}}}}
+# responses depend on the user's authorization, so only the browser may keep them, and it revalidates every time:
+# an unchanged image answers 304 from its ETag without touching the database
+IMAGE_CACHE_CONTROL = "private, no-cache"
+# list pages are encoded straight from the rows, skipping per-response validation of every nested model
+serialize_image = compile_serializer(ImageAllResponse)
+serialize_comment = compile_serializer(CommentsResponse)
+BULK_UPLOAD_REQUEST_BODY = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "required": ["files"],
+    "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+}}}}}
+
 
 @router.post("/upload", response_model=ImageModel, status_code=status.HTTP_201_CREATED,
-             dependencies=[Depends(all_roles)])
-async def upload_photo(description: str = None, file: UploadFile = File(), db: Session = Depends(get_db),
-                       current_user: User = Depends(get_current_user)):
+             dependencies=[Depends(all_roles)], responses={202: {"model": JobResponse}},
+             openapi_extra=UPLOAD_REQUEST_BODY)
+async def upload_photo(request: Request, response: Response, description: str = None, background: bool = False,
+                       db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     """
     Uploads a photo.
 
+    The ``file`` part of the multipart body is validated while it streams in: anything that is not a JPEG, PNG,
+    GIF or WebP image, or is larger than ``settings.upload_max_size``, is refused before the rest is read.
+
+    Content the user has uploaded before is not stored again, the existing image is returned with 200.
+    With ``settings.upload_dedup_scope`` set to "global", content uploaded by someone else gets a new image
+    sharing the stored asset.
+
     Args:
+        request (Request): The incoming request, its body carries the file.
+        response (Response): Response used to set the status of a reused image.
         description (str, optional): Description of the photo. Defaults to None.
-        file (UploadFile, optional): The file uploaded. Defaults to File(...).
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        background (bool, optional): Queue the upload and answer 202 with a job to poll. Defaults to False.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
-        HTTPException: If the image cannot be uploaded.
+        HTTPException: If the file is too large (413), not a supported image (415) or cannot be uploaded.
 
     Returns:
-        ImageModel: The uploaded image data.
+        ImageModel: The uploaded image data, or the queued job when ``background`` is set.
     """
-    public_id = CloudImage.generate_name_image(current_user.email)
-    upload_file = CloudImage.upload_image(file.file, public_id)
-    src_url = CloudImage.get_url_for_image(public_id, upload_file)
-    image = await repository_photo.add_image(src_url, public_id, description, db, current_user)
+    upload = await receive_upload(request, "file", max_size=settings.upload_max_size,
+                                  spool_threshold=settings.upload_spool_threshold,
+                                  spool_dir=settings.upload_spool_dir)
+    try:
+        duplicate = await reuse_duplicate(upload, description, db, current_user, response)
+        if duplicate is not None:
+            return duplicate
+        if background:
+            path = await asyncio.to_thread(spool_upload, upload.file)
+            public_id = generate_public_id(current_user.email)
+            job = await job_queue.enqueue(UPLOAD_PHOTO, {"path": path, "public_id": public_id,
+                                                         "description": description, "user_id": current_user.id,
+                                                         "content_hash": upload.sha256}, current_user.id)
+            return job_accepted(job)
+        return await store_upload(upload, description, db, current_user)
+    finally:
+        upload.close()
+
+
+async def reuse_duplicate(upload: StreamedUpload, description: str | None, db: AsyncSession, user: User,
+                          response: Response) -> Image | None:
+    """
+    Find the image of content that was uploaded before.
 
-    return image
+    Args:
+        upload (StreamedUpload): The uploaded file.
+        description (str | None): Description of the photo.
+        db (AsyncSession): Database session.
+        user (User): Uploading user.
+        response (Response): Response, set to 200 when the user's own image is returned.
+
+    Returns:
+        Image | None: The user's existing image, or with ``settings.upload_dedup_scope`` "global" a new image
+        sharing the asset of another user's; None for new content.
+    """
+    own = await repository_photo.get_photo_by_content_hash(upload.sha256, db, user)
+    if own is not None:
+        response.status_code = status.HTTP_200_OK
+        return own
+    if settings.upload_dedup_scope == "global":
+        shared = await repository_photo.get_photo_by_content_hash(upload.sha256, db)
+        if shared is not None:
+            return await repository_photo.add_image(shared.url, shared.public_id, description, db, user,
+                                                    content_hash=upload.sha256, placeholder=shared.placeholder)
+    return None
+
+
+async def store_upload(upload: StreamedUpload, description: str | None, db: AsyncSession, user: User) -> Image:
+    """
+    Store an uploaded file and add its image, with its renditions and placeholder.
+
+    Args:
+        upload (StreamedUpload): The uploaded file.
+        description (str | None): Description of the photo.
+        db (AsyncSession): Database session.
+        user (User): Uploading user.
+
+    Returns:
+        Image: The new image.
+    """
+    stored = await storage.put(upload.file, generate_public_id(user.email))
+    placeholder = await make_placeholder(upload.file)
+    return await repository_photo.add_image(stored.url, stored.public_id, description, db, user,
+                                            content_hash=upload.sha256, placeholder=placeholder)
+
+
+@router.post("/upload/bulk", response_model=List[BulkUploadItem], dependencies=[Depends(all_roles)],
+             openapi_extra=BULK_UPLOAD_REQUEST_BODY)
+async def upload_photos(request: Request, description: str = None, db: AsyncSession = Depends(get_db),
+                        current_user: User = Depends(get_current_user)):
+    """
+    Uploads several photos at once, e.g. to import an album.
+
+    Every ``files`` part of the body is validated like a single upload. Valid files are stored concurrently, up
+    to ``settings.upload_bulk_concurrency`` at a time, and their images are added in one transaction. One bad file
+    does not fail the others.
+
+    Args:
+        request (Request): The incoming request, its body carries the files.
+        description (str, optional): Description of every photo. Defaults to the file name.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
+        current_user (User, optional): Current user. Defaults to Depends(get_current_user).
+
+    Raises:
+        HTTPException: If the body is malformed, has too many files, or the images cannot be saved.
+
+    Returns:
+        List[BulkUploadItem]: Status and image of every file, in upload order.
+    """
+    uploads = await receive_uploads(request, "files", max_files=settings.upload_bulk_max_files,
+                                    max_size=settings.upload_max_size,
+                                    spool_threshold=settings.upload_spool_threshold,
+                                    spool_dir=settings.upload_spool_dir)
+    try:
+        return await repository_photo.bulk_add_images(uploads, description, db, current_user,
+                                                      concurrency=settings.upload_bulk_concurrency,
+                                                      dedup_scope=settings.upload_dedup_scope)
+    finally:
+        for upload in uploads:
+            if isinstance(upload, StreamedUpload):
+                upload.close()
 
 
 # Пошук за входженням опису в світлину
 @router.get("/search", response_model=List[ImageAllResponse], dependencies=[Depends(all_roles)])
-async def get_photo_by_description(description: str, db: Session = Depends(get_db),
+async def get_photo_by_description(description: str = Query(min_length=1, max_length=150), skip: int = 0,
+                                   limit: int = Query(default=10, le=100, ge=10),
+                                   db: AsyncSession = Depends(get_db),
                                    current_user: User = Depends(get_current_user)):
     """
-    Get images that match the given description.
+    Get images that match the given description, best matches first.
 
     Args:
         description (str): The description to search for.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        skip (int, optional): Number of matches to skip. Defaults to 0.
+        limit (int, optional): Maximum number of matches to return. Defaults to 10.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
@@ -70,11 +210,11 @@ async def get_photo_by_description(description: str, db: Session = Depends(get_d
         List[ImageAllResponse]: List of images matching the description.
     """
     try:
-        image = await repository_photo.get_photo_by_desc(description, db)
+        image = await repository_photo.get_photo_by_desc(description, db, skip, limit)
         if not image:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
 
-        return image
+        return ORJSONResponse([serialize_image(row) for row in image])
 
     except SQLAlchemyError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -82,30 +222,50 @@ async def get_photo_by_description(description: str, db: Session = Depends(get_d
 
 # Повертаємо усі світлини
 @router.get("/get_all", response_model=List[ImageAllResponse], dependencies=[Depends(all_roles)])
-async def get_all_photo(skip: int = 0, limit: int = Query(default=10, le=100, ge=10),
-                        db: Session = Depends(get_db),
+async def get_all_photo(request: Request, skip: int = 0, cursor: str | None = None,
+                        limit: int = Query(default=10, le=100, ge=10),
+                        db: AsyncSession = Depends(get_db),
                         current_user: User = Depends(get_current_user)):
     """
     Get all images.
 
+    A full page carries the cursor of the next one in the X-Next-Cursor header. The ETag is made of the versions of
+    the images on the page, read with their IDs only: a request whose If-None-Match carries the current one gets
+    an empty 304 without loading the images, their tags and comments.
+
     Args:
+        request (Request): The incoming request, its If-None-Match header is checked.
         skip (int, optional): Number of records to skip. Defaults to 0.
+        cursor (str, optional): Cursor of the page to return, takes precedence over skip. Defaults to None.
         limit (int, optional): Maximum number of records to return. Defaults to 10.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
-        HTTPException: If an internal server error occurs or no images are found.
+        HTTPException: If the cursor is invalid, an internal server error occurs or no images are found.
 
     Returns:
         List[ImageAllResponse]: List of all images.
     """
     try:
-        image = await repository_photo.get_photo_all(skip, limit, db)
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        image_ids = await repository_photo.get_photo_ids(skip, limit, db, after=after)
+        headers = await cache_validators(request, IMAGE_CACHE_CONTROL, *map(image_version, image_ids))
+        unchanged = not_modified(request, headers) if image_ids else None
+        if unchanged is not None:
+            return unchanged
+
+        image = await repository_photo.get_photo_all(skip, limit, db, after=after)
         if not image:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
 
-        return image
+        if len(image) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(image[-1].created_at, image[-1].id)
+        return ORJSONResponse([serialize_image(row) for row in image], headers=headers)
 
     except SQLAlchemyError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -113,14 +273,19 @@ async def get_all_photo(skip: int = 0, limit: int = Query(default=10, le=100, ge
 
 # Пошук світлини за id
 @router.get("/{image_id}", response_model=ImageURLResponse, dependencies=[Depends(all_roles)])
-async def get_photo_url(image_id: int, db: Session = Depends(get_db),
+async def get_photo_url(image_id: int, request: Request, db: AsyncSession = Depends(get_db),
                         current_user: User = Depends(get_current_user)):
     """
     Get image by ID.
 
+    Served from the image cache, see ImageCache; writes to the image, its tags or its comments invalidate it.
+    A request whose If-None-Match carries the current ETag gets an empty 304. The version behind the ETag is only
+    drawn once the image is found, and a response read before that carries none.
+
     Args:
         image_id (int): The ID of the image to retrieve.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        request (Request): The incoming request, its If-None-Match header is checked.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
@@ -129,19 +294,86 @@ async def get_photo_url(image_id: int, db: Session = Depends(get_db),
     Returns:
         ImageURLResponse: Details of the retrieved image.
     """
-    try:
+    async def load() -> bytes | None:
         image = await repository_photo.get_photo_by_id(image_id, db)
-        if not image:
+        if image is None:
+            return None
+        return ImageURLResponse.model_validate(image, from_attributes=True).model_dump_json().encode()
+
+    headers = await cache_validators(request, IMAGE_CACHE_CONTROL, image_version(image_id), mint=False)
+    unchanged = not_modified(request, headers)
+    if unchanged is not None:
+        return unchanged
+
+    try:
+        payload = await image_cache.get(image_id, load)
+        if payload is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+        if "ETag" not in headers:
+            # the payload was read before the version existed, so only the following reads carry its ETag
+            await versions.get(image_version(image_id))
 
-        return image
+        # already serialized as ImageURLResponse, cached or not
+        return Response(content=payload, media_type="application/json", headers=headers)
+
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/{image_id}/comments", response_model=List[CommentsResponse], dependencies=[Depends(all_roles)])
+async def get_photo_comments(image_id: int, request: Request, skip: int = 0, cursor: str | None = None,
+                             limit: int = Query(default=20, le=100, ge=1), db: AsyncSession = Depends(get_db),
+                             current_user: User = Depends(get_current_user)):
+    """
+    Get the comments of an image, newest first.
+
+    Image responses only show the latest comments and their count; this pages through all of them. A full page
+    carries the cursor of the next one in the X-Next-Cursor header. Comment changes move the image to a new
+    version, so the ETag is the image's: a request whose If-None-Match carries the current one gets an empty 304.
+    As for the image detail, the version is only drawn once the image is found.
+
+    Args:
+        image_id (int): The ID of the image.
+        request (Request): The incoming request, its If-None-Match header is checked.
+        skip (int, optional): Number of comments to skip. Defaults to 0.
+        cursor (str, optional): Cursor of the page to return, takes precedence over skip. Defaults to None.
+        limit (int, optional): Maximum number of comments to return. Defaults to 20.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
+        current_user (User, optional): Current user. Defaults to Depends(get_current_user).
+
+    Raises:
+        HTTPException: If the cursor is invalid, an internal server error occurs or the image is not found.
+
+    Returns:
+        List[CommentsResponse]: The comments of the page.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    headers = await cache_validators(request, IMAGE_CACHE_CONTROL, image_version(image_id), mint=False)
+    unchanged = not_modified(request, headers)
+    if unchanged is not None:
+        return unchanged
+
+    try:
+        comments = await repository_comments.get_comments(image_id, skip, limit, db, after=after)
+        if not comments and not await repository_photo.photo_exists(image_id, db):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+        if "ETag" not in headers:
+            await versions.get(image_version(image_id))
+
+        if len(comments) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(comments[-1].created_at, comments[-1].id)
+        return ORJSONResponse([serialize_comment(row) for row in comments], headers=headers)
 
     except SQLAlchemyError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 @router.put("/{image_id}/update", response_model=ImageUpdateResponse, dependencies=[Depends(all_roles)])
-async def update_photo(image_id: int, description: str, db: Session = Depends(get_db),
+async def update_photo(image_id: int, description: str, db: AsyncSession = Depends(get_db),
                        current_user: User = Depends(get_current_user)):
     """
     Update image description.
@@ -149,7 +381,7 @@ async def update_photo(image_id: int, description: str, db: Session = Depends(ge
     Args:
         image_id (int): The ID of the image to update.
         description (str): The new description for the image.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
@@ -171,19 +403,19 @@ async def update_photo(image_id: int, description: str, db: Session = Depends(ge
         return updated_image
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 @router.delete("/{image_id}", response_model=ImageDeleteModel, dependencies=[Depends(all_roles)])
-async def delete_model(image_id, db: Session = Depends(get_db),
+async def delete_model(image_id, db: AsyncSession = Depends(get_db),
                        current_user: User = Depends(get_current_user)):
     """
     Delete image by ID.
 
     Args:
         image_id (int): The ID of the image to delete.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
@@ -205,13 +437,14 @@ async def delete_model(image_id, db: Session = Depends(get_db),
         return deleted_image
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 # Міняємо розмір зображення, погрішує якість при зміні
-@router.post("/change_size", response_model=ImageChangeResponse, status_code=status.HTTP_201_CREATED)
-async def change_size(image_id: int, width: int, db: Session = Depends(get_db),
+@router.post("/change_size", response_model=ImageChangeResponse, status_code=status.HTTP_201_CREATED,
+             responses={202: {"model": JobResponse}})
+async def change_size(image_id: int, width: int, background: bool = False, db: AsyncSession = Depends(get_db),
                       current_user: User = Depends(get_current_user)):
     """
     Change the size of an image.
@@ -219,59 +452,76 @@ async def change_size(image_id: int, width: int, db: Session = Depends(get_db),
     Args:
         image_id (int): The ID of the image to resize.
         width (int): The new width of the image.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        background (bool, optional): Queue the work and answer 202 with a job to poll. Defaults to False.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Returns:
-        ImageChangeResponse: Details of the resized image.
+        ImageChangeResponse: Details of the resized image, or the queued job when ``background`` is set.
     """
+    if background:
+        job = await job_queue.enqueue(TRANSFORM_PHOTO, {"operation": "change_size", "image_id": image_id,
+                                                        "width": width, "user_id": current_user.id}, current_user.id)
+        return job_accepted(job)
     image = await repository_photo.change_size_photo(image_id, width, db, current_user)
 
     return image
 
 
 # Додаємо вицвілі кути на зображення
-@router.post("/fade_edges", response_model=ImageChangeResponse, status_code=status.HTTP_201_CREATED)
-async def fade_edges_image(image_id, db: Session = Depends(get_db),
+@router.post("/fade_edges", response_model=ImageChangeResponse, status_code=status.HTTP_201_CREATED,
+             responses={202: {"model": JobResponse}})
+async def fade_edges_image(image_id, background: bool = False, db: AsyncSession = Depends(get_db),
                            current_user: User = Depends(get_current_user)):
     """
     Add faded edges to an image.
 
     Args:
         image_id: The ID of the image to edit.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        background (bool, optional): Queue the work and answer 202 with a job to poll. Defaults to False.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Returns:
-        ImageChangeResponse: Details of the edited image.
+        ImageChangeResponse: Details of the edited image, or the queued job when ``background`` is set.
     """
+    if background:
+        job = await job_queue.enqueue(TRANSFORM_PHOTO, {"operation": "fade_edge", "image_id": int(image_id),
+                                                        "user_id": current_user.id}, current_user.id)
+        return job_accepted(job)
     image = await repository_photo.fade_edge_photo(image_id, db, current_user)
 
     return image
 
 
 # Робить фото чорно-білим
-@router.post("/black_white", response_model=ImageChangeResponse, status_code=status.HTTP_201_CREATED)
-async def black_white_image(image_id, db: Session = Depends(get_db),
+@router.post("/black_white", response_model=ImageChangeResponse, status_code=status.HTTP_201_CREATED,
+             responses={202: {"model": JobResponse}})
+async def black_white_image(image_id, background: bool = False, db: AsyncSession = Depends(get_db),
                             current_user: User = Depends(get_current_user)):
     """
     Convert an image to black and white.
 
     Args:
         image_id: The ID of the image to convert.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        background (bool, optional): Queue the work and answer 202 with a job to poll. Defaults to False.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Returns:
-        ImageChangeResponse: Details of the converted image.
+        ImageChangeResponse: Details of the converted image, or the queued job when ``background`` is set.
     """
+    if background:
+        job = await job_queue.enqueue(TRANSFORM_PHOTO, {"operation": "black_white", "image_id": int(image_id),
+                                                        "user_id": current_user.id}, current_user.id)
+        return job_accepted(job)
     image = await repository_photo.black_white_photo(image_id, db, current_user)
 
     return image
 
 
 @router.post("/add_tag", response_model=AddTag, dependencies=[Depends(all_roles)])
-async def add_tag(image_id: int, tag: str, db: Session = Depends(get_db),
+async def add_tag(image_id: int, tag: str, db: AsyncSession = Depends(get_db),
                   current_user: User = Depends(get_current_user)):
     """
     Add a tag to an image.
@@ -279,7 +529,7 @@ async def add_tag(image_id: int, tag: str, db: Session = Depends(get_db),
     Args:
         image_id (int): The ID of the image to tag.
         tag (str): The tag to add.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
@@ -297,5 +547,5 @@ async def add_tag(image_id: int, tag: str, db: Session = Depends(get_db),
         return image
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
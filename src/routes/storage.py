@@ -0,0 +1,61 @@
+import asyncio
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from src.services.storage_service import LocalStorage, StorageBackend, get_storage
+from src.utils.file_response import RangeFileResponse
+from src.utils.image_types import sniff_image_type
+
+
+router = APIRouter(prefix="/storage", tags=["storage"])
+
+
+def file_response(path: Path, range_header: str | None) -> RangeFileResponse:
+    """
+    Build the response of a stored file, typed by its leading bytes. Blocking, run it in a thread.
+
+    Args:
+        path (Path): Stored file.
+        range_header (str | None): Range header of the request.
+
+    Returns:
+        RangeFileResponse: The file content, or the requested part of it.
+    """
+    with open(path, "rb") as file:
+        media_type = sniff_image_type(file.read(16)) or "application/octet-stream"
+    return RangeFileResponse(path, range_header=range_header, media_type=media_type)
+
+
+@router.get("/{public_id:path}", response_class=RangeFileResponse)
+async def get_stored_image(public_id: str, request: Request, storage: StorageBackend = Depends(get_storage)):
+    """
+    Serve an image kept by the local storage backend, with support for byte ranges.
+
+    A ``t`` query parameter asks for a transformed image, rendered on first request and served from disk after.
+    It must come with the ``s`` signature of the URLs the application builds, see ``LocalStorage.sign``.
+
+    Args:
+        public_id (str): Public ID of the image.
+        request (Request): The incoming request.
+        storage (StorageBackend): Storage backend of the application.
+
+    Raises:
+        HTTPException: If the local backend is not in use, the image does not exist or the transformation is not
+            signed.
+
+    Returns:
+        RangeFileResponse: The image content, or the requested part of it.
+    """
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    transformation = request.query_params.get("t")
+    if transformation:
+        path = await storage.render(public_id, transformation, request.query_params.get("s"))
+    else:
+        path = storage.path(public_id)
+    try:
+        # opening, sniffing and the stat of the response all touch the disk, kept off the event loop
+        return await asyncio.to_thread(file_response, path, request.headers.get("range"))
+    except (FileNotFoundError, IsADirectoryError):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
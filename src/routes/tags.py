@@ -1,7 +1,8 @@
-from typing import List, Sequence
+from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.entity.models import Tag, User
@@ -9,20 +10,26 @@ from src.repository import tags as repo_tags
 from src.schemas.tag_schemas import TagModel, TagResponse
 from src.services.auth_service import get_current_user
 from src.services.role_service import admin_and_moder
+from src.services.versions_service import TAGS, cache_validators, not_modified
+from src.utils.serializers import compile_serializer
 
 
 router = APIRouter(prefix="/tags", tags=["tags"])
 
+# tags change rarely: a browser reuses a response for a minute, then revalidates it with its ETag
+TAGS_CACHE_CONTROL = "private, max-age=60"
+serialize_tag = compile_serializer(TagResponse)
+
 
 @router.post("/", response_model=TagResponse)
-async def create_tag(body: TagModel, db: Session = Depends(get_db),
+async def create_tag(body: TagModel, db: AsyncSession = Depends(get_db),
                      current_user: User = Depends(get_current_user)) -> Tag | None:
     """
     Create a new tag.
 
     Args:
         body (TagModel): Tag data to create.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
@@ -41,14 +48,16 @@ async def create_tag(body: TagModel, db: Session = Depends(get_db),
 
 
 @router.get("/by_id/{tag_id}", response_model=TagResponse)
-async def get_tag_by_id(tag_id: int, db: Session = Depends(get_db),
-                        current_user: User = Depends(get_current_user)) -> Tag | None:
+async def get_tag_by_id(tag_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db),
+                        current_user: User = Depends(get_current_user)) -> Tag | Response | None:
     """
-    Get a tag by its ID.
+    Get a tag by its ID, or an empty 304 if If-None-Match carries the current ETag.
 
     Args:
         tag_id (int): The ID of the tag to retrieve.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        request (Request): The incoming request, its If-None-Match header is checked.
+        response (Response): Response used to set the caching headers.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
@@ -57,21 +66,28 @@ async def get_tag_by_id(tag_id: int, db: Session = Depends(get_db),
     Returns:
         Tag: Details of the retrieved tag.
     """
+    headers = await cache_validators(request, TAGS_CACHE_CONTROL, TAGS)
+    unchanged = not_modified(request, headers)
+    if unchanged is not None:
+        return unchanged
     tag = await repo_tags.get_tag_by_id(tag_id, db)
     if tag is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid tag")
+    response.headers.update(headers)
     return tag
 
 
 @router.get("/by_name/{tag_name}", response_model=TagResponse)
-async def get_tag_by_name(tag_name: str, db: Session = Depends(get_db),
-                          current_user: User = Depends(get_current_user)) -> Tag | None:
+async def get_tag_by_name(tag_name: str, request: Request, response: Response, db: AsyncSession = Depends(get_db),
+                          current_user: User = Depends(get_current_user)) -> Tag | Response | None:
     """
-    Get a tag by its name.
+    Get a tag by its name, or an empty 304 if If-None-Match carries the current ETag.
 
     Args:
         tag_name (str): The name of the tag to retrieve.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        request (Request): The incoming request, its If-None-Match header is checked.
+        response (Response): Response used to set the caching headers.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
@@ -80,31 +96,41 @@ async def get_tag_by_name(tag_name: str, db: Session = Depends(get_db),
     Returns:
         Tag: Details of the retrieved tag.
     """
+    headers = await cache_validators(request, TAGS_CACHE_CONTROL, TAGS)
+    unchanged = not_modified(request, headers)
+    if unchanged is not None:
+        return unchanged
     tag = await repo_tags.get_tag_by_name(tag_name, db)
     if tag is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid tag")
+    response.headers.update(headers)
     return tag
 
 
 @router.get("/", response_model=List[TagResponse])
-async def get_all_tags(db: Session = Depends(get_db),
-                       current_user: User = Depends(get_current_user)) -> Sequence[Tag] | None:
+async def get_all_tags(request: Request, db: AsyncSession = Depends(get_db),
+                       current_user: User = Depends(get_current_user)) -> Response:
     """
-    Get all tags.
+    Get all tags, or an empty 304 if If-None-Match carries the current ETag.
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        request (Request): The incoming request, its If-None-Match header is checked.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Returns:
-        Sequence[Tag]: Sequence of all tags.
+        Response: All tags, as a list of TagResponse.
     """
+    headers = await cache_validators(request, TAGS_CACHE_CONTROL, TAGS)
+    unchanged = not_modified(request, headers)
+    if unchanged is not None:
+        return unchanged
     tags = await repo_tags.get_tags(db)
-    return tags
+    return ORJSONResponse([serialize_tag(tag) for tag in tags], headers=headers)
 
 
 @router.patch("/{tag_id}", response_model=TagResponse)
-async def update_tag(tag_id: int, body: TagModel, db: Session = Depends(get_db),
+async def update_tag(tag_id: int, body: TagModel, db: AsyncSession = Depends(get_db),
                      current_user: User = Depends(get_current_user)) -> Tag | None:
     """
     Update a tag.
@@ -112,7 +138,7 @@ async def update_tag(tag_id: int, body: TagModel, db: Session = Depends(get_db),
     Args:
         tag_id (int): The ID of the tag to update.
         body (TagModel): New tag data.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
@@ -128,14 +154,14 @@ async def update_tag(tag_id: int, body: TagModel, db: Session = Depends(get_db),
 
 
 @router.delete("/", response_model=TagResponse, dependencies=[Depends(admin_and_moder)])
-async def delete_tag(identifier: str, db: Session = Depends(get_db),
+async def delete_tag(identifier: str, db: AsyncSession = Depends(get_db),
                      current_user: User = Depends(get_current_user)) -> Tag | None:
     """
     Delete a tag by its name.
 
     Args:
         identifier (str): The name of the tag to delete.
-        db (Session, optional): Database session. Defaults to Depends(get_db).
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
         current_user (User, optional): Current user. Defaults to Depends(get_current_user).
 
     Raises:
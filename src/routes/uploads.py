@@ -0,0 +1,140 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import get_db
+from src.entity.models import User
+from src.routes.photo import reuse_duplicate, store_upload
+from src.schemas.photo_schemas import ImageModel, UploadSessionCreate, UploadSessionResponse
+from src.services.auth_service import get_current_user
+from src.services.role_service import all_roles
+from src.services.upload_session_service import UploadSession, upload_sessions
+
+
+router = APIRouter(prefix="/images/uploads", tags=["uploads"], dependencies=[Depends(all_roles)])
+
+CHUNK_REQUEST_BODY = {"requestBody": {"required": True, "content": {"application/octet-stream": {"schema": {
+    "type": "string", "format": "binary",
+}}}}}
+
+
+def session_response(session: UploadSession, response: Response) -> UploadSessionResponse:
+    response.headers["Upload-Offset"] = str(session.offset)
+    return UploadSessionResponse(id=session.id, size=session.size, offset=session.offset,
+                                 expires_at=datetime.fromtimestamp(upload_sessions.expires_at(session)))
+
+
+@router.post("", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload(body: UploadSessionCreate, response: Response, current_user: User = Depends(get_current_user)):
+    """
+    Start a resumable upload of a photo.
+
+    Send the file with ``PUT /images/uploads/{upload_id}?offset=...`` in as many chunks as needed, then finalize
+    it. After an interruption, ``GET /images/uploads/{upload_id}`` tells where to carry on.
+
+    Args:
+        body (UploadSessionCreate): Size of the file and description of the photo.
+        response (Response): Response used to set the Location header.
+        current_user (User, optional): Current user. Defaults to Depends(get_current_user).
+
+    Raises:
+        HTTPException: If the file is larger than the upload limit.
+
+    Returns:
+        UploadSessionResponse: The upload, at offset 0.
+    """
+    session = await upload_sessions.create(current_user.id, body.size, body.description)
+    response.headers["Location"] = f"/api/images/uploads/{session.id}"
+    return session_response(session, response)
+
+
+@router.get("/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(upload_id: str, response: Response, current_user: User = Depends(get_current_user)):
+    """
+    Get how much of a resumable upload has been received.
+
+    Args:
+        upload_id (str): ID of the upload.
+        response (Response): Response used to set the Upload-Offset header.
+        current_user (User, optional): Current user. Defaults to Depends(get_current_user).
+
+    Raises:
+        HTTPException: If the upload does not exist, has expired or belongs to another user.
+
+    Returns:
+        UploadSessionResponse: The upload and its offset.
+    """
+    session = await upload_sessions.get(upload_id, current_user.id)
+    return session_response(session, response)
+
+
+@router.put("/{upload_id}", response_model=UploadSessionResponse, openapi_extra=CHUNK_REQUEST_BODY)
+async def put_upload_chunk(upload_id: str, request: Request, response: Response, offset: int = Query(ge=0),
+                           current_user: User = Depends(get_current_user)):
+    """
+    Append a chunk to a resumable upload. The body is the raw bytes of the chunk.
+
+    Args:
+        upload_id (str): ID of the upload.
+        request (Request): The incoming request, its body is the chunk.
+        response (Response): Response used to set the Upload-Offset header.
+        offset (int): Position of the chunk in the file, the current offset of the upload.
+        current_user (User, optional): Current user. Defaults to Depends(get_current_user).
+
+    Raises:
+        HTTPException: If the upload is not found (404), the offset is not the current one (409), the chunk goes
+            past the declared size (413) or the file is not a supported image (415).
+
+    Returns:
+        UploadSessionResponse: The upload at its new offset.
+    """
+    session = await upload_sessions.get(upload_id, current_user.id)
+    session = await upload_sessions.append(session, offset, request.stream())
+    return session_response(session, response)
+
+
+@router.post("/{upload_id}/finalize", response_model=ImageModel, status_code=status.HTTP_201_CREATED)
+async def finalize_upload(upload_id: str, response: Response, db: AsyncSession = Depends(get_db),
+                          current_user: User = Depends(get_current_user)):
+    """
+    Finish a resumable upload and add its photo, like a single upload.
+
+    Args:
+        upload_id (str): ID of the upload.
+        response (Response): Response used to set the status of a reused image.
+        db (AsyncSession, optional): Database session. Defaults to Depends(get_db).
+        current_user (User, optional): Current user. Defaults to Depends(get_current_user).
+
+    Raises:
+        HTTPException: If the upload is not found (404), incomplete (409) or not a supported image (415).
+
+    Returns:
+        ImageModel: The uploaded image, with 200 when the same content had been uploaded before.
+    """
+    session = await upload_sessions.get(upload_id, current_user.id)
+    upload = await upload_sessions.open(session)
+    try:
+        image = await reuse_duplicate(upload, session.description, db, current_user, response)
+        if image is None:
+            image = await store_upload(upload, session.description, db, current_user)
+    finally:
+        upload.close()
+    await upload_sessions.delete(session)
+    return image
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload(upload_id: str, current_user: User = Depends(get_current_user)):
+    """
+    Abandon a resumable upload and drop what has been received.
+
+    Args:
+        upload_id (str): ID of the upload.
+        current_user (User, optional): Current user. Defaults to Depends(get_current_user).
+
+    Raises:
+        HTTPException: If the upload does not exist, has expired or belongs to another user.
+    """
+    session = await upload_sessions.get(upload_id, current_user.id)
+    await upload_sessions.delete(session)
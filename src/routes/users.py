@@ -1,21 +1,16 @@
-import pickle
-
-import cloudinary
-import cloudinary.uploader
 from fastapi import APIRouter, File, Depends, UploadFile
 from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
 from src.schemas.user_schemas import UserResponse
 from src.entity.models import User
-from src.conf.config import settings
 from src.services.auth_service import auth_service
+from src.services.storage_service import storage
 from src.repository import users as repository_users
 
 
 router = APIRouter(prefix='/users', tags=['users'])
-cloudinary.config(cloud_name=settings.cloud_name, api_key=settings.api_key, api_secret=settings.api_secret, secure=True)
 
 
 @router.get("/me", response_model=UserResponse,
@@ -39,25 +34,22 @@ async def get_current_user(user: User = Depends(auth_service.get_current_user)):
               dependencies=[Depends(RateLimiter(times=1, seconds=20))])
 async def update_user_avatar(file: UploadFile = File(),
                              user: User = Depends(auth_service.get_current_user),
-                             db: Session = Depends(get_db)):
+                             db: AsyncSession = Depends(get_db)):
     """
     Update the user's avatar.
 
     Args:
         file (UploadFile): File containing the new avatar image.
         user (User): Current user retrieved from authentication service.
-        db (Session): Database session.
+        db (AsyncSession): Database session.
 
     Returns:
         UserResponse: Details of the updated user.
     """
     public_id = f"Contacts_Hw_web/{user.email}"
-    res = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
-    res_url = cloudinary.CloudinaryImage(public_id).build_url(width=250, height=250, crop="fill",
-                                                              version=res.get("version"))
+    stored = await storage.put(file.file, public_id, overwrite=True)
+    res_url = storage.url(public_id, stored.version, {"width": 250, "height": 250, "crop": "fill"})
 
-    await repository_users.update_avatar_url(email=user.email, url=res_url, db=db)
-    auth_service.cache.set(user.email, pickle.dumps(user))
-    auth_service.cache.expire(user.email, 300)
+    user = await repository_users.update_avatar_url(email=user.email, url=res_url, db=db)
 
-    return user
+    return await auth_service.cache.set(user)
@@ -0,0 +1,60 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class HistogramBucket(BaseModel):
+    le: str
+    count: int
+
+
+class HistogramResponse(BaseModel):
+    count: int
+    sum: float
+    max: float
+    buckets: List[HistogramBucket]
+
+
+class PoolStatsResponse(BaseModel):
+    pool_class: str
+    status: str
+    size: int | None = None
+    checked_in: int | None = None
+    checked_out: int | None = None
+    overflow: int | None = None
+    timeout: float | None = None
+    checkouts: int | None = None
+    timeouts: int | None = None
+    peak_checked_out: int | None = None
+    wait_time: HistogramResponse | None = None
+
+
+class UserCacheStatsResponse(BaseModel):
+    local_hits: int
+    local_misses: int
+    redis_hits: int
+    redis_misses: int
+    invalidations: int
+    local_size: int
+
+
+class ImageCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    coalesced: int
+    fills: int
+    lock_waits: int
+    errors: int
+    invalidations: int
+    inflight: int
+
+
+class ExecutorStatsResponse(BaseModel):
+    max_workers: int
+    running: int
+    queued: int
+    peak_queued: int
+    completed: int
+    wait_time: HistogramResponse
+    run_time: HistogramResponse
@@ -0,0 +1,23 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    id: str
+    type: str
+    status: str
+    attempts: int
+    result: Any = None
+    error: str | None = None
+    created_at: float
+    updated_at: float
+
+
+class JobTypeStatsResponse(BaseModel):
+    queued: int
+    running: int
+    max_concurrency: int
+    succeeded: int
+    failed: int
+    retried: int
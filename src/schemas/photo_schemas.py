@@ -1,6 +1,7 @@
-from typing import List
+from datetime import datetime
+from typing import Dict, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.schemas.tag_schemas import TagModel
 from src.schemas.comment_schemas import CommentForPhotoSchema
@@ -12,6 +13,28 @@ class ImageModel(BaseModel):
     description: str
     public_id: str
     user_id: int
+    transformation: List[dict] | None = None
+    renditions: Dict[str, str] | None = None
+    placeholder: str | None = None
+
+
+class BulkUploadItem(BaseModel):
+    filename: str | None
+    status_code: int
+    detail: str | None = None
+    image: ImageModel | None = None
+
+
+class UploadSessionCreate(BaseModel):
+    size: int = Field(gt=0)
+    description: str | None = None
+
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    size: int
+    offset: int
+    expires_at: datetime
 
 
 class ImageURLResponse(BaseModel):
@@ -20,7 +43,11 @@ class ImageURLResponse(BaseModel):
     description: str
     qr_url: str | None
     tags: List[TagModel] | None
-    comments: List[CommentForPhotoSchema] | None
+    comment_count: int
+    # the latest comments only, read from Image.recent_comments; all of them are paged by /images/{id}/comments
+    comments: List[CommentForPhotoSchema] = Field(validation_alias="recent_comments")
+    renditions: Dict[str, str] | None = None
+    placeholder: str | None = None
 
 
 class ImageAllResponse(BaseModel):
@@ -30,7 +57,11 @@ class ImageAllResponse(BaseModel):
     description: str
     qr_url: str | None
     tags: List[TagModel] | None
-    comments: List[CommentForPhotoSchema] | None
+    comment_count: int
+    # the latest comments only, read from Image.recent_comments; all of them are paged by /images/{id}/comments
+    comments: List[CommentForPhotoSchema] = Field(validation_alias="recent_comments")
+    renditions: Dict[str, str] | None = None
+    placeholder: str | None = None
 
 
 class ImageUpdateResponse(BaseModel):
@@ -1,17 +1,20 @@
-import pickle
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
-import redis
 from fastapi import Depends, HTTPException, status
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 
 from src.database.db import get_db
 from src.repository import users as repository_users
 from src.conf.config import settings
+from src.services.user_cache_service import user_cache
+from src.utils.bounded_executor import BoundedExecutor
+from src.utils.ttl_cache import TTLCache
 
 
 class Auth:
@@ -19,13 +22,35 @@ class Auth:
     SECRET_KEY = settings.secret_key_jwt
     ALGORITHM = settings.algorithm
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-    cache = redis.Redis(host=settings.redis_domain, port=settings.redis_port, db=0)
+    cache = user_cache
+    token_cache = TTLCache(maxsize=settings.jwt_cache_size, ttl=0)
 
-    def verify_password(self, plain_password, hashed_password):
-        return self.pwd_context.verify(plain_password, hashed_password)
+    hasher = BoundedExecutor(max_workers=settings.password_hash_workers)
 
-    def get_password_hash(self, password: str):
-        return self.pwd_context.hash(password)
+    async def verify_password(self, plain_password, hashed_password):
+        """
+        Check a password against its bcrypt hash on the hashing pool, off the event loop.
+
+        Args:
+            plain_password (str): Password from the login form.
+            hashed_password (str): Stored hash.
+
+        Returns:
+            bool: True if the password matches.
+        """
+        return await self.hasher.run(self.pwd_context.verify, plain_password, hashed_password)
+
+    async def get_password_hash(self, password: str):
+        """
+        Hash a password with bcrypt on the hashing pool, off the event loop.
+
+        Args:
+            password (str): Password to hash.
+
+        Returns:
+            str: The bcrypt hash.
+        """
+        return await self.hasher.run(self.pwd_context.hash, password)
 
     # define a function to generate a new access token
     async def create_access_token(self, data: dict, expires_delta: Optional[float] = None):
@@ -69,6 +94,32 @@ class Auth:
         encoded_refresh_token = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
         return encoded_refresh_token
 
+    def decode_token(self, token: str) -> dict:
+        """
+        Verify a JWT and return its claims, remembering them until the token expires.
+
+        A client re-sends the same token with every request, so the signature is only checked the first time a
+        token is seen. Entries are keyed by the SHA-256 digest of the token and dropped at its ``exp``; callers
+        still check the scope on every call.
+
+        Args:
+            token (str): Encoded JWT.
+
+        Returns:
+            dict: Decoded claims.
+
+        Raises:
+            JWTError: If the token is invalid or expired.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        payload = self.token_cache.get(key)
+        if payload is None:
+            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            lifetime = payload.get("exp", 0) - time.time()
+            if lifetime > 0:
+                self.token_cache.set(key, payload, ttl=lifetime)
+        return payload
+
     async def decode_refresh_token(self, refresh_token: str):
         """
         Decode a refresh token to extract the email address.
@@ -83,7 +134,7 @@ class Auth:
             HTTPException: If the token is invalid or the scope is incorrect.
         """
         try:
-            payload = jwt.decode(refresh_token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            payload = self.decode_token(refresh_token)
             if payload['scope'] == 'refresh_token':
                 email = payload['sub']
                 return email
@@ -91,16 +142,16 @@ class Auth:
         except JWTError:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials')
 
-    async def get_current_user(self, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    async def get_current_user(self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
         """
         Retrieve the current user based on the provided token.
 
         Args:
             token (str): JWT token passed in the Authorization header.
-            db (Session): Database session.
+            db (AsyncSession): Database session.
 
         Returns:
-            User: Current user object.
+            CachedUser: Snapshot of the current user.
 
         Raises:
             HTTPException: If the token is invalid or the user cannot be found.
@@ -112,7 +163,7 @@ class Auth:
         )
         try:
             # Decode JWT
-            payload = jwt.decode(token, self.SECRET_KEY, algorithms=[self.ALGORITHM])
+            payload = self.decode_token(token)
             if payload['scope'] == 'access_token':
                 email = payload["sub"]
                 if email is None:
@@ -122,18 +173,13 @@ class Auth:
         except JWTError as e:
             raise credentials_exception
 
-        user_hash = str(email)
-
-        user = self.cache.get(user_hash)
+        user = await self.cache.get(str(email))
 
         if user is None:
             user = await repository_users.get_user_by_email(email, db)
             if user is None:
                 raise credentials_exception
-            self.cache.set(user_hash, pickle.dumps(user))
-            self.cache.expire(user_hash, 300)
-        else:
-            user = pickle.loads(user)
+            user = await self.cache.set(user)
         return user
 
     def create_email_token(self, data: dict):
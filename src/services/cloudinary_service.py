@@ -1,63 +1,124 @@
-import hashlib
-from datetime import datetime
-from typing import Tuple
-
 import cloudinary
-import cloudinary.uploader
+import cloudinary.utils
+import httpx
+from fastapi import HTTPException, status
 
 from src.conf.config import settings
+from src.services.storage_service import StorageBackend, StoredImage
+
+
+class CloudinaryClient:
+    """
+    Async client for the Cloudinary upload API.
+
+    All calls share one HTTP connection pool, capped at ``max_connections``; callers over the cap wait for a free
+    connection up to the pool timeout. Requests are signed with the account credentials set in ``cloudinary.config``.
+    """
+
+    def __init__(self, api_url: str, cloud_name: str, max_connections: int, timeout: float, connect_timeout: float,
+                 transport: httpx.AsyncBaseTransport | None = None):
+        self.base_url = f"{api_url.rstrip('/')}/{cloud_name}/image/"
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(base_url=self.base_url, limits=self.limits, timeout=self.timeout,
+                                             transport=self.transport)
+        return self._client
+
+    async def call(self, action: str, params: dict, file=None) -> dict:
+        """
+        Send a signed request to an upload API action.
+
+        Args:
+            action (str): API action, e.g. ``upload`` or ``destroy``.
+            params (dict): Action parameters, without credentials.
+            file: File object, bytes or remote URL to upload.
+
+        Returns:
+            dict: Decoded API response.
+
+        Raises:
+            HTTPException: If the storage cannot be reached or rejects the request.
+        """
+        data = cloudinary.utils.sign_request({**params, "timestamp": cloudinary.utils.now()}, {})
+        files = None
+        if isinstance(file, str):
+            data["file"] = file
+        elif file is not None:
+            files = {"file": ("file", file)}
+        try:
+            response = await self.client.post(action, data=data, files=files)
+            response.raise_for_status()
+        except httpx.HTTPError as err:
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Image storage error") from err
+        return response.json()
 
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-class CloudImage:
-    cloudinary.config(
-        cloud_name=settings.cloud_name,
-        api_key=settings.api_key,
-        api_secret=settings.api_secret,
-        secure=True,
-    )
-
-    @staticmethod
-    def generate_name_image(email: str) -> str:
-        name = hashlib.sha256(email.encode("utf-8")).hexdigest()[:12]
-        time = datetime.now()
-        return f"photo_share/{name}{time}"
-
-    @staticmethod
-    def upload_image(file, public_id: str) -> dict:
-        upload_file = cloudinary.uploader.upload(file, public_id=public_id)
-        return upload_file
-
-    @staticmethod
-    def get_url_for_image(public_id, upload_file) -> str:
-        src_url = cloudinary.CloudinaryImage(public_id).build_url(
-            version=upload_file.get("version")
+
+class CloudinaryStorage(StorageBackend):
+    """
+    Images stored on Cloudinary, transformed by Cloudinary.
+    """
+
+    def __init__(self, client: CloudinaryClient):
+        self.client = client
+
+    @classmethod
+    def from_settings(cls) -> "CloudinaryStorage":
+        cloudinary.config(
+            cloud_name=settings.cloud_name,
+            api_key=settings.api_key,
+            api_secret=settings.api_secret,
+            secure=True,
         )
-        return src_url
+        return cls(CloudinaryClient(
+            api_url=settings.cloudinary_api_url,
+            cloud_name=settings.cloud_name,
+            max_connections=settings.cloudinary_max_connections,
+            timeout=settings.cloudinary_timeout,
+            connect_timeout=settings.cloudinary_connect_timeout,
+        ))
+
+    def _stored(self, upload_file: dict) -> StoredImage:
+        public_id = upload_file["public_id"]
+        version = upload_file.get("version")
+        return StoredImage(public_id=public_id, version=version, url=self.url(public_id, version))
+
+    async def put(self, file, public_id: str, overwrite: bool = False) -> StoredImage:
+        # always explicit: Cloudinary overwrites unless told not to, and then answers with the existing image
+        upload_file = await self.client.call("upload", {"public_id": public_id, "overwrite": overwrite}, file)
+        if upload_file.get("existing") and not overwrite:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Image already exists")
+        return self._stored(upload_file)
 
-    @staticmethod
-    def delete_image(public_id: str):
-        cloudinary.uploader.destroy(public_id, resource_type="image")
+    async def get(self, public_id: str) -> bytes:
+        try:
+            response = await self.client.client.get(self.url(public_id))
+            response.raise_for_status()
+        except httpx.HTTPError as err:
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Image storage error") from err
+        return response.content
+
+    async def delete(self, public_id: str):
+        await self.client.call("destroy", {"public_id": public_id})
         return f"{public_id} deleted"
 
-    @staticmethod
-    def change_size(public_id: str, width: int) -> Tuple[str, str]:
-        image = cloudinary.CloudinaryImage(public_id).image(
-            transformation=[{"width": width, "crop": "pad"}]
-        )
-        url = image.split('"')
-        upload_image = cloudinary.uploader.upload(url[1], folder="photo_share")
-        return upload_image["url"], upload_image["public_id"]
-
-    @staticmethod
-    def fade_edge(public_id: str, effect: str = "vignette") -> Tuple[str, str]:
-        image = cloudinary.CloudinaryImage(public_id).image(effect=effect)
-        url = image.split('"')
-        upload_image = cloudinary.uploader.upload(url[1], folder="photo_share")
-        return upload_image["url"], upload_image["public_id"]
-
-    @staticmethod
-    def black_white(public_id: str, effect: str = "art:audrey") -> Tuple[str, str]:
-        image = cloudinary.CloudinaryImage(public_id).image(effect=effect)
-        url = image.split('"')
-        upload_image = cloudinary.uploader.upload(url[1], folder="photo_share")
-        return upload_image["url"], upload_image["public_id"]
+    def url(self, public_id: str, version: int | None = None, transformation: dict | list[dict] | None = None) -> str:
+        return cloudinary.CloudinaryImage(public_id).build_url(version=version, transformation=transformation)
+
+    async def transform(self, public_id: str, transformation: dict) -> StoredImage:
+        source_url = self.url(public_id, transformation=transformation)
+        upload_file = await self.client.call("upload", {"folder": "photo_share"}, source_url)
+        return self._stored(upload_file)
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError, WatchError
+
+from src.conf.config import settings
+from src.database.cache import get_redis
+from src.services.versions_service import image_version, versions
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bump when ImageURLResponse changes: entries written by other versions are then never read
+CACHE_VERSION = 2
+
+
+class ImageCache:
+    """
+    Read-through Redis cache of serialized image details, keyed by image ID.
+
+    Misses are single-flight: concurrent misses in one worker share one load, and across workers the first to
+    take the fill lock loads while the others poll for its entry. Writes that change what an image detail
+    shows call ``invalidate`` after committing; it also drops the fill lock, so a load that read the old row
+    finds its lock gone and does not write its stale result back. Entries expire after ``ttl`` either way.
+    """
+
+    def __init__(self, client: redis.Redis, ttl: int, lock_timeout: float, poll_interval: float = 0.05):
+        self.redis = client
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.inflight: dict[int, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "fills": 0, "lock_waits": 0, "errors": 0,
+                      "invalidations": 0}
+
+    @staticmethod
+    def key(image_id: int) -> str:
+        return f"image:v{CACHE_VERSION}:{image_id}"
+
+    @staticmethod
+    def lock_key(image_id: int) -> str:
+        return f"image:v{CACHE_VERSION}:{image_id}:lock"
+
+    async def get(self, image_id: int, load: Callable[[], Awaitable[bytes | None]]) -> bytes | None:
+        """
+        Get the serialized detail of an image, loading and caching it on a miss.
+
+        Args:
+            image_id (int): ID of the image.
+            load (Callable[[], Awaitable[bytes | None]]): Reads the image from the database and serializes it,
+                None if it does not exist; missing images are not cached.
+
+        Returns:
+            bytes | None: The serialized image, None if it does not exist.
+        """
+        try:
+            payload = await self.redis.get(self.key(image_id))
+        except RedisError as err:
+            self.stats["errors"] += 1
+            logger.warning("Image cache read for %s failed: %s", image_id, err)
+            return await load()
+        if payload is not None:
+            self.stats["hits"] += 1
+            return payload
+        self.stats["misses"] += 1
+
+        fill = self.inflight.get(image_id)
+        if fill is not None:
+            self.stats["coalesced"] += 1
+        else:
+            fill = asyncio.ensure_future(self._fill(image_id, load))
+            self.inflight[image_id] = fill
+            fill.add_done_callback(lambda _: self.inflight.pop(image_id, None))
+        # a cancelled request must not cancel the load others are waiting for
+        return await asyncio.shield(fill)
+
+    async def _fill(self, image_id: int, load: Callable[[], Awaitable[bytes | None]]) -> bytes | None:
+        token = uuid.uuid4().hex
+        try:
+            locked = await self.redis.set(self.lock_key(image_id), token, nx=True,
+                                          px=int(self.lock_timeout * 1000))
+        except RedisError as err:
+            self.stats["errors"] += 1
+            logger.warning("Image cache lock for %s failed: %s", image_id, err)
+            return await load()
+
+        if not locked:
+            # another worker is loading the image: wait for its entry rather than hit the database as well
+            self.stats["lock_waits"] += 1
+            deadline = time.monotonic() + self.lock_timeout
+            try:
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(self.poll_interval)
+                    payload = await self.redis.get(self.key(image_id))
+                    if payload is not None:
+                        return payload
+            except RedisError as err:
+                self.stats["errors"] += 1
+                logger.warning("Image cache read for %s failed: %s", image_id, err)
+            return await load()
+
+        self.stats["fills"] += 1
+        payload = None
+        try:
+            payload = await load()
+        finally:
+            # a failed load only releases the lock
+            await self._store(image_id, token, payload)
+        return payload
+
+    async def _store(self, image_id: int, token: str, payload: bytes | None):
+        lock_key = self.lock_key(image_id)
+        try:
+            # the lock is checked and the entry written in one transaction: an invalidation in between, which
+            # drops the lock, makes it fail rather than let the stale payload in
+            async with self.redis.pipeline() as pipe:
+                await pipe.watch(lock_key)
+                if await pipe.get(lock_key) != token.encode():
+                    return
+                pipe.multi()
+                if payload is not None:
+                    pipe.set(self.key(image_id), payload, ex=self.ttl)
+                pipe.delete(lock_key)
+                await pipe.execute()
+        except WatchError:
+            pass
+        except RedisError as err:
+            self.stats["errors"] += 1
+            logger.warning("Image cache write for %s failed: %s", image_id, err)
+
+    async def invalidate(self, *image_ids: int):
+        """
+        Drop the cached details of images and move their versions on.
+
+        Redis failures are logged rather than raised: the change that triggered the invalidation is already
+        committed, and stale entries expire on their own.
+
+        Args:
+            *image_ids (int): IDs of the images.
+        """
+        if not image_ids:
+            return
+        self.stats["invalidations"] += len(image_ids)
+        keys = [key for image_id in image_ids for key in (self.key(image_id), self.lock_key(image_id))]
+        try:
+            await self.redis.delete(*keys)
+        except RedisError as err:
+            self.stats["errors"] += 1
+            logger.warning("Image cache invalidation for %s failed: %s", image_ids, err)
+        await versions.bump(*(image_version(image_id) for image_id in image_ids))
+
+    def snapshot_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                "inflight": len(self.inflight)}
+
+
+image_cache = ImageCache(get_redis(), ttl=settings.image_cache_ttl, lock_timeout=settings.image_cache_lock_timeout)
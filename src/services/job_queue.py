@@ -0,0 +1,382 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError, WatchError
+
+from src.conf.config import settings
+from src.database.cache import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[Any]]
+
+
+class JobStatus:
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    type: str
+    user_id: int
+    payload: dict
+    status: str = JobStatus.queued
+    attempts: int = 0
+    result: Any = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class JobType:
+    handler: JobHandler
+    max_concurrency: int
+    max_retries: int
+    on_failure: Callable[[dict], None] | None = None
+    running: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+
+
+class PermanentJobError(Exception):
+    """
+    Raised by a handler when retrying cannot help, e.g. the image no longer exists.
+    """
+
+
+class JobQueue(ABC):
+    """
+    Runs registered job handlers on per-type worker tasks.
+
+    Every job type gets ``max_concurrency`` workers in each app process, which caps how many jobs of that type
+    run at once. A failing job is retried with exponential backoff up to ``max_retries`` times.
+    Subclasses decide where jobs, the queue and the pending retries live.
+    """
+
+    def __init__(self, retry_backoff: float):
+        self.retry_backoff = retry_backoff
+        self.types: Dict[str, JobType] = {}
+        self.workers: list[asyncio.Task] = []
+        self.retries: set[asyncio.Task] = set()
+
+    def register(self, job_type: str, handler: JobHandler, max_concurrency: int, max_retries: int,
+                 on_failure: Callable[[dict], None] | None = None):
+        """
+        Register the handler of a job type.
+
+        Args:
+            job_type (str): Name of the job type.
+            handler (JobHandler): Coroutine function called with the job payload, its return value is the result.
+            max_concurrency (int): Workers per process for this type.
+            max_retries (int): Retries after the first failed attempt.
+            on_failure (Callable[[dict], None] | None): Called with the payload once the job has failed for good.
+        """
+        self.types[job_type] = JobType(handler, max_concurrency, max_retries, on_failure)
+
+    @abstractmethod
+    async def save(self, job: Job):
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Job | None:
+        ...
+
+    @abstractmethod
+    async def push(self, job_type: str, job_id: str):
+        ...
+
+    @abstractmethod
+    async def pop(self, job_type: str) -> str | None:
+        ...
+
+    @abstractmethod
+    async def depth(self, job_type: str) -> int:
+        ...
+
+    async def ack(self, job_type: str, job_id: str):
+        """
+        Acknowledge a popped job once it has been handled, for queues that keep jobs in flight until then.
+        """
+
+    async def recover(self):
+        """
+        Requeue the jobs a stopped process took and never acknowledged, for queues that keep them.
+        """
+
+    async def schedule_retry(self, job: Job, delay: float):
+        """
+        Push a failed job back on its queue after ``delay`` seconds. Retries wait in this process.
+        """
+        async def retry():
+            await asyncio.sleep(delay)
+            await self.push(job.type, job.id)
+
+        task = asyncio.create_task(retry())
+        self.retries.add(task)
+        task.add_done_callback(self.retries.discard)
+
+    async def promote_retries(self, job_type: str):
+        """
+        Move retries that are due onto their queue, for queues that keep pending retries outside the process.
+        """
+
+    async def enqueue(self, job_type: str, payload: dict, user_id: int) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            job_type (str): Registered job type.
+            payload (dict): JSON-serializable arguments of the handler.
+            user_id (int): ID of the user who asked for the job.
+
+        Returns:
+            Job: The queued job.
+        """
+        if job_type not in self.types:
+            raise ValueError(f"Unknown job type: {job_type}")
+        self.start()
+        job = Job(id=uuid.uuid4().hex, type=job_type, user_id=user_id, payload=payload)
+        await self.save(job)
+        await self.push(job_type, job.id)
+        return job
+
+    async def run_job(self, job: Job):
+        job_type = self.types[job.type]
+        job.status, job.attempts, job.updated_at = JobStatus.running, job.attempts + 1, time.time()
+        await self.save(job)
+        job_type.running += 1
+        try:
+            job.result = await job_type.handler(job.payload)
+        except Exception as err:
+            job.error = str(err) or type(err).__name__
+            if job.attempts <= job_type.max_retries and not isinstance(err, PermanentJobError):
+                job_type.retried += 1
+                job.status = JobStatus.queued
+                await self.schedule_retry(job, self.retry_backoff * 2 ** (job.attempts - 1))
+            else:
+                logger.warning("Job %s (%s) failed after %s attempts: %s", job.id, job.type, job.attempts, err)
+                job_type.failed += 1
+                job.status = JobStatus.failed
+                if job_type.on_failure is not None:
+                    job_type.on_failure(job.payload)
+        else:
+            job_type.succeeded += 1
+            job.status, job.error = JobStatus.succeeded, None
+        finally:
+            job_type.running -= 1
+        job.updated_at = time.time()
+        await self.save(job)
+
+    async def worker(self, job_type: str):
+        while True:
+            try:
+                await self.promote_retries(job_type)
+                job_id = await self.pop(job_type)
+                if job_id is None:
+                    continue
+                job = await self.get(job_id)
+                if job is not None:
+                    await self.run_job(job)
+                await self.ack(job_type, job_id)
+            except asyncio.CancelledError:
+                raise
+            except RedisError as err:
+                logger.warning("Job queue unavailable: %s", err)
+                await asyncio.sleep(1)
+            except Exception:
+                # an unacknowledged job is left to recover, the worker goes on with the next one
+                logger.exception("Job worker of %s failed", job_type)
+
+    def start(self):
+        """
+        Start the workers on the running event loop, once.
+        """
+        loop = asyncio.get_running_loop()
+        if self.workers and self.workers[0].get_loop() is loop and not self.workers[0].done():
+            return
+        self.workers = [
+            loop.create_task(self.worker(name))
+            for name, job_type in self.types.items() for _ in range(job_type.max_concurrency)
+        ]
+        self.workers.append(loop.create_task(self.recover()))
+
+    async def stop(self):
+        for task in [*self.workers, *self.retries]:
+            task.cancel()
+        await asyncio.gather(*self.workers, *self.retries, return_exceptions=True)
+        self.workers = []
+
+    async def stats(self) -> dict:
+        """
+        Collect per-type queue depth and counters of this process.
+
+        Returns:
+            dict: Counters by job type.
+        """
+        return {
+            name: {"queued": await self.depth(name), "running": job_type.running,
+                   "max_concurrency": job_type.max_concurrency, "succeeded": job_type.succeeded,
+                   "failed": job_type.failed, "retried": job_type.retried}
+            for name, job_type in self.types.items()
+        }
+
+
+class MemoryJobQueue(JobQueue):
+    """
+    Jobs kept in this process: for tests and single-worker deployments.
+
+    As in Redis, job records are dropped ``ttl`` seconds after their last update.
+    """
+
+    def __init__(self, retry_backoff: float, ttl: int = 86400):
+        super().__init__(retry_backoff)
+        self.ttl = ttl
+        # ordered by last update, so expired records are at the front
+        self.jobs: Dict[str, Job] = {}
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def queue(self, job_type: str) -> asyncio.Queue:
+        # queues belong to the loop running the workers, a new loop (a new test) starts with empty ones
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop, self.queues = loop, {}
+        if job_type not in self.queues:
+            self.queues[job_type] = asyncio.Queue()
+        return self.queues[job_type]
+
+    async def save(self, job: Job):
+        self.jobs.pop(job.id, None)
+        self.jobs[job.id] = job
+        self.prune()
+
+    def prune(self):
+        expired = time.time() - self.ttl
+        while self.jobs:
+            job = next(iter(self.jobs.values()))
+            if job.updated_at >= expired:
+                break
+            del self.jobs[job.id]
+
+    async def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    async def push(self, job_type: str, job_id: str):
+        self.queue(job_type).put_nowait(job_id)
+
+    async def pop(self, job_type: str) -> str | None:
+        return await self.queue(job_type).get()
+
+    async def depth(self, job_type: str) -> int:
+        queue = self.queues.get(job_type)
+        return queue.qsize() if queue is not None else 0
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Jobs kept in Redis: every app process runs workers and takes jobs from the shared lists.
+
+    Job records expire ``ttl`` seconds after their last update. A popped job moves atomically to the processing
+    list of its type and leaves it once handled; on startup, jobs there that have not been updated for
+    ``visibility_timeout`` seconds, left by a process that stopped mid-job, go back on the queue. Pending retries
+    wait in a sorted set by due time, so they survive restarts as well.
+    """
+    PREFIX = "jobs"
+
+    def __init__(self, client: redis.Redis, retry_backoff: float, ttl: int, visibility_timeout: float):
+        super().__init__(retry_backoff)
+        self.redis = client
+        self.ttl = ttl
+        self.visibility_timeout = visibility_timeout
+
+    async def save(self, job: Job):
+        await self.redis.set(f"{self.PREFIX}:{job.id}", json.dumps(asdict(job), default=str), ex=self.ttl)
+
+    async def get(self, job_id: str) -> Job | None:
+        data = await self.redis.get(f"{self.PREFIX}:{job_id}")
+        return Job(**json.loads(data)) if data is not None else None
+
+    async def push(self, job_type: str, job_id: str):
+        await self.redis.rpush(f"{self.PREFIX}:queue:{job_type}", job_id)
+
+    async def pop(self, job_type: str) -> str | None:
+        item = await self.redis.blmove(f"{self.PREFIX}:queue:{job_type}", f"{self.PREFIX}:processing:{job_type}",
+                                       timeout=5, src="LEFT", dest="RIGHT")
+        return item.decode("utf-8") if item else None
+
+    async def ack(self, job_type: str, job_id: str):
+        await self.redis.lrem(f"{self.PREFIX}:processing:{job_type}", 1, job_id)
+
+    async def recover(self):
+        """
+        Requeue the jobs left in the processing lists by a process that stopped before handling them.
+
+        A job counts as abandoned once it has not been updated for ``visibility_timeout`` seconds, which must
+        exceed the longest job: younger ones may be running in a live process. Jobs that already finished or
+        wait for a retry only leave the processing list.
+        """
+        abandoned_before = time.time() - self.visibility_timeout
+        try:
+            for job_type in self.types:
+                processing = f"{self.PREFIX}:processing:{job_type}"
+                for raw in await self.redis.lrange(processing, 0, -1):
+                    job = await self.get(raw.decode("utf-8"))
+                    unfinished = job is not None and job.status in (JobStatus.queued, JobStatus.running)
+                    if unfinished and job.updated_at > abandoned_before:
+                        continue
+                    if not await self.redis.lrem(processing, 1, raw) or not unfinished:
+                        continue
+                    if await self.redis.zscore(f"{self.PREFIX}:retry:{job_type}", job.id) is not None:
+                        continue
+                    logger.warning("Requeueing abandoned job %s (%s)", job.id, job.type)
+                    job.status, job.updated_at = JobStatus.queued, time.time()
+                    await self.save(job)
+                    await self.push(job_type, job.id)
+        except RedisError as err:
+            logger.warning("Recovering jobs failed: %s", err)
+
+    async def schedule_retry(self, job: Job, delay: float):
+        await self.redis.zadd(f"{self.PREFIX}:retry:{job.type}", {job.id: time.time() + delay})
+
+    async def promote_retries(self, job_type: str):
+        retries = f"{self.PREFIX}:retry:{job_type}"
+        async with self.redis.pipeline() as pipe:
+            try:
+                # the due retries move in one transaction, which fails if another worker moved them first
+                await pipe.watch(retries)
+                due = await pipe.zrangebyscore(retries, "-inf", time.time())
+                if not due:
+                    return
+                pipe.multi()
+                pipe.zrem(retries, *due)
+                pipe.rpush(f"{self.PREFIX}:queue:{job_type}", *due)
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def depth(self, job_type: str) -> int:
+        return await self.redis.llen(f"{self.PREFIX}:queue:{job_type}")
+
+
+def create_job_queue() -> JobQueue:
+    if settings.job_queue_backend == "redis":
+        return RedisJobQueue(get_redis(), retry_backoff=settings.job_retry_backoff, ttl=settings.job_ttl,
+                             visibility_timeout=settings.job_visibility_timeout)
+    return MemoryJobQueue(retry_backoff=settings.job_retry_backoff, ttl=settings.job_ttl)
+
+
+job_queue = create_job_queue()
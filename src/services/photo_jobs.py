@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.database.db import SessionLocal
+from src.entity.models import User
+from src.repository import photo as repository_photo
+from src.repository.image_link import create_qr
+from src.schemas.link_schemas import ImageTransformModel
+from src.schemas.photo_schemas import ImageModel
+from src.services.job_queue import PermanentJobError, job_queue
+from src.services.renditions import make_placeholder
+from src.services.storage_service import storage
+
+
+UPLOAD_PHOTO = "upload_photo"
+TRANSFORM_PHOTO = "transform_photo"
+CREATE_QR = "create_qr"
+
+TRANSFORMATIONS = {
+    "change_size": lambda payload, db, user: repository_photo.change_size_photo(payload["image_id"],
+                                                                                payload["width"], db, user),
+    "fade_edge": lambda payload, db, user: repository_photo.fade_edge_photo(payload["image_id"], db, user),
+    "black_white": lambda payload, db, user: repository_photo.black_white_photo(payload["image_id"], db, user),
+}
+
+# handlers open their own sessions: the request that queued the job has closed its one long ago
+session_factory = SessionLocal
+
+
+def spool_upload(file) -> str:
+    """
+    Copy an uploaded file to the spool directory, where the upload job picks it up.
+
+    With the Redis job queue every app process must see the same ``settings.job_spool_dir``.
+
+    Args:
+        file: File object of the upload.
+
+    Returns:
+        str: Path of the spooled copy.
+    """
+    if settings.job_spool_dir:
+        os.makedirs(settings.job_spool_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=settings.job_spool_dir or None, prefix="upload-", delete=False) as target:
+        shutil.copyfileobj(file, target)
+    return target.name
+
+
+def remove_spooled(payload: dict):
+    try:
+        os.remove(payload["path"])
+    except FileNotFoundError:
+        pass
+
+
+async def load_user(user_id: int, db: AsyncSession) -> User:
+    user = await db.get(User, user_id)
+    if user is None:
+        raise PermanentJobError("User not found")
+    return user
+
+
+async def upload_photo_job(payload: dict) -> dict:
+    """
+    Store a spooled upload and add its image, with its renditions and placeholder.
+
+    Args:
+        payload (dict): ``path`` of the spooled file, ``public_id``, ``description``, ``user_id`` and
+            ``content_hash``.
+
+    Returns:
+        dict: The new image, as ImageModel.
+    """
+    with open(payload["path"], "rb") as file:
+        # a retry may follow a put that succeeded, so the same public ID is written again
+        stored = await storage.put(file, payload["public_id"], overwrite=True)
+        placeholder = await make_placeholder(file)
+    async with session_factory() as db:
+        user = await load_user(payload["user_id"], db)
+        image = await repository_photo.add_image(stored.url, stored.public_id, payload["description"], db, user,
+                                                 content_hash=payload.get("content_hash"), placeholder=placeholder)
+        result = jsonable_encoder(ImageModel.model_validate(image, from_attributes=True))
+    remove_spooled(payload)
+    return result
+
+
+async def transform_photo_job(payload: dict) -> dict:
+    """
+    Derive a transformed image.
+
+    Args:
+        payload (dict): ``operation`` (a key of TRANSFORMATIONS), ``image_id``, ``user_id`` and the
+            parameters of the operation.
+
+    Returns:
+        dict: The derived image, as ImageChangeResponse.
+
+    Raises:
+        PermanentJobError: If the image is missing or belongs to someone else.
+    """
+    async with session_factory() as db:
+        user = await load_user(payload["user_id"], db)
+        try:
+            response = await TRANSFORMATIONS[payload["operation"]](payload, db, user)
+        except HTTPException as err:
+            if err.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+                raise
+            raise PermanentJobError(err.detail)
+    return jsonable_encoder(response)
+
+
+async def create_qr_job(payload: dict) -> dict:
+    """
+    Generate the QR code of an image.
+
+    Args:
+        payload (dict): ``image_id`` and ``user_id``.
+
+    Returns:
+        dict: The QR code link, as ImageLinkQR.
+
+    Raises:
+        PermanentJobError: If the image is missing.
+    """
+    async with session_factory() as db:
+        user = await load_user(payload["user_id"], db)
+        try:
+            response = await create_qr(ImageTransformModel(id=payload["image_id"]), db, user)
+        except HTTPException as err:
+            if err.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+                raise
+            raise PermanentJobError(err.detail)
+    return jsonable_encoder(response)
+
+
+job_queue.register(UPLOAD_PHOTO, upload_photo_job, max_concurrency=settings.job_concurrency_upload,
+                   max_retries=settings.job_max_retries, on_failure=remove_spooled)
+job_queue.register(TRANSFORM_PHOTO, transform_photo_job, max_concurrency=settings.job_concurrency_transform,
+                   max_retries=settings.job_max_retries)
+job_queue.register(CREATE_QR, create_qr_job, max_concurrency=settings.job_concurrency_qr,
+                   max_retries=settings.job_max_retries)
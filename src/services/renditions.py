@@ -0,0 +1,78 @@
+import asyncio
+import base64
+from io import BytesIO
+from typing import BinaryIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.services.storage_service import storage
+
+
+# Widths every image is offered at, see ImageAllResponse: list views fetch a rendition instead of the original
+RENDITIONS = {"thumbnail": 320, "medium": 800, "large": 1600}
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+
+def rendition_urls(public_id: str, transformation: list[dict] | None = None) -> dict[str, str]:
+    """
+    Build the URLs of the renditions of an image.
+
+    Renditions are derived by the storage when first fetched, like transformed images: nothing is stored at
+    upload. They scale down to their width and never up, so a small image is served as is.
+
+    Args:
+        public_id (str): Public ID of the image.
+        transformation (list[dict] | None): Transformation steps of a derived image, applied before scaling.
+
+    Returns:
+        dict[str, str]: URL by rendition name.
+    """
+    return {name: storage.url(public_id, transformation=[*(transformation or []), {"width": width, "crop": "limit"}])
+            for name, width in RENDITIONS.items()}
+
+
+def render_placeholder(file: BinaryIO) -> str | None:
+    """
+    Encode a tiny, low quality copy of an image as a data URI, shown blurred while a rendition loads.
+
+    JPEG sources are decoded at a reduced scale, so a large photo is never fully decoded. Images past Pillow's
+    decompression bomb limit are refused before any pixel is read.
+
+    Args:
+        file (BinaryIO): Encoded image, read from its current position.
+
+    Returns:
+        str | None: ``data:image/webp;base64,...`` URI of a few hundred bytes, None if the image cannot be decoded
+        or is over that limit.
+    """
+    try:
+        with Image.open(file) as source:
+            source.draft("RGB", (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+            image = ImageOps.exif_transpose(source).convert("RGB")
+            image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.BILINEAR)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError):
+        return None
+    output = BytesIO()
+    image.save(output, format="WEBP", quality=PLACEHOLDER_QUALITY)
+    return "data:image/webp;base64," + base64.b64encode(output.getvalue()).decode()
+
+
+async def make_placeholder(file: BinaryIO) -> str | None:
+    """
+    Render the placeholder of an uploaded file off the event loop, see ``render_placeholder``.
+
+    Args:
+        file (BinaryIO): File object of the upload, read from the start and rewound afterwards.
+
+    Returns:
+        str | None: Placeholder data URI, None if the image cannot be decoded.
+    """
+    def render() -> str | None:
+        file.seek(0)
+        try:
+            return render_placeholder(file)
+        finally:
+            file.seek(0)
+
+    return await asyncio.to_thread(render)
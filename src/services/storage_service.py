@@ -0,0 +1,351 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import shutil
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+
+from src.conf.config import settings
+
+
+@dataclass(slots=True, frozen=True)
+class StoredImage:
+    public_id: str
+    version: int | None
+    url: str
+
+
+def generate_public_id(email: str) -> str:
+    """
+    Build a new public ID for an image uploaded by a user.
+
+    Args:
+        email (str): Email of the owner.
+
+    Returns:
+        str: Public ID under the photo_share folder.
+    """
+    name = hashlib.sha256(email.encode("utf-8")).hexdigest()[:12]
+    return f"photo_share/{name}{datetime.now()}"
+
+
+ABBREVIATIONS = {"width": "w", "height": "h", "crop": "c", "effect": "e"}
+DERIVED = ".derived"
+
+
+def transformation_to_string(transformation: dict | list[dict]) -> str:
+    """
+    Serialize a transformation in the Cloudinary URL notation, e.g. ``{"width": 300, "crop": "pad"}`` to
+    ``c_pad,w_300``; chained steps are joined with ``/``. Keys are sorted, so equal transformations give
+    equal strings.
+
+    Args:
+        transformation (dict | list[dict]): Transformation parameters, or a list of steps applied in order.
+
+    Returns:
+        str: Transformation string.
+    """
+    if isinstance(transformation, list):
+        return "/".join(transformation_to_string(step) for step in transformation)
+    parts = [f"{ABBREVIATIONS.get(key, key)}_{value}" for key, value in transformation.items()]
+    return ",".join(sorted(parts))
+
+
+def parse_transformation(text: str) -> list[dict]:
+    """
+    Parse a transformation string built by ``transformation_to_string`` back into its steps.
+
+    Args:
+        text (str): Transformation string.
+
+    Returns:
+        list[dict]: Transformation steps.
+
+    Raises:
+        ValueError: If the string is malformed.
+    """
+    names = {abbreviation: key for key, abbreviation in ABBREVIATIONS.items()}
+    steps = []
+    for chunk in text.split("/"):
+        step = {}
+        for part in chunk.split(","):
+            abbreviation, separator, value = part.partition("_")
+            if not separator or abbreviation not in names:
+                raise ValueError(f"Invalid transformation: {part}")
+            step[names[abbreviation]] = int(value) if names[abbreviation] in ("width", "height") else value
+        steps.append(step)
+    return steps
+
+
+class StorageBackend(ABC):
+    """
+    Where image files live and how their URLs are built.
+    """
+
+    @abstractmethod
+    async def put(self, file, public_id: str, overwrite: bool = False) -> StoredImage:
+        """
+        Store a file under a public ID.
+
+        Args:
+            file: File object or bytes.
+            public_id (str): Public ID of the image.
+            overwrite (bool): Replace an existing image with the same public ID.
+
+        Returns:
+            StoredImage: Public ID, version and URL of the stored image.
+        """
+
+    @abstractmethod
+    async def get(self, public_id: str) -> bytes:
+        """
+        Read the content of a stored image.
+
+        Args:
+            public_id (str): Public ID of the image.
+
+        Returns:
+            bytes: Image content.
+        """
+
+    @abstractmethod
+    async def delete(self, public_id: str):
+        """
+        Delete a stored image.
+
+        Args:
+            public_id (str): Public ID of the image.
+        """
+
+    @abstractmethod
+    def url(self, public_id: str, version: int | None = None, transformation: dict | list[dict] | None = None) -> str:
+        """
+        Build the URL of an image, optionally transformed.
+
+        Args:
+            public_id (str): Public ID of the image.
+            version (int | None): Version of the image, busts caches on overwrite.
+            transformation (dict | list[dict] | None): Transformation, or chained steps, applied when serving.
+
+        Returns:
+            str: Image URL.
+        """
+
+    @abstractmethod
+    async def transform(self, public_id: str, transformation: dict) -> StoredImage:
+        """
+        Store a transformed copy of an image as a new image.
+
+        Args:
+            public_id (str): Public ID of the source image.
+            transformation (dict): Transformation to apply.
+
+        Returns:
+            StoredImage: The new image.
+        """
+
+    async def aclose(self):
+        """
+        Release connections held by the backend.
+        """
+
+
+class LocalStorage(StorageBackend):
+    """
+    Keeps images on the local disk under ``root`` and serves them from ``base_url``, see src/routes/storage.py.
+
+    Transformed URLs are rendered by ``engine`` on first fetch and kept under ``root/.derived``. They carry an
+    HMAC of the public ID and the transformation made with ``signing_key``, so only transformations the
+    application built a URL for are rendered, not whatever a client puts in a URL. Without a key one is drawn
+    at random, and URLs then only verify within this instance. Concurrent requests for a rendition that is
+    not on disk yet share one render.
+    """
+
+    def __init__(self, root: str, base_url: str, engine=None, signing_key: str | None = None):
+        self.root = Path(root).resolve()
+        self.base_url = base_url.rstrip("/")
+        self.engine = engine
+        self.signing_key = (signing_key or secrets.token_hex(32)).encode("utf-8")
+        self.inflight: dict[Path, asyncio.Future] = {}
+
+    def path(self, public_id: str) -> Path:
+        """
+        Resolve the file of a public ID.
+
+        Args:
+            public_id (str): Public ID of the image.
+
+        Returns:
+            Path: File path inside the storage root.
+
+        Raises:
+            HTTPException: If the public ID points outside the storage root.
+        """
+        path = (self.root / public_id).resolve()
+        if not path.is_relative_to(self.root) or path == self.root or path.relative_to(self.root).parts[0] == DERIVED:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+        return path
+
+    def derived_path(self, public_id: str, transformation: str) -> Path:
+        """
+        Resolve the rendered file of a transformed image.
+
+        Args:
+            public_id (str): Public ID of the source image.
+            transformation (str): Transformation string.
+
+        Returns:
+            Path: File path under ``root/.derived``, one directory per source image.
+        """
+        self.path(public_id)
+        digest = hashlib.sha256(transformation.encode("utf-8")).hexdigest()[:32]
+        return self.root / DERIVED / public_id / digest
+
+    def _write(self, path: Path, file, overwrite: bool) -> int:
+        if path.exists() and not overwrite:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Image already exists")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # unique per write, so concurrent writers of one path never share a temporary file
+        tmp_path = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as target:
+                if isinstance(file, bytes):
+                    target.write(file)
+                else:
+                    shutil.copyfileobj(file, target)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return int(time.time())
+
+    async def put(self, file, public_id: str, overwrite: bool = False) -> StoredImage:
+        version = await asyncio.to_thread(self._write, self.path(public_id), file, overwrite)
+        return StoredImage(public_id=public_id, version=version, url=self.url(public_id, version))
+
+    async def get(self, public_id: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self.path(public_id).read_bytes)
+        except FileNotFoundError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+
+    async def delete(self, public_id: str):
+        await asyncio.to_thread(self.path(public_id).unlink, missing_ok=True)
+        await asyncio.to_thread(shutil.rmtree, self.root / DERIVED / public_id, ignore_errors=True)
+        return f"{public_id} deleted"
+
+    def url(self, public_id: str, version: int | None = None, transformation: dict | list[dict] | None = None) -> str:
+        url = f"{self.base_url}/{quote(public_id)}"
+        query = []
+        if version is not None:
+            query.append(f"v={version}")
+        if transformation:
+            string = transformation_to_string(transformation)
+            query.append(f"t={quote(string, safe='')}")
+            query.append(f"s={self.sign(public_id, string)}")
+        return f"{url}?{'&'.join(query)}" if query else url
+
+    def sign(self, public_id: str, transformation: str) -> str:
+        """
+        Sign a transformation of an image for its URL.
+
+        Args:
+            public_id (str): Public ID of the source image.
+            transformation (str): Transformation string.
+
+        Returns:
+            str: Signature for the ``s`` query parameter.
+        """
+        message = f"{public_id}\x1f{transformation}".encode("utf-8")
+        return hmac.new(self.signing_key, message, hashlib.sha256).hexdigest()[:32]
+
+    async def _render(self, public_id: str, steps: list[dict]) -> bytes:
+        if self.engine is None:
+            raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                                detail="Transformations are not supported by local storage")
+        data = await self.get(public_id)
+        try:
+            return await self.engine.render(data, steps)
+        except ValueError as err:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err))
+
+    async def render(self, public_id: str, transformation: str, signature: str | None) -> Path:
+        """
+        Get the file of a transformed image, rendering it the first time it is requested.
+
+        Args:
+            public_id (str): Public ID of the source image.
+            transformation (str): Transformation string from the image URL.
+            signature (str | None): Signature from the image URL, see ``sign``.
+
+        Returns:
+            Path: Rendered file.
+
+        Raises:
+            HTTPException: If the signature does not match, or the transformation is invalid or cannot be rendered.
+        """
+        if not signature or not hmac.compare_digest(signature, self.sign(public_id, transformation)):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid transformation signature")
+        try:
+            steps = parse_transformation(transformation)
+        except ValueError as err:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err))
+        # keyed by the canonical form, so equivalent URLs share one rendition
+        path = self.derived_path(public_id, transformation_to_string(steps))
+        if not path.exists():
+            rendering = self.inflight.get(path)
+            if rendering is None:
+                rendering = asyncio.ensure_future(self._render_file(path, public_id, steps))
+                self.inflight[path] = rendering
+                rendering.add_done_callback(lambda _: self.inflight.pop(path, None))
+            # a cancelled request must not cancel the render others are waiting for
+            await asyncio.shield(rendering)
+        return path
+
+    async def _render_file(self, path: Path, public_id: str, steps: list[dict]):
+        data = await self._render(public_id, steps)
+        await asyncio.to_thread(self._write, path, data, True)
+
+    async def transform(self, public_id: str, transformation: dict) -> StoredImage:
+        data = await self._render(public_id, [transformation])
+        return await self.put(data, f"photo_share/{uuid4().hex}")
+
+    async def aclose(self):
+        if self.engine is not None:
+            self.engine.shutdown()
+
+
+def create_storage() -> StorageBackend:
+    """
+    Build the storage backend selected by ``settings.storage_backend``.
+
+    Returns:
+        StorageBackend: Cloudinary or local storage.
+    """
+    if settings.storage_backend == "local":
+        from src.services.image_engine import image_engine
+        # a separate key, so URL signatures tell nothing about the key that signs access tokens
+        signing_key = settings.storage_signing_key or hmac.new(settings.secret_key_jwt.encode("utf-8"),
+                                                               b"photoshare storage url signatures",
+                                                               hashlib.sha256).hexdigest()
+        return LocalStorage(settings.storage_local_root, settings.storage_local_url, engine=image_engine,
+                            signing_key=signing_key)
+    # imported here so a local deployment needs neither the cloudinary package nor its credentials
+    from src.services.cloudinary_service import CloudinaryStorage
+    return CloudinaryStorage.from_settings()
+
+
+storage = create_storage()
+
+
+def get_storage() -> StorageBackend:
+    return storage
@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+
+from src.conf.config import settings
+from src.utils.image_types import sniff_image_type
+from src.utils.upload_stream import SNIFF_SIZE, StreamedUpload
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class UploadSession:
+    id: str
+    user_id: int
+    size: int
+    description: str | None
+    created_at: float
+    offset: int = 0
+    updated_at: float = 0
+
+
+class UploadSessions:
+    """
+    Resumable uploads: a client opens a session for a file of known size, sends it in chunks, each at the offset
+    the previous one ended, and finalizes it once complete. After a dropped connection it asks for the offset and
+    carries on from there.
+
+    Chunks are appended to ``root/<id>/data`` as they stream in, next to the session in ``root/<id>/session.json``,
+    so neither a chunk nor the file is held in memory. Sessions untouched for ``ttl`` seconds are removed by
+    ``cleanup``. With several app processes, ``root`` must be a shared directory.
+    """
+
+    def __init__(self, root: str, ttl: int, max_size: int):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.locks: dict[str, asyncio.Lock] = {}
+
+    def expires_at(self, session: UploadSession) -> float:
+        return session.updated_at + self.ttl
+
+    def directory(self, session_id: str) -> Path:
+        try:
+            return self.root / uuid.UUID(hex=session_id).hex
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+
+    def _save(self, session: UploadSession):
+        path = self.directory(session.id) / "session.json"
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(session)))
+        os.replace(tmp_path, path)
+
+    def _load(self, session_id: str) -> UploadSession | None:
+        directory = self.directory(session_id)
+        try:
+            session = UploadSession(**json.loads((directory / "session.json").read_text()))
+            stat = (directory / "data").stat()
+        except FileNotFoundError:
+            return None
+        # the data file is the source of truth: a chunk may have been written without its session update
+        session.offset, session.updated_at = stat.st_size, max(session.updated_at, stat.st_mtime)
+        return session
+
+    async def create(self, user_id: int, size: int, description: str | None) -> UploadSession:
+        """
+        Open an upload session.
+
+        Args:
+            user_id (int): ID of the uploading user.
+            size (int): Size of the whole file, in bytes.
+            description (str | None): Description of the photo.
+
+        Returns:
+            UploadSession: The new session, at offset 0.
+
+        Raises:
+            HTTPException: If the file is larger than the upload limit.
+        """
+        if size > self.max_size:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"File is larger than {self.max_size} bytes")
+        now = time.time()
+        session = UploadSession(id=uuid.uuid4().hex, user_id=user_id, size=size, description=description,
+                                created_at=now, updated_at=now)
+
+        def create_files():
+            directory = self.directory(session.id)
+            directory.mkdir(parents=True)
+            (directory / "data").touch()
+            self._save(session)
+
+        await asyncio.to_thread(create_files)
+        return session
+
+    async def get(self, session_id: str, user_id: int) -> UploadSession:
+        """
+        Load an upload session with its current offset.
+
+        Args:
+            session_id (str): ID of the session.
+            user_id (int): ID of the current user, sessions of other users are not found.
+
+        Returns:
+            UploadSession: The session.
+
+        Raises:
+            HTTPException: If the session does not exist, has expired or belongs to another user.
+        """
+        session = await asyncio.to_thread(self._load, session_id)
+        if session is None or session.user_id != user_id or self.expires_at(session) < time.time():
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+        return session
+
+    async def append(self, session: UploadSession, offset: int, chunks: AsyncIterator[bytes]) -> UploadSession:
+        """
+        Append a chunk streamed from the request body.
+
+        Args:
+            session (UploadSession): The session.
+            offset (int): Offset of the chunk in the file, must be the current offset of the session.
+            chunks (AsyncIterator[bytes]): Body of the request.
+
+        Returns:
+            UploadSession: The session at its new offset. A chunk cut off by a dropped connection is kept up to
+            where it stopped.
+
+        Raises:
+            HTTPException: 409 if the offset is not the current one, 413 if the chunk goes past the declared
+                size, 415 if the file does not start like a supported image.
+        """
+        # one writer per session in this process: a client retrying a chunk must not interleave with itself
+        async with self.locks.setdefault(session.id, asyncio.Lock()):
+            session = await self.get(session.id, session.user_id)
+            if offset != session.offset:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                    detail=f"Upload is at offset {session.offset}")
+            path = self.directory(session.id) / "data"
+            sniffed = session.offset >= min(SNIFF_SIZE, session.size)
+            with open(path, "ab") as data:
+                async for chunk in chunks:
+                    if session.offset + len(chunk) > session.size:
+                        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                            detail=f"Upload is limited to the declared {session.size} bytes")
+                    await asyncio.to_thread(data.write, chunk)
+                    session.offset += len(chunk)
+                    if not sniffed and session.offset >= min(SNIFF_SIZE, session.size):
+                        data.flush()
+                        await self.check_head(session, path)
+                        sniffed = True
+            session.updated_at = time.time()
+            await asyncio.to_thread(self._save, session)
+        return session
+
+    async def check_head(self, session: UploadSession, path: Path):
+        with open(path, "rb") as data:
+            head = data.read(SNIFF_SIZE)
+        if sniff_image_type(head) is None:
+            await self.delete(session)
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                                detail="Only JPEG, PNG, GIF and WebP images are accepted")
+
+    def _open(self, session: UploadSession) -> StreamedUpload:
+        data = open(self.directory(session.id) / "data", "rb")
+        try:
+            media_type = sniff_image_type(data.read(SNIFF_SIZE))
+            if media_type is None:
+                raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                                    detail="Only JPEG, PNG, GIF and WebP images are accepted")
+            data.seek(0)
+            digest = hashlib.file_digest(data, "sha256")
+            data.seek(0)
+        except BaseException:
+            data.close()
+            raise
+        return StreamedUpload(file=data, filename=None, media_type=media_type, size=session.size,
+                              sha256=digest.hexdigest())
+
+    async def open(self, session: UploadSession) -> StreamedUpload:
+        """
+        Open the assembled file of a complete session, read straight from the staging directory.
+
+        The session stays until ``delete``, so a finalization that fails can be retried.
+
+        Args:
+            session (UploadSession): The session.
+
+        Returns:
+            StreamedUpload: The file, as if it had been uploaded in one request.
+
+        Raises:
+            HTTPException: 409 if chunks are missing, 415 if the file is not a supported image.
+        """
+        if session.offset != session.size:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail=f"Upload is at offset {session.offset} of {session.size}")
+        return await asyncio.to_thread(self._open, session)
+
+    async def delete(self, session: UploadSession):
+        await asyncio.to_thread(shutil.rmtree, self.directory(session.id), ignore_errors=True)
+        self.locks.pop(session.id, None)
+
+    def _cleanup(self) -> int:
+        removed = 0
+        if not self.root.is_dir():
+            return removed
+        now = time.time()
+        for directory in self.root.iterdir():
+            try:
+                session = self._load(directory.name) if directory.is_dir() else None
+            except HTTPException:
+                continue
+            if session is None:
+                # a session being created has its data file before its session file
+                expired = directory.stat().st_mtime + self.ttl < now
+            else:
+                expired = self.expires_at(session) < now
+            if expired:
+                shutil.rmtree(directory, ignore_errors=True)
+                self.locks.pop(directory.name, None)
+                removed += 1
+        return removed
+
+    async def cleanup(self) -> int:
+        """
+        Remove the sessions untouched for longer than the TTL.
+
+        Returns:
+            int: Number of removed sessions.
+        """
+        return await asyncio.to_thread(self._cleanup)
+
+    async def run_cleanup(self, interval: float):
+        while True:
+            try:
+                removed = await self.cleanup()
+                if removed:
+                    logger.info("Removed %s abandoned upload sessions", removed)
+            except OSError as err:
+                logger.warning("Upload session cleanup failed: %s", err)
+            await asyncio.sleep(interval)
+
+
+upload_sessions = UploadSessions(settings.upload_session_dir, ttl=settings.upload_session_ttl,
+                                 max_size=settings.upload_max_size)
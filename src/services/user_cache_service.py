@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.database.cache import get_redis
+from src.entity.models import Role, User
+from src.utils.ttl_cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bump when the layout below changes: entries written by other versions are treated as misses
+CACHE_VERSION = 1
+
+
+@dataclass(slots=True, frozen=True)
+class CachedUser:
+    """
+    Detached snapshot of the fields authentication and UserResponse need.
+
+    Stands in for the User row in request handlers, so it must not be added to a session.
+    """
+    id: int
+    username: str
+    email: str
+    first_name: str | None
+    last_name: str | None
+    sex: str | None
+    role: Role
+    avatar: str | None
+    confirmed: bool
+    created_at: datetime | None
+    updated_at: datetime | None
+
+    @classmethod
+    def from_user(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            sex=user.sex,
+            role=Role(user.role) if user.role is not None else Role.user,
+            avatar=user.avatar,
+            confirmed=bool(user.confirmed),
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+def _isoformat(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _fromisoformat(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def serialize_user(user: User | CachedUser) -> bytes:
+    """
+    Encode a user as a compact versioned JSON array.
+
+    Args:
+        user (User | CachedUser): User row or snapshot.
+
+    Returns:
+        bytes: Cache payload.
+    """
+    return json.dumps([
+        CACHE_VERSION, user.id, user.username, user.email, user.first_name, user.last_name, user.sex,
+        Role(user.role).value if user.role is not None else Role.user.value, user.avatar, bool(user.confirmed),
+        _isoformat(user.created_at), _isoformat(user.updated_at),
+    ], separators=(",", ":")).encode("utf-8")
+
+
+def deserialize_user(data: bytes) -> CachedUser | None:
+    """
+    Decode a payload written by serialize_user.
+
+    Args:
+        data (bytes): Cache payload.
+
+    Returns:
+        CachedUser | None: The snapshot, or None when the payload has another version or is unreadable.
+    """
+    try:
+        fields = json.loads(data)
+        if fields[0] != CACHE_VERSION:
+            return None
+        (_, user_id, username, email, first_name, last_name, sex, role, avatar, confirmed,
+         created_at, updated_at) = fields
+        return CachedUser(id=user_id, username=username, email=email, first_name=first_name, last_name=last_name,
+                          sex=sex, role=Role(role), avatar=avatar, confirmed=confirmed,
+                          created_at=_fromisoformat(created_at), updated_at=_fromisoformat(updated_at))
+    except (ValueError, TypeError, KeyError, IndexError):
+        return None
+
+
+class UserCache:
+    """
+    Two-tier cache of authenticated users keyed by email.
+
+    A small in-process LRU with a short TTL answers repeated tokens without a network round-trip,
+    Redis is shared by all workers. Invalidations delete the Redis entry and are broadcast over pub/sub
+    so every worker drops its local copy; the local TTL bounds staleness if a message is missed.
+    Redis failures are logged and degrade to misses, so authentication falls back to the database.
+    """
+    CHANNEL = "user_cache:invalidate"
+
+    def __init__(self, client: redis.Redis, ttl: int, local_size: int, local_ttl: float):
+        self.redis = client
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=local_size, ttl=local_ttl)
+        self.stats = {"local_hits": 0, "local_misses": 0, "redis_hits": 0, "redis_misses": 0, "invalidations": 0,
+                      "errors": 0}
+
+    async def get(self, email: str) -> CachedUser | None:
+        """
+        Look a user up in the local tier, then in Redis.
+
+        Args:
+            email (str): User email.
+
+        Returns:
+            CachedUser | None: Cached snapshot, None on a miss in both tiers or if Redis is unavailable.
+        """
+        user = self.local.get(email)
+        if user is not None:
+            self.stats["local_hits"] += 1
+            return user
+        self.stats["local_misses"] += 1
+
+        try:
+            payload = await self.redis.get(email)
+        except RedisError as err:
+            self.stats["errors"] += 1
+            logger.warning("User cache read for %s failed: %s", email, err)
+            return None
+        user = deserialize_user(payload) if payload is not None else None
+        if user is None:
+            self.stats["redis_misses"] += 1
+            return None
+        self.stats["redis_hits"] += 1
+        self.local.set(email, user)
+        return user
+
+    async def set(self, user: User | CachedUser) -> CachedUser:
+        """
+        Store a user in both tiers. A failed Redis write is logged and only the local tier keeps the user.
+
+        Args:
+            user (User | CachedUser): User row or snapshot.
+
+        Returns:
+            CachedUser: The stored snapshot.
+        """
+        snapshot = user if isinstance(user, CachedUser) else CachedUser.from_user(user)
+        try:
+            await self.redis.set(snapshot.email, serialize_user(snapshot), ex=self.ttl)
+        except RedisError as err:
+            self.stats["errors"] += 1
+            logger.warning("User cache write for %s failed: %s", snapshot.email, err)
+        self.local.set(snapshot.email, snapshot)
+        return snapshot
+
+    async def invalidate(self, email: str):
+        """
+        Drop a user from every tier of every worker.
+
+        Redis failures are logged rather than raised: the change that triggered the invalidation is already
+        committed, and stale entries expire on their own.
+
+        Args:
+            email (str): User email.
+        """
+        self.stats["invalidations"] += 1
+        self.local.pop(email)
+        try:
+            await self.redis.delete(email)
+            await self.redis.publish(self.CHANNEL, email)
+        except RedisError as err:
+            logger.warning("User cache invalidation for %s failed: %s", email, err)
+
+    async def listen(self):
+        """
+        Drop local entries invalidated by other workers, run as a background task for the app lifetime.
+        """
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.local.pop(message["data"].decode("utf-8"))
+            except RedisError as err:
+                logger.warning("User cache invalidation channel lost: %s", err)
+                # messages may have been missed while disconnected
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    def snapshot_stats(self) -> dict:
+        return {**self.stats, "local_size": len(self.local)}
+
+
+user_cache = UserCache(get_redis(), ttl=settings.user_cache_ttl, local_size=settings.user_cache_local_size,
+                       local_ttl=settings.user_cache_local_ttl)
@@ -0,0 +1,147 @@
+import logging
+import uuid
+
+import redis.asyncio as redis
+from fastapi import Request, Response, status
+from redis.exceptions import RedisError
+
+from src.conf.config import settings
+from src.database.cache import get_redis
+from src.utils.conditional import etag_matches, make_etag
+
+
+logger = logging.getLogger(__name__)
+
+
+# The tag endpoints share one version; images have one each, and a page of images is versioned by its rows
+TAGS = "tags"
+# Part of every ETag: bump when a response schema changes, so representations of the old shape stop matching
+REPRESENTATION_VERSION = "2"
+
+
+def image_version(image_id: int) -> str:
+    return f"image:{image_id}"
+
+
+class ResourceVersions:
+    """
+    Version tokens of readable resources in Redis, the source of their ETags.
+
+    A token is a random string replaced on every change rather than a counter: should Redis lose a token, a new
+    one is drawn, so an ETag handed out before can never match different content again. Tokens expire after
+    ``ttl`` seconds without a change, and those of deleted resources are dropped with them.
+    """
+
+    def __init__(self, client: redis.Redis, ttl: int):
+        self.redis = client
+        self.ttl = ttl
+
+    @staticmethod
+    def key(name: str) -> str:
+        return f"version:{name}"
+
+    async def get(self, *names: str, mint: bool = True) -> list[str] | None:
+        """
+        Get the current tokens of resources, drawing one for a resource that has none yet.
+
+        Args:
+            *names (str): Resource names, e.g. TAGS or ``image_version(42)``.
+            mint (bool): Draw the missing tokens. Without it a resource that has no token yet gives None, so
+                reads of resources that may not exist leave nothing behind in Redis. Defaults to True.
+
+        Returns:
+            list[str] | None: Tokens in the given order, None if Redis is unavailable or a token is missing and
+                not drawn.
+        """
+        keys = [self.key(name) for name in names]
+        try:
+            tokens = await self.redis.mget(keys)
+            if not mint and None in tokens:
+                return None
+            for index, token in enumerate(tokens):
+                if token is None:
+                    token = uuid.uuid4().hex.encode()
+                    # concurrent readers draw different tokens, the first one written wins
+                    if not await self.redis.set(keys[index], token, nx=True, ex=self.ttl):
+                        token = await self.redis.get(keys[index]) or token
+                tokens[index] = token.decode()
+        except RedisError as err:
+            logger.warning("Reading versions of %s failed: %s", names, err)
+            return None
+        return tokens
+
+    async def bump(self, *names: str):
+        """
+        Move resources on to new tokens after a committed change, so their ETags no longer match.
+
+        Redis failures are logged rather than raised: the change is already committed.
+
+        Args:
+            *names (str): Resource names.
+        """
+        if not names:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for name in names:
+                    pipe.set(self.key(name), uuid.uuid4().hex, ex=self.ttl)
+                await pipe.execute()
+        except RedisError as err:
+            logger.warning("Bumping versions of %s failed: %s", names, err)
+
+    async def forget(self, *names: str):
+        """
+        Drop the tokens of deleted resources.
+
+        Redis failures are logged rather than raised, the tokens expire on their own.
+
+        Args:
+            *names (str): Resource names.
+        """
+        if not names:
+            return
+        try:
+            await self.redis.delete(*(self.key(name) for name in names))
+        except RedisError as err:
+            logger.warning("Dropping versions of %s failed: %s", names, err)
+
+
+versions = ResourceVersions(get_redis(), ttl=settings.version_ttl)
+
+
+async def cache_validators(request: Request, cache_control: str, *names: str, mint: bool = True) -> dict[str, str]:
+    """
+    Build the caching headers of a read: its Cache-Control policy and an ETag from the versions of the resources
+    it shows, the request URL, which selects the page, the filters and so on, and REPRESENTATION_VERSION.
+
+    Args:
+        request (Request): The incoming request.
+        cache_control (str): Cache-Control policy of the route.
+        *names (str): Resources the response shows.
+        mint (bool): Draw the tokens of resources that have none, see ``ResourceVersions.get``. Reads of
+            resources not known to exist pass False. Defaults to True.
+
+    Returns:
+        dict[str, str]: Headers for the response; without an ETag when the versions cannot be read.
+    """
+    headers = {"Cache-Control": cache_control}
+    tokens = await versions.get(*names, mint=mint)
+    if tokens is not None:
+        headers["ETag"] = make_etag(REPRESENTATION_VERSION, *tokens, request.url.path, request.url.query)
+    return headers
+
+
+def not_modified(request: Request, headers: dict[str, str]) -> Response | None:
+    """
+    Answer a conditional GET whose client already holds the current representation.
+
+    Args:
+        request (Request): The incoming request.
+        headers (dict[str, str]): Headers from ``cache_validators``.
+
+    Returns:
+        Response | None: An empty 304 response if If-None-Match matches the ETag, None otherwise.
+    """
+    if "ETag" in headers and etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from src.database.pool import LatencyHistogram
+
+
+class BoundedExecutor:
+    """
+    Runs blocking calls off the event loop, at most ``max_workers`` at a time.
+
+    Callers over the cap wait on a semaphore in the loop rather than in the executor queue,
+    so the queue depth and the time spent waiting for a worker can be reported.
+    """
+
+    def __init__(self, max_workers: int, executor: Executor | None = None):
+        self.max_workers = max_workers
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self.running = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.wait_time = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # one semaphore per event loop: it is created in the loop serving requests, not the one importing the module
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._semaphore
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Call a blocking function on a worker and wait for its result.
+
+        Args:
+            func (Callable): Function to call.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            Any: The return value of the function.
+        """
+        submitted = time.perf_counter()
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        semaphore = self.semaphore
+        try:
+            await semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        started = time.perf_counter()
+        self.wait_time.observe(started - submitted)
+        self.running += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.executor.submit(partial(func, *args, **kwargs))
+        except BaseException:
+            self._finish(semaphore, started)
+            raise
+        # the slot is freed when the call ends on its worker, not when the caller stops waiting: a cancelled
+        # caller would otherwise let another call start while this one still runs
+        future.add_done_callback(lambda _: self._call_soon(loop, self._finish, semaphore, started))
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable, *args):
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # the loop is closed, and its semaphore with it
+            pass
+
+    def _finish(self, semaphore: asyncio.Semaphore, started: float):
+        self.running -= 1
+        self.completed += 1
+        self.run_time.observe(time.perf_counter() - started)
+        semaphore.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "running": self.running,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "completed": self.completed,
+            "wait_time": self.wait_time.snapshot(),
+            "run_time": self.run_time.snapshot(),
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,33 @@
+import hashlib
+
+
+def make_etag(*parts: str) -> str:
+    """
+    Build a strong entity tag from the parts that identify a representation.
+
+    Args:
+        *parts (str): Version tokens of the data shown and whatever else selects the representation.
+
+    Returns:
+        str: Quoted ETag.
+    """
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against the current ETag, with the weak comparison RFC 9110 prescribes for it.
+
+    Args:
+        if_none_match (str | None): Header value sent by the client.
+        etag (str): Current ETag.
+
+    Returns:
+        bool: True if the client holds the current representation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
@@ -0,0 +1,93 @@
+import os
+import re
+
+import anyio
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range ``Range`` header.
+
+    Args:
+        header (str): Value of the Range header.
+        size (int): Size of the file.
+
+    Returns:
+        tuple[int, int] | None: First and last byte offsets, inclusive, or None to send the whole file.
+
+    Raises:
+        ValueError: If the range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.fullmatch(header.strip())
+    if match is None:
+        # multiple ranges or another unit: serving the whole file is a valid answer
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+class RangeFileResponse(FileResponse):
+    """
+    File response that honours single byte ranges and lets the server send the file without copying it
+    through Python when it supports the ASGI zero-copy send or path send extensions.
+    """
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str | os.PathLike, range_header: str | None = None, **kwargs):
+        super().__init__(path, stat_result=os.stat(path), **kwargs)
+        self.headers["accept-ranges"] = "bytes"
+        self.range = None
+        if range_header:
+            size = self.stat_result.st_size
+            try:
+                self.range = parse_range(range_header, size)
+            except ValueError:
+                self.status_code = 416
+                self.headers["content-range"] = f"bytes */{size}"
+                self.headers["content-length"] = "0"
+                return
+            if self.range is not None:
+                start, end = self.range
+                self.status_code = 206
+                self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+                self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        if self.status_code == 200 and "http.response.pathsend" in extensions:
+            await super().__call__(scope, receive, send)
+            return
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        start, end = self.range or (0, self.stat_result.st_size - 1)
+        if self.status_code == 416 or scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            with open(self.path, "rb") as file:
+                await send({"type": "http.response.zerocopysend", "file": file.fileno(), "offset": start,
+                            "count": end - start + 1, "more_body": False})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                remaining = end - start + 1
+                more_body = True
+                while more_body:
+                    chunk = await file.read(min(self.chunk_size, remaining)) if remaining > 0 else b""
+                    remaining -= len(chunk)
+                    more_body = remaining > 0 and bool(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,24 @@
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    """
+    Detect an image format from the first bytes of a file.
+
+    Args:
+        head (bytes): At least the first 12 bytes of the file.
+
+    Returns:
+        str | None: Media type of the image, None if the bytes are not a supported image.
+    """
+    for signature, media_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return media_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
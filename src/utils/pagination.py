@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, image_id: int) -> str:
+    """
+    Build an opaque cursor pointing right after the given row.
+
+    Args:
+        created_at (datetime): Creation time of the last row of the page.
+        image_id (int): ID of the last row of the page.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    raw = json.dumps([created_at.isoformat(), image_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): Cursor received from the client.
+
+    Returns:
+        Tuple[datetime, int]: Creation time and ID of the row the page starts after.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, image_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(image_id)
+    except (TypeError, ValueError) as err:
+        raise ValueError("Invalid cursor") from err
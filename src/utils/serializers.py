@@ -0,0 +1,65 @@
+import enum
+import types
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+
+# Serialized as they are by orjson
+PLAIN_TYPES = (str, int, float, bool, datetime, date, dict, Any)
+
+
+def compile_serializer(model: type[BaseModel]) -> Callable[[Any], dict]:
+    """
+    Build a function that turns an object carrying the fields of a response model, such as an ORM row, into the
+    dict the model serializes to, for orjson to encode.
+
+    The object is trusted rather than validated: the work is reduced to one attribute read per field, planned once
+    here instead of on every response. Meant for rows whose column types already match the model. A field with a
+    string validation alias is read from the attribute of that name, as model validation from attributes does.
+
+    Args:
+        model (type[BaseModel]): Response model.
+
+    Returns:
+        Callable[[Any], dict]: The serializer.
+
+    Raises:
+        TypeError: If a field has a type the serializer cannot plan, e.g. a union of several types.
+    """
+    fields = [(name, field.validation_alias if isinstance(field.validation_alias, str) else name,
+               field.is_required(), field.default, plan(field.annotation))
+              for name, field in model.model_fields.items()]
+
+    def serialize(obj: Any) -> dict:
+        result = {}
+        for name, attribute, required, default, convert in fields:
+            value = getattr(obj, attribute) if required else getattr(obj, attribute, default)
+            result[name] = value if convert is None or value is None else convert(value)
+        return result
+
+    return serialize
+
+
+def plan(annotation: Any) -> Callable[[Any], Any] | None:
+    """
+    Plan the conversion of a field value, None when the value is encoded as it is.
+    """
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            raise TypeError(f"Cannot serialize a union of {args}")
+        return plan(args[0])
+    if origin in (list, List):
+        (item,) = get_args(annotation) or (Any,)
+        convert = plan(item)
+        return list if convert is None else lambda values: [convert(value) for value in values]
+    if origin in (dict, Dict) or annotation in PLAIN_TYPES:
+        return None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return compile_serializer(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return lambda value: value.value
+    raise TypeError(f"Cannot serialize {annotation}")
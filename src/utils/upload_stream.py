@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO
+
+from fastapi import HTTPException, Request, status
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+from src.utils.image_types import sniff_image_type
+
+
+SNIFF_SIZE = 16
+# room for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+@dataclass(slots=True)
+class StreamedUpload:
+    file: BinaryIO
+    filename: str | None
+    media_type: str
+    size: int
+    sha256: str
+
+    def close(self):
+        self.file.close()
+
+
+@dataclass(slots=True)
+class RejectedUpload:
+    filename: str | None
+    status_code: int
+    detail: str
+
+
+class UploadSink:
+    """
+    Receives the bytes of an uploaded file as they arrive: checks the image signature on the first bytes,
+    enforces the size limit, hashes the content and spools it, in memory up to ``spool_threshold`` bytes and
+    on disk after that.
+    """
+
+    def __init__(self, filename: str | None, max_size: int, spool_threshold: int, spool_dir: str | None = None):
+        self.filename = filename
+        self.max_size = max_size
+        self.file = SpooledTemporaryFile(max_size=spool_threshold, dir=spool_dir)
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.head = b""
+        self.media_type: str | None = None
+        self.pending: list[bytes] = []
+
+    def feed(self, data: bytes):
+        """
+        Validate and hash a chunk of the file, and queue it for writing.
+
+        Args:
+            data (bytes): Next chunk of the file.
+
+        Raises:
+            HTTPException: 413 if the file grows over the limit, 415 if it does not start like a supported image.
+        """
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"File is larger than {self.max_size} bytes")
+        if self.media_type is None:
+            self.head = (self.head + data)[:SNIFF_SIZE]
+            if len(self.head) == SNIFF_SIZE:
+                self.sniff()
+        self.hash.update(data)
+        self.pending.append(data)
+
+    def sniff(self):
+        self.media_type = sniff_image_type(self.head)
+        if self.media_type is None:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                                detail="Only JPEG, PNG, GIF and WebP images are accepted")
+
+    async def flush(self):
+        """
+        Write the queued chunks, off the event loop once the spool has moved to disk.
+        """
+        data, self.pending = b"".join(self.pending), []
+        if not data:
+            return
+        if self.file._rolled or self.file.tell() + len(data) > self.file._max_size:
+            await asyncio.to_thread(self.file.write, data)
+        else:
+            self.file.write(data)
+
+    async def finish(self) -> StreamedUpload:
+        await self.flush()
+        if self.media_type is None:
+            self.sniff()
+        self.file.seek(0)
+        return StreamedUpload(file=self.file, filename=self.filename, media_type=self.media_type, size=self.size,
+                              sha256=self.hash.hexdigest())
+
+
+async def receive_uploads(request: Request, field: str, max_files: int, max_size: int, spool_threshold: int,
+                          spool_dir: str | None = None,
+                          strict: bool = False) -> list[StreamedUpload | RejectedUpload]:
+    """
+    Read the files of a multipart request body while it streams in.
+
+    Unlike form parsing, which spools the whole body before the route runs, a file is rejected as soon as
+    its first bytes or its size give it away, and only the files themselves are kept.
+
+    Args:
+        request (Request): The incoming request.
+        field (str): Name of the form field carrying the files.
+        max_files (int): Most files accepted in one request.
+        max_size (int): Largest accepted file, in bytes.
+        spool_threshold (int): Files up to this size stay in memory.
+        spool_dir (str | None): Directory of the spool files, the system temp directory if None.
+        strict (bool): Fail the whole request on the first rejected file instead of reporting it in the list.
+
+    Returns:
+        list[StreamedUpload | RejectedUpload]: In body order, the spooled files, rewound, with their detected
+        media type, size and SHA-256, and the files that were rejected with the reason.
+
+    Raises:
+        HTTPException: 400 for a malformed body or too many files, 413 if the body is too large, 422 if the
+            field is missing. With ``strict``, also 413 and 415 for a rejected file.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a multipart/form-data body")
+    content_length = request.headers.get("content-length")
+    limit = max_files * (max_size + MULTIPART_OVERHEAD)
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"File is larger than {max_size} bytes" if max_files == 1
+                            else f"At most {max_files} files of {max_size} bytes are accepted")
+
+    entries: list[UploadSink | RejectedUpload] = []
+    part = {"headers": [], "name": b"", "value": b"", "target": None}
+
+    def reject(sink: UploadSink, err: HTTPException):
+        if strict:
+            raise err
+        sink.file.close()
+        entries[entries.index(sink)] = RejectedUpload(sink.filename, err.status_code, err.detail)
+
+    def on_part_begin():
+        part.update(headers=[], name=b"", value=b"", target=None)
+
+    def on_header_field(data: bytes, start: int, end: int):
+        part["name"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"].append((part["name"].lower(), part["value"]))
+        part["name"], part["value"] = b"", b""
+
+    def on_headers_finished():
+        disposition = dict(part["headers"]).get(b"content-disposition", b"")
+        _, options = parse_options_header(disposition)
+        if options.get(b"name", b"").decode("utf-8", "replace") == field and b"filename" in options:
+            if len(entries) == max_files:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail=f"More than one {field} part" if max_files == 1
+                                    else f"At most {max_files} files are accepted")
+            part["target"] = UploadSink(options[b"filename"].decode("utf-8", "replace"), max_size, spool_threshold,
+                                        spool_dir)
+            entries.append(part["target"])
+
+    def on_part_data(data: bytes, start: int, end: int):
+        # other parts are skipped, the files are the only thing read from the body
+        sink = part["target"]
+        if sink is not None:
+            try:
+                sink.feed(data[start:end])
+            except HTTPException as err:
+                part["target"] = None
+                reject(sink, err)
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for entry in entries:
+                if isinstance(entry, UploadSink) and entry.pending:
+                    await entry.flush()
+        parser.finalize()
+        if not entries:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Field {field} is required")
+        for entry in list(entries):
+            if isinstance(entry, UploadSink):
+                try:
+                    entries[entries.index(entry)] = await entry.finish()
+                except HTTPException as err:
+                    reject(entry, err)
+        return entries
+    except BaseException as err:
+        for entry in entries:
+            if not isinstance(entry, RejectedUpload):
+                entry.file.close()
+        if isinstance(err, MultipartParseError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed multipart body: {err}")
+        raise
+
+
+async def receive_upload(request: Request, field: str, max_size: int, spool_threshold: int,
+                         spool_dir: str | None = None) -> StreamedUpload:
+    """
+    Read one file from a multipart request body while it streams in, see ``receive_uploads``.
+
+    Args:
+        request (Request): The incoming request.
+        field (str): Name of the form field carrying the file.
+        max_size (int): Largest accepted file, in bytes.
+        spool_threshold (int): Files up to this size stay in memory.
+        spool_dir (str | None): Directory of the spool files, the system temp directory if None.
+
+    Returns:
+        StreamedUpload: The spooled file, rewound, with its detected media type, size and SHA-256.
+
+    Raises:
+        HTTPException: 400 for a malformed body, 413 if the file is too large, 415 if it is not a supported
+            image, 422 if the field is missing.
+    """
+    uploads = await receive_uploads(request, field, max_files=1, max_size=max_size, spool_threshold=spool_threshold,
+                                    spool_dir=spool_dir, strict=True)
+    return uploads[0]
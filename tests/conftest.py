@@ -1,19 +1,29 @@
 import asyncio
 
+import cloudinary.utils
+import httpx
 import pytest
 import pytest_asyncio
 import redis.asyncio as aioredis
-from unittest.mock import MagicMock
-from fastapi import FastAPI, Depends
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi_limiter import FastAPILimiter
 from fastapi.testclient import TestClient
+from redis.exceptions import WatchError
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from main import app
 from src.entity.models import Base, User
 from src.database.db import get_db
 from src.services.auth_service import auth_service
+from src.services.cloudinary_service import CloudinaryClient
+from src.services.image_cache_service import image_cache
+from src.services.storage_service import storage
+from src.services.user_cache_service import user_cache
+from src.services.versions_service import versions
 
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -22,6 +32,12 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# TestClient runs every request in its own event loop, so the app side gets unpooled async connections
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+
+AsyncTestingSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False,
+                                              bind=async_engine)
+
 test_user = {"username": "agent007",
              "first_name": "andrii",
              "last_name": "drovorub",
@@ -44,6 +60,163 @@ test_user = {"username": "agent007",
 #     init_models()
 
 
+@pytest.fixture(autouse=True)
+def user_cache_redis():
+    # Keep the user cache off the network and start every test with an empty local tier
+    user_cache.local.clear()
+    with patch.object(user_cache, "redis", new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        yield redis_mock
+    user_cache.local.clear()
+
+
+class DictRedis:
+    """
+    The few Redis commands the image cache and the resource versions use, over a dict, without expiry.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    @staticmethod
+    def encode(value):
+        return value.encode() if isinstance(value, str) else value
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = self.encode(value)
+        return True
+
+    async def mset(self, mapping):
+        self.data.update({key: self.encode(value) for key, value in mapping.items()})
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction=True):
+        return DictPipeline(self)
+
+
+class DictPipeline:
+    """
+    Queues commands on a DictRedis and runs them on execute. After watch, commands run at once until multi, and
+    execute fails with WatchError if a watched key changed in between.
+    """
+
+    def __init__(self, redis: DictRedis):
+        self.redis = redis
+        self.commands = []
+        self.watched = {}
+        self.immediate = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands.clear()
+        self.watched, self.immediate = {}, False
+
+    async def watch(self, *keys):
+        self.watched = {key: self.redis.data.get(key) for key in keys}
+        self.immediate = True
+
+    def multi(self):
+        self.immediate = False
+
+    def command(self, name, *args, **kwargs):
+        coroutine = getattr(self.redis, name)(*args, **kwargs)
+        if self.immediate:
+            return coroutine
+        self.commands.append(coroutine)
+        return self
+
+    def get(self, key):
+        return self.command("get", key)
+
+    def set(self, *args, **kwargs):
+        return self.command("set", *args, **kwargs)
+
+    def delete(self, *keys):
+        return self.command("delete", *keys)
+
+    async def execute(self):
+        if any(self.redis.data.get(key) != value for key, value in self.watched.items()):
+            for command in self.commands:
+                command.close()
+            self.commands.clear()
+            raise WatchError("Watched variable changed.")
+        return [await command for command in self.commands]
+
+
+@pytest.fixture(autouse=True)
+def image_cache_redis():
+    # Keep the image cache off the network: every lookup misses and loads from the database
+    with patch.object(image_cache, "redis", new_callable=AsyncMock) as redis_mock:
+        redis_mock.get.return_value = None
+        redis_mock.pipeline = MagicMock(return_value=DictPipeline(DictRedis()))
+        yield redis_mock
+
+
+@pytest.fixture(autouse=True)
+def versions_redis():
+    # No stored versions: every read draws a fresh token, so ETags never match unless a test brings a store
+    with patch.object(versions, "redis", new_callable=AsyncMock) as redis_mock:
+        redis_mock.mget.side_effect = lambda keys: [None] * len(keys)
+        redis_mock.get.return_value = None
+        redis_mock.pipeline = MagicMock(return_value=DictPipeline(DictRedis()))
+        yield redis_mock
+
+
+def build_cloudinary_stub(calls: list) -> FastAPI:
+    """
+    Local stand-in for the Cloudinary upload API: checks the request signature and records every call.
+    """
+    stub = FastAPI()
+
+    @stub.post("/v1_1/{cloud_name}/image/{action}")
+    async def image_action(cloud_name: str, action: str, request: Request):
+        form = await request.form()
+        params = {key: value for key, value in form.items() if key not in ("file", "signature", "api_key")}
+        if form.get("signature") != cloudinary.utils.api_sign_request(params, cloudinary.config().api_secret):
+            raise HTTPException(status_code=401, detail="Invalid Signature")
+        upload = form.get("file")
+        # remote URLs arrive as a plain field, files as a multipart part
+        content = upload if isinstance(upload, str) or upload is None else await upload.read()
+        # like Cloudinary, an upload that may not overwrite answers with the image already there
+        existing = params.get("overwrite") == "0" and any(
+            call["action"] == "upload" and call["params"].get("public_id") == params.get("public_id") for call in calls
+        )
+        calls.append({"action": action, "params": params, "content": content})
+
+        if action == "destroy":
+            return {"result": "ok"}
+        public_id = params.get("public_id") or f"{params.get('folder', 'stub')}/generated{len(calls)}"
+        response = {"public_id": public_id, "version": 1700000000 + len(calls),
+                    "url": f"http://res.cloudinary.com/{cloud_name}/image/upload/{public_id}"}
+        return {**response, "existing": True} if existing else response
+
+    return stub
+
+
+@pytest.fixture(autouse=True)
+def cloudinary_calls():
+    # Keep image storage off the network: the Cloudinary backend talks to the local stand-in instead
+    calls = []
+    stub_client = CloudinaryClient(api_url="http://cloudinary.stub/v1_1", cloud_name=cloudinary.config().cloud_name,
+                                   max_connections=4, timeout=5, connect_timeout=5,
+                                   transport=httpx.ASGITransport(app=build_cloudinary_stub(calls)))
+    with patch.object(storage, "client", stub_client):
+        yield calls
+
+
 @pytest.fixture(scope="module")
 def session():
     # Create the database
@@ -60,11 +233,9 @@ def session():
 @pytest.fixture(scope="module")
 def client(session):
     # Dependency override
-    def override_get_db():
-        try:
-            yield session
-        finally:
-            session.close()
+    async def override_get_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
 
     app.dependency_overrides[get_db] = override_get_db
 
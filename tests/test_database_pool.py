@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.database.pool import InstrumentedAsyncQueuePool, LatencyHistogram, get_pool_stats
+
+
+def test_latency_histogram_buckets():
+    histogram = LatencyHistogram(buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.01, 0.05, 3):
+        histogram.observe(seconds)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert snapshot["max"] == 3
+    assert [bucket["count"] for bucket in snapshot["buckets"]] == [2, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_counts_checkouts_and_timeouts(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+                                 poolclass=InstrumentedAsyncQueuePool, pool_size=2, max_overflow=0, pool_timeout=0.1)
+
+    async def hold_connection():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            await asyncio.sleep(0.3)
+
+    results = await asyncio.gather(*(hold_connection() for _ in range(3)), return_exceptions=True)
+    stats = get_pool_stats(engine.pool)
+    await engine.dispose()
+
+    assert sum(isinstance(result, exc.TimeoutError) for result in results) == 1
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["peak_checked_out"] == 2
+    assert stats["checked_out"] == 0
+    assert stats["wait_time"]["count"] == 3
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+import pytest
+
+from main import app
+from src.entity.models import Image, User
+from src.services.auth_service import auth_service
+from src.services.versions_service import versions
+from src.utils.conditional import etag_matches
+from tests.conftest import DictRedis, TestingSessionLocal
+
+
+@pytest.fixture(scope="module")
+def curator(client):
+    with TestingSessionLocal() as session:
+        user = User(username="curator", email="curator@gmail.com", password="secret", confirmed=True, role="admin")
+        session.add(user)
+        session.commit()
+        images = [Image(url=f"http://img/{i}", public_id=f"photo_share/{i}", description=f"photo {i}",
+                        user_id=user.id) for i in range(12)]
+        session.add_all(images)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+        image_ids = [image.id for image in images]
+
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    yield user, image_ids
+    del app.dependency_overrides[auth_service.get_current_user]
+
+
+@pytest.fixture
+def stored_versions():
+    with patch.object(versions, "redis", DictRedis()) as redis:
+        yield redis
+
+
+def revalidate(client, url, response):
+    return client.get(url, headers={"If-None-Match": response.headers["etag"]})
+
+
+def test_etag_matching():
+    assert etag_matches('"a", W/"b"', '"b"') and etag_matches("*", '"a"')
+    assert not etag_matches('"a"', '"b"') and not etag_matches(None, '"a"')
+
+
+def test_unchanged_image_is_not_sent_again(client, curator, stored_versions):
+    _, image_ids = curator
+    url = f"/api/images/{image_ids[0]}"
+
+    unversioned = client.get(url)
+    first = client.get(url)
+    with patch("src.repository.photo.get_photo_by_id") as get_photo_by_id:
+        unchanged = revalidate(client, url, first)
+    client.post(f"/api/comments/?image_id={image_ids[0]}", json={"comment": "changed"})
+    commented = revalidate(client, url, first)
+    client.get(f"/api/images/{image_ids[1]}")
+    other = client.get(f"/api/images/{image_ids[1]}")
+
+    assert unversioned.status_code == 200 and "etag" not in unversioned.headers
+    assert first.status_code == 200 and first.headers["cache-control"] == "private, no-cache"
+    assert unchanged.status_code == 304 and unchanged.content == b""
+    assert unchanged.headers["etag"] == first.headers["etag"]
+    get_photo_by_id.assert_not_called()
+    assert commented.status_code == 200 and commented.headers["etag"] != first.headers["etag"]
+    assert other.headers["etag"] not in (first.headers["etag"], commented.headers["etag"])
+
+
+def test_image_pages_change_with_their_images(client, curator, stored_versions):
+    _, image_ids = curator
+    first = client.get("/api/images/get_all?limit=10")
+    second = client.get("/api/images/get_all?limit=10&skip=10")
+    with patch("src.repository.photo.get_photo_all") as get_photo_all:
+        unchanged = revalidate(client, "/api/images/get_all?limit=10", first)
+    client.put(f"/api/images/{image_ids[5]}/update?description=renamed")
+    updated = revalidate(client, "/api/images/get_all?limit=10", first)
+    other_page = revalidate(client, "/api/images/get_all?limit=10&skip=10", second)
+
+    assert second.headers["etag"] != first.headers["etag"]
+    assert unchanged.status_code == 304
+    get_photo_all.assert_not_called()
+    assert updated.status_code == 200 and updated.json()[5]["description"] == "renamed"
+    assert other_page.status_code == 304
+
+
+def test_tag_reads_are_revalidated(client, curator, stored_versions):
+    client.post("/api/tags/", json={"tag_name": "sunset"})
+    tags = client.get("/api/tags/")
+    by_name = client.get("/api/tags/by_name/sunset")
+    unchanged = revalidate(client, "/api/tags/", tags)
+    client.post("/api/tags/", json={"tag_name": "sunrise"})
+    changed = revalidate(client, "/api/tags/", tags)
+
+    assert tags.headers["cache-control"] == "private, max-age=60"
+    assert by_name.status_code == 200 and by_name.headers["etag"] != tags.headers["etag"]
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200 and [tag["tag_name"] for tag in changed.json()] == ["sunset", "sunrise"]
+
+
+def test_versions_are_only_kept_for_existing_images(client, curator, stored_versions):
+    _, image_ids = curator
+    missing = client.get("/api/images/999999")
+    missing_comments = client.get("/api/images/999999/comments")
+    client.get(f"/api/images/{image_ids[11]}")
+    kept = set(stored_versions.data)
+    client.delete(f"/api/images/{image_ids[11]}")
+
+    assert missing.status_code == missing_comments.status_code == 404
+    assert not any(key.endswith(":999999") for key in kept)
+    assert f"version:image:{image_ids[11]}" in kept
+    assert f"version:image:{image_ids[11]}" not in stored_versions.data
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from main import app
+from src.entity.models import Comment, Image, Tag, User
+from src.services.auth_service import auth_service
+from tests.conftest import TestingSessionLocal, async_engine
+
+
+@pytest.fixture(scope="module")
+def images(client):
+    with TestingSessionLocal() as session:
+        user = User(username="gallery", email="gallery@gmail.com", password="secret", confirmed=True, role="admin")
+        session.add(user)
+        session.flush()
+        tags = [Tag(tag_name=f"tag{i}") for i in range(3)]
+        for i in range(60):
+            # pairs of images share created_at so keyset pagination has to break ties on id
+            image = Image(url=f"http://example.com/{i}.jpg", public_id=f"photo_share/{i}", user_id=user.id,
+                          description=f"Picture number {i}", tags=tags[:i % 3 + 1],
+                          created_at=datetime(2024, 3, 1) + timedelta(minutes=i // 2))
+            image.comments = [Comment(comment=f"comment {j}", user_id=user.id) for j in range(2)]
+            image.comment_count = 2
+            session.add(image)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    yield user
+    del app.dependency_overrides[auth_service.get_current_user]
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def count_statements(client, statements, url):
+    statements.clear()
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+    return len(statements), response.json()
+
+
+def test_get_all_query_count_is_independent_of_page_size(client, images, statements):
+    small, small_page = count_statements(client, statements, "/api/images/get_all?limit=10")
+    large, large_page = count_statements(client, statements, "/api/images/get_all?limit=50")
+
+    assert len(small_page) == 10
+    assert len(large_page) == 50
+    assert all(image["tags"] and image["comment_count"] == len(image["comments"]) == 2 for image in large_page)
+    assert small == large <= 3
+
+
+def test_search_query_count_is_independent_of_result_size(client, images, statements):
+    few, few_found = count_statements(client, statements, "/api/images/search?description=number 5")
+    many, many_found = count_statements(client, statements, "/api/images/search?description=picture&limit=100")
+
+    assert len(few_found) < len(many_found) == 60
+    assert few == many <= 3
+
+
+def test_get_all_cursor_pages_match_offset_pages(client, images):
+    offset_ids, cursor_ids = [], []
+    for skip in range(0, 60, 25):
+        response = client.get(f"/api/images/get_all?limit=25&skip={skip}")
+        offset_ids += [image["id"] for image in response.json()]
+
+    cursor = ""
+    while True:
+        response = client.get(f"/api/images/get_all?limit=25&cursor={cursor}")
+        cursor_ids += [image["id"] for image in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if len(response.json()) < 25:
+            assert cursor is None
+            break
+
+    assert cursor_ids == offset_ids
+    assert sorted(cursor_ids) == cursor_ids and len(cursor_ids) == 60
+
+
+def test_get_all_invalid_cursor(client, images):
+    response = client.get("/api/images/get_all?cursor=not-a-cursor")
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_search_is_case_insensitive_and_paginated(client, images):
+    first = client.get("/api/images/search?description=PICTURE number 1&limit=10").json()
+    second = client.get("/api/images/search?description=PICTURE number 1&limit=10&skip=10").json()
+
+    assert len(first) == 10 and len(second) == 1
+    assert all("number 1" in image["description"] for image in first + second)
+
+
+def test_image_responses_carry_latest_comments_and_full_history_is_paged(client, images):
+    with TestingSessionLocal() as session:
+        image = Image(url="http://example.com/viral.jpg", public_id="photo_share/viral", user_id=images.id,
+                      description="viral", comment_count=30)
+        image.comments = [Comment(comment=f"reply {j}", user_id=images.id,
+                                  created_at=datetime(2024, 3, 2) + timedelta(minutes=j)) for j in range(30)]
+        session.add(image)
+        session.commit()
+        image_id = image.id
+
+    detail = client.get(f"/api/images/{image_id}").json()
+    assert detail["comment_count"] == 30
+    assert [comment["comment"] for comment in detail["comments"]] == ["reply 29", "reply 28", "reply 27"]
+
+    pages = [client.get(f"/api/images/{image_id}/comments?limit=20&skip={skip}") for skip in (0, 20)]
+    assert [len(page.json()) for page in pages] == [20, 10]
+    assert pages[0].headers["X-Next-Cursor"] and "X-Next-Cursor" not in pages[1].headers
+    history = [comment["comment"] for page in pages for comment in page.json()]
+    assert history == [f"reply {j}" for j in range(29, -1, -1)]
+
+    created = client.post(f"/api/comments/?image_id={image_id}", json={"comment": "reply 30"}).json()
+    assert client.get(f"/api/images/{image_id}").json()["comment_count"] == 31
+    client.delete(f"/api/comments/{created['id']}")
+    assert client.get(f"/api/images/{image_id}").json()["comment_count"] == 30
+
+    assert client.get("/api/images/999999/comments").status_code == 404
@@ -0,0 +1,56 @@
+import pytest
+
+from main import app
+from src.entity.models import Image, User
+from src.services.auth_service import auth_service
+from tests.conftest import TestingSessionLocal
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"album photo" * 4
+JPEG = b"\xff\xd8\xff\xe0" + b"album photo" * 4
+GIF = b"GIF89a" + b"uploaded before" * 4
+
+
+@pytest.fixture(scope="module")
+def importer(client):
+    with TestingSessionLocal() as session:
+        user = User(username="importer", email="importer@gmail.com", password="secret", confirmed=True, role="user")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    yield user
+    del app.dependency_overrides[auth_service.get_current_user]
+
+
+def test_album_is_imported_in_one_request(client, importer, cloudinary_calls):
+    before = client.post("/api/images/upload?description=before", files={"file": ("old.gif", GIF, "image/gif")})
+    cloudinary_calls.clear()
+
+    response = client.post("/api/images/upload/bulk", files=[
+        ("files", ("beach.png", PNG, "image/png")),
+        ("files", ("sunset.jpg", JPEG, "image/jpeg")),
+        ("files", ("beach copy.png", PNG, "image/png")),
+        ("files", ("notes.txt", b"not a photo at all", "text/plain")),
+        ("files", ("old.gif", GIF, "image/gif")),
+    ])
+
+    assert response.status_code == 200, response.text
+    items = response.json()
+    assert [item["status_code"] for item in items] == [201, 201, 200, 415, 200]
+    assert items[0]["image"]["description"] == "beach.png"
+    assert items[2]["image"]["id"] == items[0]["image"]["id"]
+    assert items[3]["image"] is None and items[3]["detail"]
+    assert items[4]["image"]["id"] == before.json()["id"]
+    assert sorted(call["content"] for call in cloudinary_calls) == sorted([PNG, JPEG])
+    with TestingSessionLocal() as session:
+        assert session.query(Image).filter_by(user_id=importer.id).count() == 3
+
+
+def test_bulk_upload_limits_the_number_of_files(client, importer, monkeypatch):
+    monkeypatch.setattr("src.routes.photo.settings.upload_bulk_max_files", 2)
+    response = client.post("/api/images/upload/bulk", files=[("files", (f"{i}.png", PNG, "image/png"))
+                                                            for i in range(3)])
+    assert response.status_code == 400
@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+import pytest
+
+from main import app
+from src.conf.config import settings
+from src.entity.models import Image, User
+from src.services.auth_service import auth_service
+from tests.conftest import TestingSessionLocal
+
+
+PHOTO = b"\x89PNG\r\n\x1a\n" + b"same photo" * 10
+
+
+@pytest.fixture(scope="module")
+def users(client):
+    with TestingSessionLocal() as session:
+        created = [User(username=name, email=f"{name}@gmail.com", password="secret", confirmed=True, role="user")
+                   for name in ("twin", "copycat", "lookalike")]
+        session.add_all(created)
+        session.commit()
+        for user in created:
+            session.refresh(user)
+            session.expunge(user)
+    yield created
+    app.dependency_overrides.pop(auth_service.get_current_user, None)
+
+
+def upload_as(client, user, description):
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    return client.post(f"/api/images/upload?description={description}",
+                       files={"file": ("photo.png", PHOTO, "image/png")})
+
+
+def test_identical_uploads_share_one_asset(client, users, cloudinary_calls):
+    owner, other, third = users
+
+    first = upload_as(client, owner, "first")
+    again = upload_as(client, owner, "again")
+    separate = upload_as(client, other, "separate")
+    with patch.object(settings, "upload_dedup_scope", "global"):
+        shared = upload_as(client, third, "shared")
+
+    assert (first.status_code, again.status_code, separate.status_code, shared.status_code) == (201, 200, 201, 201)
+    assert again.json()["id"] == first.json()["id"]
+    assert separate.json()["public_id"] != first.json()["public_id"]
+    assert shared.json()["public_id"] == first.json()["public_id"]
+    assert [call["action"] for call in cloudinary_calls] == ["upload", "upload"]
+    with TestingSessionLocal() as session:
+        hashes = {image.content_hash for image in session.query(Image).filter(Image.user_id.in_(u.id for u in users))}
+        assert len(hashes) == 1 and len(hashes.pop()) == 64
+
+    cloudinary_calls.clear()
+    app.dependency_overrides[auth_service.get_current_user] = lambda: owner
+    assert client.delete(f"/api/images/{first.json()['id']}").status_code == 200
+    assert cloudinary_calls == []
+    app.dependency_overrides[auth_service.get_current_user] = lambda: third
+    assert client.delete(f"/api/images/{shared.json()['id']}").status_code == 200
+    assert [call["params"]["public_id"] for call in cloudinary_calls] == [first.json()["public_id"]]
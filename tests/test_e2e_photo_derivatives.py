@@ -0,0 +1,54 @@
+import pytest
+
+from main import app
+from src.entity.models import Image, ImageDerivative, User
+from src.services.auth_service import auth_service
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(scope="module")
+def source(client):
+    with TestingSessionLocal() as session:
+        user = User(username="editor", email="editor@gmail.com", password="secret", confirmed=True, role="user")
+        session.add(user)
+        session.flush()
+        image = Image(url="http://example.com/source.jpg", public_id="photo_share/source", user_id=user.id,
+                      description="Source")
+        session.add(image)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+        image_id = image.id
+
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    yield image_id
+    del app.dependency_overrides[auth_service.get_current_user]
+
+
+def test_repeated_transformations_return_the_same_derivative(client, source, cloudinary_calls):
+    first = client.post(f"/api/images/change_size?image_id={source}&width=300")
+    second = client.post(f"/api/images/change_size?image_id={source}&width=300")
+    other = client.post(f"/api/images/change_size?image_id={source}&width=400")
+    faded = [client.post(f"/api/images/fade_edges?image_id={source}") for _ in range(3)]
+
+    assert first.status_code == 201, first.text
+    assert first.json()["image"]["id"] == second.json()["image"]["id"]
+    assert other.json()["image"]["id"] != first.json()["image"]["id"]
+    assert len({response.json()["image"]["id"] for response in faded}) == 1
+    assert cloudinary_calls == []
+    with TestingSessionLocal() as session:
+        assert session.query(ImageDerivative).filter_by(source_image_id=source).count() == 3
+
+
+def test_deleting_the_source_removes_its_derivatives(client, source, cloudinary_calls):
+    resized = client.post(f"/api/images/change_size?image_id={source}&width=300").json()["image"]["id"]
+    chained = client.post(f"/api/images/black_white?image_id={resized}").json()["image"]["id"]
+
+    response = client.delete(f"/api/images/{source}")
+
+    assert response.status_code == 200, response.text
+    with TestingSessionLocal() as session:
+        assert session.get(Image, resized) is None
+        assert session.get(Image, chained) is None
+        assert session.query(ImageDerivative).count() == 0
+    assert [call["action"] for call in cloudinary_calls] == ["destroy"]
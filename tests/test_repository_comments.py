@@ -1,7 +1,7 @@
 from unittest.mock import MagicMock
 
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repository.comments import create_comment, update_comment, delete_comment
 from src.entity.models import Comment, User, Role
@@ -9,7 +9,9 @@ from src.entity.models import Comment, User, Role
 
 @pytest.fixture
 def db():
-    return MagicMock(spec=Session)
+    session = MagicMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock()
+    return session
 
 
 @pytest.mark.asyncio
@@ -33,7 +35,7 @@ async def test_update_comment(db):
 
     comment = Comment(id=comment_id, comment="Old comment", user_id=1)
 
-    db.query().filter().first.return_value = comment
+    db.execute.return_value.scalar_one_or_none.return_value = comment
 
     updated_comment = await update_comment(comment_id, new_comment, db, user)
 
@@ -48,7 +50,7 @@ async def test_delete_comment(db):
 
     comment = Comment(id=comment_id, comment="Test comment", user_id=1, image_id=1)
 
-    db.query().filter().first.return_value = comment
+    db.execute.return_value.scalar_one_or_none.return_value = comment
 
     result = await delete_comment(comment_id, db, user)
 
@@ -2,7 +2,7 @@ from unittest.mock import MagicMock
 
 import pytest
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.repository.image_link import create_qr
 from src.entity.models import Image, User
 from src.schemas.link_schemas import ImageTransformModel
@@ -10,7 +10,9 @@ from src.schemas.link_schemas import ImageTransformModel
 
 @pytest.fixture
 def db():
-    return MagicMock(spec=Session)
+    session = MagicMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock()
+    return session
 
 
 @pytest.mark.asyncio
@@ -18,7 +20,7 @@ async def test_create_qr_image_found(db):
     user = User(id=1, email="test@example.com")
     image = Image(id=1, url="http://example.com/image.jpg", qr_url=None)
 
-    db.query().filter().first.return_value = image
+    db.execute.return_value.scalar_one_or_none.return_value = image
 
     body = ImageTransformModel(id=1)
     result = await create_qr(body, db, user)
@@ -31,7 +33,7 @@ async def test_create_qr_image_found(db):
 async def test_create_qr_image_not_found(db):
     user = User(id=1, email="test@example.com")
 
-    db.query().filter().first.return_value = None
+    db.execute.return_value.scalar_one_or_none.return_value = None
 
     body = ImageTransformModel(id=999)  # Image with ID 999 does not exist
     with pytest.raises(HTTPException) as exc_info:
@@ -45,7 +47,7 @@ async def test_create_qr_image_with_qr_url(db):
     user = User(id=1, email="test@example.com")
     image = Image(id=1, url="http://example.com/image.jpg", qr_url="http://example.com/qr_code.png")
 
-    db.query().filter().first.return_value = image
+    db.execute.return_value.scalar_one_or_none.return_value = image
 
     body = ImageTransformModel(id=1)
     result = await create_qr(body, db, user)
@@ -59,7 +61,7 @@ async def test_create_qr_successful(db):
     user = User(id=1, email="test@example.com")
     image = Image(id=1, url="http://example.com/image.jpg", qr_url=None)
 
-    db.query().filter().first.return_value = image
+    db.execute.return_value.scalar_one_or_none.return_value = image
 
     body = ImageTransformModel(id=1)
     result = await create_qr(body, db, user)
@@ -1,18 +1,29 @@
 from unittest.mock import MagicMock
 
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
-from src.entity.models import Image, User, Tag
+from src.entity.models import Comment, Image, User, Tag
 from src.repository.photo import (
     add_image, get_photo_by_id, get_photo_by_desc, get_photo_all, update_photo,
-    delete_photo, change_size_photo, fade_edge_photo, black_white_photo, add_tag
+    delete_photo, change_size_photo, fade_edge_photo, black_white_photo, add_tag, description_search,
+    get_photo_by_content_hash
 )
 
 
 @pytest.fixture
 def db():
-    return MagicMock(spec=Session)
+    session = MagicMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock()
+    return session
+
+
+def query_result(rows):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = rows
+    return result
 
 
 @pytest.mark.asyncio
@@ -24,32 +35,35 @@ async def test_add_image(db):
 
 @pytest.mark.asyncio
 async def test_get_photo_by_desc(db):
-    photo = [Image(), Image(), Image()]
-    db.query().filter().all.return_value = photo
+    photo = [Image(id=1), Image(id=2), Image(id=3)]
+    db.execute.side_effect = [query_result(photo), query_result([])]
     result = await get_photo_by_desc("Test Description", db)
     assert isinstance(result, list)
+    assert all(image.recent_comments == [] for image in result)
 
 
 @pytest.mark.asyncio
 async def test_get_photo_by_id(db):
     photo = Image()
-    db.query().filter().first.return_value = photo
+    db.execute.return_value.scalar_one_or_none.return_value = photo
     result = await get_photo_by_id(1, db)
     assert photo.id == result.id
 
 
 @pytest.mark.asyncio
 async def test_get_photo_all(db):
-    photo = [Image(), Image(), Image()]
-    db.query().offset().limit().all.return_value = photo
+    photo = [Image(id=1), Image(id=2), Image(id=3)]
+    comments = [Comment(id=5, image_id=1), Comment(id=4, image_id=3), Comment(id=2, image_id=1)]
+    db.execute.side_effect = [query_result(photo), query_result(comments)]
     result = await get_photo_all(0, 10, db)
     assert isinstance(result, list)
+    assert [[comment.id for comment in image.recent_comments] for image in result] == [[5, 2], [], [4]]
 
 
 @pytest.mark.asyncio
 async def test_update_photo(db):
     photo = Image()
-    db.query().filter().first.return_value = photo
+    db.execute.return_value.scalar_one_or_none.return_value = photo
     result = await update_photo(1, "Updated Description", db)
     assert result.description == "Updated Description"
 
@@ -57,7 +71,7 @@ async def test_update_photo(db):
 @pytest.mark.asyncio
 async def test_delete_photo(db):
     photo = Image(public_id="1")
-    db.query().filter().first.return_value = photo
+    db.execute.return_value.scalar_one_or_none.return_value = photo
     result = await delete_photo(1, db)
     assert result.public_id == photo.public_id
 
@@ -69,6 +83,83 @@ async def test_change_size_photo(db):
         await change_size_photo(1, 100, db, user)
 
 
+@pytest.mark.asyncio
+async def test_change_size_photo_derives_without_upload(db, cloudinary_calls):
+    user = User(id=1)
+    source = Image(id=1, public_id="photo_share/source", user_id=1, description="Source")
+    db.execute.return_value.scalar_one_or_none.side_effect = [source, None]
+    db.refresh.side_effect = lambda image: setattr(image, "id", 2)
+
+    result = await change_size_photo(1, 300, db, user)
+
+    assert cloudinary_calls == []
+    assert result.image.public_id == "photo_share/source"
+    assert result.image.transformation == [{"width": 300, "crop": "pad"}]
+    assert "/c_pad,w_300/" in result.image.url
+
+
+@pytest.mark.asyncio
+async def test_black_white_of_derived_photo_chains_transformations(db):
+    user = User(id=1)
+    source = Image(id=2, public_id="photo_share/source", user_id=1, description="Source",
+                   transformation=[{"width": 300, "crop": "pad"}])
+    db.execute.return_value.scalar_one_or_none.side_effect = [source, None]
+    db.refresh.side_effect = lambda image: setattr(image, "id", 3)
+
+    result = await black_white_photo(2, db, user)
+
+    assert result.image.transformation == [{"width": 300, "crop": "pad"}, {"effect": "art:audrey"}]
+    assert "/c_pad,w_300/e_art:audrey/" in result.image.url
+
+
+@pytest.mark.asyncio
+async def test_change_size_photo_returns_existing_derivative(db, cloudinary_calls):
+    user = User(id=1)
+    source = Image(id=1, public_id="photo_share/source", user_id=1, description="Source")
+    derived = Image(id=5, url="http://example.com/derived.jpg", public_id="photo_share/source", user_id=1,
+                    description="Source", transformation=[{"width": 300, "crop": "pad"}])
+    db.execute.return_value.scalar_one_or_none.side_effect = [source, derived]
+
+    result = await change_size_photo(1, 300, db, user)
+
+    assert result.image.id == 5
+    db.add.assert_not_called()
+    db.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_delete_photo_keeps_shared_asset(db, cloudinary_calls):
+    db.execute.return_value.scalar_one_or_none.return_value = Image(id=1, public_id="photo_share/source")
+    db.execute.return_value.scalar.return_value = 1
+
+    await delete_photo(1, db)
+
+    assert cloudinary_calls == []
+    db.delete.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_delete_photo_removes_last_asset(db, cloudinary_calls):
+    db.execute.return_value.scalar_one_or_none.return_value = Image(id=1, public_id="photo_share/source")
+    db.execute.return_value.scalar.return_value = 0
+
+    await delete_photo(1, db)
+
+    assert [call["action"] for call in cloudinary_calls] == ["destroy"]
+
+
+@pytest.mark.asyncio
+async def test_delete_photo_keeps_asset_when_commit_fails(db, cloudinary_calls):
+    db.execute.return_value.scalar_one_or_none.return_value = Image(id=1, public_id="photo_share/source")
+    db.execute.return_value.scalar.return_value = 0
+    db.commit.side_effect = SQLAlchemyError("connection lost")
+
+    with pytest.raises(SQLAlchemyError):
+        await delete_photo(1, db)
+
+    assert cloudinary_calls == []
+
+
 @pytest.mark.asyncio
 async def test_fade_edge_photo(db):
     user = User(id=1)
@@ -87,7 +178,7 @@ async def test_black_white_photo(db):
 # async def test_black_white_photo(db):
 #     user = User(id=1)
 #     image = Image(id=1, user_id=1, description="some desc")
-#     db.query().filter().first.return_value = image
+#     db.execute.return_value.scalar_one_or_none.return_value = image
 #
 #     with patch("src.services.cloudinary_service.CloudImage.black_white") as mock_black_white:
 #         with patch("src.schemas.photo_schemas.ImageModel") as mock_ImageModel:
@@ -101,7 +192,7 @@ async def test_black_white_photo(db):
 
 @pytest.mark.asyncio
 async def test_add_tag_not_found(db):
-    db.query().filter().first.return_value = None
+    db.execute.return_value.scalar_one_or_none.return_value = None
     user = User(id=1)
     with pytest.raises(HTTPException) as exc:
         await add_tag(1, "Test Tag", db, user)
@@ -111,7 +202,7 @@ async def test_add_tag_not_found(db):
 @pytest.mark.asyncio
 async def test_add_tag_not_user_id(db):
     image = Image(id=1, user_id=2)
-    db.query().filter().first.return_value = image
+    db.execute.return_value.scalar_one_or_none.return_value = image
     user = User(id=1)
     with pytest.raises(HTTPException) as exc:
         await add_tag(1, "Test Tag", db, user)
@@ -121,8 +212,40 @@ async def test_add_tag_not_user_id(db):
 @pytest.mark.asyncio
 async def test_add_tag_over_five(db):
     image = Image(id=1, user_id=1, tags=[Tag(), Tag(), Tag(), Tag(), Tag()])
-    db.query().filter().first.return_value = image
+    db.execute.return_value.scalar_one_or_none.return_value = image
     user = User(id=1)
     with pytest.raises(HTTPException) as exc:
         await add_tag(1, "Test Tag", db, user)
     assert exc.value.detail == "Only five tags allowed"
+
+
+def test_description_search_postgresql():
+    stmt = description_search("Sunset 100%", "postgresql")
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    params = stmt.compile(dialect=postgresql.dialect()).params
+
+    assert "to_tsvector('simple'::regconfig, coalesce(images.description, '')) @@ plainto_tsquery" in sql
+    assert "lower(images.description) LIKE" in sql and "ESCAPE '/'" in sql
+    assert "lower(images.description) %" in sql
+    assert "ORDER BY ts_rank" in sql
+    assert "%sunset 100/%%" in params.values()
+
+
+def test_description_search_fallback():
+    sql = str(description_search("Sunset", "sqlite").compile(dialect=sqlite.dialect()))
+    assert "lower(images.description) LIKE" in sql
+    assert "to_tsvector" not in sql
+
+
+@pytest.mark.asyncio
+async def test_get_photo_by_content_hash(db):
+    photo = Image(content_hash="a" * 64)
+    db.execute.return_value.scalar_one_or_none.return_value = photo
+
+    assert await get_photo_by_content_hash("a" * 64, db, User(id=1)) is photo
+    own = str(db.execute.call_args.args[0].compile())
+    await get_photo_by_content_hash("a" * 64, db)
+    anyone = str(db.execute.call_args.args[0].compile())
+
+    assert "images.transformation IS NULL" in own and "images.user_id =" in own
+    assert "images.transformation IS NULL" in anyone and "images.user_id =" not in anyone
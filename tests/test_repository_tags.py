@@ -1,7 +1,7 @@
 from unittest.mock import MagicMock
 
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.entity.models import Tag
 from src.schemas.tag_schemas import TagModel
 from src.repository.tags import (
@@ -11,7 +11,9 @@ from src.repository.tags import (
 
 @pytest.fixture
 def db():
-    return MagicMock(spec=Session)
+    session = MagicMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock()
+    return session
 
 
 @pytest.mark.asyncio
@@ -24,7 +26,7 @@ async def test_tag_create(db):
 @pytest.mark.asyncio
 async def test_get_tag_by_id(db):
     tag = Tag()
-    db.execute().scalar.return_value = tag
+    db.execute.return_value.scalar.return_value = tag
     result = await get_tag_by_id(tag.id, db)
     assert result.id == tag.id
 
@@ -32,7 +34,7 @@ async def test_get_tag_by_id(db):
 @pytest.mark.asyncio
 async def test_get_tag_by_name(db):
     tag = Tag(tag_name="Test Tag")
-    db.execute().scalar.return_value = tag
+    db.execute.return_value.scalar.return_value = tag
     result = await get_tag_by_name(tag.tag_name, db)
     assert result.tag_name == "Test Tag"
 
@@ -40,7 +42,7 @@ async def test_get_tag_by_name(db):
 @pytest.mark.asyncio
 async def test_get_tags(db):
     tags = [Tag(), Tag(), Tag()]
-    db.execute().scalars().all.return_value = tags
+    db.execute.return_value.scalars.return_value.all.return_value = tags
     result = await get_tags(db)
     assert isinstance(result, list)
 
@@ -48,7 +50,7 @@ async def test_get_tags(db):
 @pytest.mark.asyncio
 async def test_update_tag(db):
     tag = Tag()
-    db.execute().scalar.return_value = tag
+    db.execute.return_value.scalar.return_value = tag
     body = TagModel(tag_name="Updated Tag")
     result = await update_tag(tag.id, body, db)
     assert result.tag_name == "updated tag"
@@ -57,6 +59,6 @@ async def test_update_tag(db):
 @pytest.mark.asyncio
 async def test_remove_tag_by_name(db):
     tag = Tag(tag_name="Test Tag")
-    db.execute().scalar.return_value = tag
+    db.execute.return_value.scalar.return_value = tag
     result = await remove_tag_by_name(tag.tag_name, db)
     assert result.tag_name == tag.tag_name
@@ -1,7 +1,7 @@
-from unittest.mock import Mock
+from unittest.mock import MagicMock
 
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.entity.models import User, Role
 from src.schemas.user_schemas import UserSchema
 from src.repository.users import (
@@ -12,13 +12,15 @@ from src.repository.users import (
 
 @pytest.fixture
 def db():
-    return Mock(Session)
+    session = MagicMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock()
+    return session
 
 
 @pytest.mark.asyncio
 async def test_get_user_by_email(db):
     user = User(email="test@example.com")
-    db.execute().scalar_one_or_none.return_value = user
+    db.execute.return_value.scalar_one_or_none.return_value = user
     result = await get_user_by_email(user.email, db)
     assert result.email == user.email
 
@@ -26,7 +28,7 @@ async def test_get_user_by_email(db):
 @pytest.mark.asyncio
 async def test_get_user_by_username(db):
     user = User(username="test_user")
-    db.execute().scalar_one_or_none.return_value = user
+    db.execute.return_value.scalar_one_or_none.return_value = user
     username = "test_user"
     result = await get_user_by_username(username, db)
     assert result.username == "test_user"
@@ -50,6 +52,6 @@ async def test_update_avatar_url(db):
 
 @pytest.mark.asyncio
 async def test_get_total_users_count(db):
-    db.execute().scalar.return_value = 3
+    db.execute.return_value.scalar.return_value = 3
     result = await get_total_users_count(db)
     assert isinstance(result, int)
@@ -0,0 +1,183 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from jose import ExpiredSignatureError, JWTError, jwt
+from redis.exceptions import RedisError
+
+from src.entity.models import Role, User
+from src.repository import users as repository_users
+from src.services.auth_service import auth_service
+from src.services.user_cache_service import CachedUser, UserCache, serialize_user, user_cache
+from src.utils.ttl_cache import TTLCache
+
+
+def make_user(**kwargs):
+    return User(id=1, username="tester", email="test@example.com", role=Role.user, confirmed=True, **kwargs)
+
+
+@pytest.fixture
+def cache(user_cache_redis):
+    return user_cache_redis
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_cache_miss(cache):
+    cache.get.return_value = None
+    user = make_user()
+    token = await auth_service.create_access_token(data={"sub": user.email})
+
+    with patch("src.repository.users.get_user_by_email", AsyncMock(return_value=user)):
+        result = await auth_service.get_current_user(token, MagicMock())
+
+    assert isinstance(result, CachedUser)
+    assert result.email == user.email
+    cache.set.assert_awaited_once_with(user.email, serialize_user(user), ex=300)
+    cache.expire.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_cache_hit(cache):
+    cache.get.return_value = serialize_user(make_user(avatar="http://example.com/avatar.jpg"))
+    token = await auth_service.create_access_token(data={"sub": "test@example.com"})
+
+    with patch("src.repository.users.get_user_by_email", AsyncMock()) as get_user_mock:
+        result = await auth_service.get_current_user(token, MagicMock())
+
+    assert result == CachedUser.from_user(make_user(avatar="http://example.com/avatar.jpg"))
+    get_user_mock.assert_not_called()
+    cache.set.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_local_hit(cache):
+    cache.get.return_value = serialize_user(make_user())
+    token = await auth_service.create_access_token(data={"sub": "test@example.com"})
+
+    first = await auth_service.get_current_user(token, MagicMock())
+    second = await auth_service.get_current_user(token, MagicMock())
+
+    assert first is second
+    cache.get.assert_awaited_once_with("test@example.com")
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_stale_cache_version(cache):
+    cache.get.return_value = b'[0,1,"tester"]'
+    token = await auth_service.create_access_token(data={"sub": "test@example.com"})
+
+    with patch("src.repository.users.get_user_by_email", AsyncMock(return_value=make_user())) as get_user_mock:
+        result = await auth_service.get_current_user(token, MagicMock())
+
+    assert result.username == "tester"
+    get_user_mock.assert_awaited_once()
+    cache.set.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_refresh_token_rejected(cache):
+    token = await auth_service.create_refresh_token(data={"sub": "test@example.com"})
+    with pytest.raises(HTTPException) as exc:
+        await auth_service.get_current_user(token, MagicMock())
+    assert exc.value.status_code == 401
+    cache.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_local_entry_and_notifies_workers(cache):
+    await user_cache.set(make_user())
+
+    await user_cache.invalidate("test@example.com")
+
+    assert user_cache.local.get("test@example.com") is None
+    cache.delete.assert_awaited_once_with("test@example.com")
+    cache.publish.assert_awaited_once_with(UserCache.CHANNEL, "test@example.com")
+
+
+@pytest.mark.asyncio
+async def test_invalidate_survives_redis_errors(cache):
+    cache.delete.side_effect = RedisError("down")
+    await user_cache.set(make_user())
+
+    await user_cache.invalidate("test@example.com")
+
+    assert user_cache.local.get("test@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_survives_redis_outage(cache):
+    cache.get.side_effect = RedisError("down")
+    cache.set.side_effect = RedisError("down")
+    token = await auth_service.create_access_token(data={"sub": "test@example.com"})
+
+    with patch("src.repository.users.get_user_by_email", AsyncMock(return_value=make_user())) as get_user_mock:
+        result = await auth_service.get_current_user(token, MagicMock())
+
+    assert result.email == "test@example.com"
+    get_user_mock.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_update_avatar_invalidates_cache():
+    user = make_user()
+    with patch("src.repository.users.get_user_by_email", AsyncMock(return_value=user)), \
+            patch.object(user_cache, "invalidate", AsyncMock()) as invalidate_mock:
+        await repository_users.update_avatar_url(user.email, "http://example.com/new.jpg", AsyncMock())
+    invalidate_mock.assert_awaited_once_with(user.email)
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0.0]
+    local = TTLCache(maxsize=2, ttl=5, timer=lambda: now[0])
+    local.set("a", 1)
+    local.set("b", 2)
+    local.get("a")
+    local.set("c", 3)
+
+    assert local.get("b") is None
+    assert local.get("a") == 1
+    now[0] = 5
+    assert local.get("a") is None
+    assert local.get("c") is None
+
+
+@pytest.mark.asyncio
+async def test_decode_token_verifies_signature_once():
+    token = await auth_service.create_access_token(data={"sub": "cached@example.com"})
+
+    with patch("src.services.auth_service.jwt.decode", wraps=jwt.decode) as decode_mock:
+        first = auth_service.decode_token(token)
+        second = auth_service.decode_token(token)
+
+    assert first == second
+    assert first["sub"] == "cached@example.com"
+    decode_mock.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_decode_token_drops_claims_at_expiry():
+    now = [0.0]
+    token = await auth_service.create_access_token(data={"sub": "expiring@example.com"}, expires_delta=60)
+
+    with patch.object(auth_service, "token_cache", TTLCache(maxsize=8, ttl=0, timer=lambda: now[0])), \
+            patch("src.services.auth_service.jwt.decode", wraps=jwt.decode) as decode_mock:
+        auth_service.decode_token(token)
+        now[0] = 30
+        auth_service.decode_token(token)
+        assert decode_mock.call_count == 1
+
+        now[0] = 61
+        decode_mock.side_effect = ExpiredSignatureError("Signature has expired.")
+        with pytest.raises(JWTError):
+            auth_service.decode_token(token)
+    assert decode_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_refresh_token_still_rejected_as_access_token(cache):
+    token = await auth_service.create_refresh_token(data={"sub": "test@example.com"})
+    assert await auth_service.decode_refresh_token(token) == "test@example.com"
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_service.get_current_user(token, MagicMock())
+    assert exc.value.status_code == 401
@@ -0,0 +1,79 @@
+import asyncio
+from io import BytesIO
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from src.services.cloudinary_service import CloudinaryClient
+from src.services.storage_service import storage
+
+
+@pytest.mark.asyncio
+async def test_put_sends_signed_file(cloudinary_calls):
+    stored = await storage.put(BytesIO(b"image bytes"), "photo_share/test")
+
+    assert stored.public_id == "photo_share/test"
+    assert cloudinary_calls == [{"action": "upload", "params": {"public_id": "photo_share/test", "overwrite": "0",
+                                                                "timestamp": cloudinary_calls[0]["params"]["timestamp"]},
+                                 "content": b"image bytes"}]
+    assert stored.url.endswith(f"/v{stored.version}/photo_share/test")
+
+
+@pytest.mark.asyncio
+async def test_put_overwrite(cloudinary_calls):
+    await storage.put(b"avatar", "avatars/test", overwrite=True)
+
+    assert cloudinary_calls[0]["params"]["overwrite"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_put_refuses_to_overwrite(cloudinary_calls):
+    await storage.put(b"first", "photo_share/taken")
+    with pytest.raises(HTTPException) as exc:
+        await storage.put(b"second", "photo_share/taken")
+
+    assert exc.value.status_code == 409
+    assert [call["params"]["overwrite"] for call in cloudinary_calls] == ["0", "0"]
+
+
+@pytest.mark.asyncio
+async def test_transform_uploads_transformed_url(cloudinary_calls):
+    stored = await storage.transform("photo_share/source", {"width": 300, "crop": "pad"})
+
+    assert stored.public_id.startswith("photo_share/")
+    assert cloudinary_calls[0]["params"]["folder"] == "photo_share"
+    assert "/c_pad,w_300/" in cloudinary_calls[0]["content"]
+    assert cloudinary_calls[0]["content"].endswith("/photo_share/source")
+
+
+@pytest.mark.asyncio
+async def test_delete(cloudinary_calls):
+    assert await storage.delete("photo_share/test") == "photo_share/test deleted"
+    assert cloudinary_calls[0]["action"] == "destroy"
+    assert cloudinary_calls[0]["params"]["public_id"] == "photo_share/test"
+
+
+def test_url_with_transformation():
+    url = storage.url("photo_share/test", 5, {"width": 250, "height": 250, "crop": "fill"})
+    assert url.endswith("/image/upload/c_fill,h_250,w_250/v5/photo_share/test")
+
+
+@pytest.mark.asyncio
+async def test_storage_error_is_reported_as_bad_gateway():
+    transport = httpx.MockTransport(lambda request: httpx.Response(500, json={"error": {"message": "boom"}}))
+    client = CloudinaryClient("http://cloudinary.stub/v1_1", "demo", max_connections=1, timeout=1,
+                              connect_timeout=1, transport=transport)
+
+    with pytest.raises(HTTPException) as exc:
+        await client.call("destroy", {"public_id": "photo_share/test"})
+    assert exc.value.status_code == 502
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_reuses_one_connection_pool(cloudinary_calls):
+    await asyncio.gather(*(storage.delete(f"photo_share/{i}") for i in range(8)))
+
+    assert len(cloudinary_calls) == 8
+    assert storage.client.client is storage.client.client
@@ -0,0 +1,128 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from main import app
+from src.entity.models import Image, User
+from src.services.auth_service import auth_service
+from src.services.image_cache_service import ImageCache, image_cache
+from tests.conftest import DictRedis, TestingSessionLocal
+
+
+def counting_loader(payload, delay=0.0):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return payload
+
+    return load, calls
+
+
+@pytest.mark.asyncio
+async def test_miss_loads_once_then_hits():
+    cache = ImageCache(DictRedis(), ttl=60, lock_timeout=1)
+    load, calls = counting_loader(b'{"id":1}')
+    missing, missing_calls = counting_loader(None)
+
+    results = [await cache.get(1, load) for _ in range(3)]
+    assert [await cache.get(2, missing), await cache.get(2, missing)] == [None, None]
+
+    assert results == [b'{"id":1}'] * 3
+    assert (len(calls), len(missing_calls)) == (1, 2)
+    stats = cache.snapshot_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 3, 0.4)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    redis = DictRedis()
+    cache = ImageCache(redis, ttl=60, lock_timeout=1, poll_interval=0.01)
+    other_worker = ImageCache(redis, ttl=60, lock_timeout=1, poll_interval=0.01)
+    load, calls = counting_loader(b"detail", delay=0.05)
+
+    results = await asyncio.gather(*(cache.get(1, load) for _ in range(20)), other_worker.get(1, load))
+
+    assert results == [b"detail"] * 21
+    assert len(calls) == 1
+    assert cache.stats["coalesced"] == 19 and other_worker.stats["lock_waits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_is_not_overwritten():
+    redis = DictRedis()
+    cache = ImageCache(redis, ttl=60, lock_timeout=1)
+    load, _ = counting_loader(b"stale", delay=0.05)
+
+    pending = asyncio.ensure_future(cache.get(1, load))
+    await asyncio.sleep(0.01)
+    await cache.invalidate(1)
+
+    assert await pending == b"stale"
+    assert redis.data == {}
+
+
+@pytest.mark.asyncio
+async def test_invalidation_while_storing_is_not_overwritten():
+    class InvalidatedOnMulti(DictRedis):
+        def pipeline(self, transaction=True):
+            pipe = super().pipeline(transaction)
+            multi = pipe.multi
+
+            def invalidate_then_multi():
+                # lands between the lock check and the write
+                self.data.clear()
+                multi()
+
+            pipe.multi = invalidate_then_multi
+            return pipe
+
+    redis = InvalidatedOnMulti()
+    cache = ImageCache(redis, ttl=60, lock_timeout=1)
+    load, _ = counting_loader(b"stale")
+
+    assert await cache.get(1, load) == b"stale"
+    assert redis.data == {}
+
+
+@pytest.fixture(scope="module")
+def viewer(client):
+    with TestingSessionLocal() as session:
+        user = User(username="viewer", email="viewer@gmail.com", password="secret", confirmed=True, role="admin")
+        session.add(user)
+        session.commit()
+        image = Image(url="http://img/popular", public_id="photo_share/popular", description="popular",
+                      user_id=user.id)
+        session.add(image)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+        image_id = image.id
+
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    yield user, image_id
+    del app.dependency_overrides[auth_service.get_current_user]
+
+
+def test_image_detail_is_cached_until_a_write(client, viewer):
+    user, image_id = viewer
+    redis = DictRedis()
+
+    with patch.object(image_cache, "redis", redis):
+        first = client.get(f"/api/images/{image_id}")
+        with patch("src.repository.photo.get_photo_by_id") as get_photo_by_id:
+            cached = client.get(f"/api/images/{image_id}")
+        client.post(f"/api/comments/?image_id={image_id}", json={"comment": "nice"})
+        commented = client.get(f"/api/images/{image_id}")
+        client.put(f"/api/images/{image_id}/update?description=renamed")
+        renamed = client.get(f"/api/images/{image_id}")
+
+    assert first.status_code == cached.status_code == 200
+    assert cached.json() == first.json() and first.json()["comments"] == []
+    get_photo_by_id.assert_not_called()
+    assert [comment["comment"] for comment in commented.json()["comments"]] == ["nice"]
+    assert commented.json()["comment_count"] == first.json()["comment_count"] + 1
+    assert renamed.json()["description"] == "renamed"
+    assert client.get("/api/images/999999").status_code == 404
@@ -0,0 +1,143 @@
+import asyncio
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from main import app
+from src.services.image_engine import ImageEngine, UnsupportedTransformation, render_image
+from src.services.storage_service import LocalStorage, get_storage, parse_transformation, transformation_to_string
+
+
+def make_image(size=(400, 300), image_format="JPEG") -> bytes:
+    output = BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(output, format=image_format)
+    return output.getvalue()
+
+
+def open_image(data: bytes) -> Image.Image:
+    return Image.open(BytesIO(data))
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = ImageEngine(max_workers=1)
+    yield engine
+    engine.shutdown()
+
+
+@pytest.fixture
+def local_storage(tmp_path, engine):
+    return LocalStorage(str(tmp_path), "/api/storage", engine=engine)
+
+
+def test_resize_keeps_aspect_ratio():
+    image = open_image(render_image(make_image(), [{"width": 200, "crop": "pad"}]))
+    assert (image.size, image.format) == ((200, 150), "JPEG")
+
+
+def test_fill_crops_to_box():
+    image = open_image(render_image(make_image(image_format="PNG"), [{"width": 100, "height": 100, "crop": "fill"}]))
+    assert (image.size, image.format) == ((100, 100), "PNG")
+
+
+def test_limit_only_scales_down():
+    smaller = open_image(render_image(make_image(), [{"width": 200, "crop": "limit"}]))
+    unchanged = open_image(render_image(make_image(), [{"width": 1600, "crop": "limit"}]))
+    assert (smaller.size, unchanged.size) == ((200, 150), (400, 300))
+
+
+def test_vignette_darkens_corners_only():
+    image = open_image(render_image(make_image(image_format="PNG"), [{"effect": "vignette"}]))
+    assert image.getpixel((0, 0)) == (0, 0, 0)
+    assert image.getpixel((200, 150)) == (200, 120, 40)
+
+
+def test_black_white_is_grayscale():
+    image = open_image(render_image(make_image(), [{"width": 100, "crop": "pad"}, {"effect": "art:audrey"}]))
+    assert (image.mode, image.size) == ("L", (100, 75))
+
+
+def test_unsupported_transformation():
+    with pytest.raises(UnsupportedTransformation):
+        render_image(make_image(), [{"effect": "cartoonify"}])
+
+
+def test_parse_transformation_round_trip():
+    steps = [{"width": 300, "crop": "pad"}, {"effect": "art:audrey"}]
+    assert parse_transformation(transformation_to_string(steps)) == steps
+    with pytest.raises(ValueError):
+        parse_transformation("x_1")
+
+
+@pytest.mark.asyncio
+async def test_engine_renders_in_worker_process(engine):
+    data = await engine.render(make_image(), [{"width": 40, "crop": "pad"}])
+    assert open_image(data).size == (40, 30)
+    assert engine.pool.completed >= 1
+
+
+@pytest.mark.asyncio
+async def test_transform_stores_new_image(local_storage):
+    await local_storage.put(make_image(), "photo_share/source")
+
+    stored = await local_storage.transform("photo_share/source", {"effect": "grayscale"})
+
+    assert stored.public_id.startswith("photo_share/")
+    assert open_image(await local_storage.get(stored.public_id)).mode == "L"
+
+
+@pytest.mark.asyncio
+async def test_transformed_url_is_rendered_once(local_storage):
+    await local_storage.put(make_image(), "photo_share/source")
+    url = local_storage.url("photo_share/source", transformation=[{"width": 100, "crop": "pad"}])
+    app.dependency_overrides[get_storage] = lambda: local_storage
+    try:
+        client = TestClient(app)
+        first = client.get(url)
+        rendered = local_storage.derived_path("photo_share/source", "c_pad,w_100")
+        modified = rendered.stat().st_mtime_ns
+        second = client.get(url)
+        unsigned = client.get("/api/storage/photo_share/source?t=c_pad,w_4000")
+        signature = local_storage.sign("photo_share/source", "e_cartoonify")
+        invalid = client.get(f"/api/storage/photo_share/source?t=e_cartoonify&s={signature}")
+    finally:
+        del app.dependency_overrides[get_storage]
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers["content-type"] == "image/jpeg"
+    assert open_image(first.content).size == (100, 75)
+    assert rendered.stat().st_mtime_ns == modified
+    assert unsigned.status_code == 403
+    assert invalid.status_code == 400
+
+    await local_storage.delete("photo_share/source")
+    assert not rendered.exists()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_render(local_storage, engine):
+    await local_storage.put(make_image(), "photo_share/source")
+    signature = local_storage.sign("photo_share/source", "c_pad,w_100")
+
+    with patch.object(engine, "render", wraps=engine.render) as render:
+        paths = await asyncio.gather(*(local_storage.render("photo_share/source", "c_pad,w_100", signature)
+                                       for _ in range(8)))
+
+    assert render.call_count == 1
+    assert set(paths) == {local_storage.derived_path("photo_share/source", "c_pad,w_100")}
+    assert open_image(paths[0].read_bytes()).size == (100, 75)
+    assert [file.name for file in paths[0].parent.iterdir()] == [paths[0].name]
+    assert local_storage.inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_transform_without_engine(tmp_path):
+    storage = LocalStorage(str(tmp_path), "/api/storage")
+    await storage.put(make_image(), "photo_share/source")
+    with pytest.raises(HTTPException) as exc:
+        await storage.transform("photo_share/source", {"effect": "grayscale"})
+    assert exc.value.status_code == 501
@@ -0,0 +1,214 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from main import app
+from src.entity.models import Image, ImageDerivative, User
+from src.services import photo_jobs
+from src.services.auth_service import auth_service
+from src.services.job_queue import Job, JobStatus, MemoryJobQueue, PermanentJobError, job_queue
+from tests.conftest import AsyncTestingSessionLocal, TestingSessionLocal
+
+
+async def wait_for(queue, job_id, timeout=5):
+    async def finished():
+        while (await queue.get(job_id)).status not in (JobStatus.succeeded, JobStatus.failed):
+            await asyncio.sleep(0.01)
+        return await queue.get(job_id)
+
+    return await asyncio.wait_for(finished(), timeout)
+
+
+@pytest.fixture
+def queue():
+    return MemoryJobQueue(retry_backoff=0.01)
+
+
+@pytest.mark.asyncio
+async def test_job_result_is_stored(queue):
+    async def handler(payload):
+        return {"double": payload["value"] * 2}
+
+    queue.register("double", handler, max_concurrency=1, max_retries=0)
+    job = await queue.enqueue("double", {"value": 21}, user_id=1)
+    done = await wait_for(queue, job.id)
+    await queue.stop()
+
+    assert (done.status, done.result, done.attempts, done.user_id) == (JobStatus.succeeded, {"double": 42}, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried(queue):
+    calls = []
+
+    async def flaky(payload):
+        calls.append(payload)
+        if len(calls) < 3:
+            raise ConnectionError("storage unavailable")
+        return "ok"
+
+    queue.register("flaky", flaky, max_concurrency=1, max_retries=3)
+    job = await queue.enqueue("flaky", {}, user_id=1)
+    done = await wait_for(queue, job.id)
+    stats = (await queue.stats())["flaky"]
+    await queue.stop()
+
+    assert (done.status, done.attempts, done.error) == (JobStatus.succeeded, 3, None)
+    assert (stats["retried"], stats["succeeded"], stats["failed"]) == (2, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_job_fails_after_retries_or_on_permanent_error(queue):
+    failures = []
+
+    async def broken(payload):
+        raise PermanentJobError("Image not found") if payload["permanent"] else RuntimeError("boom")
+
+    queue.register("broken", broken, max_concurrency=1, max_retries=2, on_failure=failures.append)
+    retried = await queue.enqueue("broken", {"permanent": False}, user_id=1)
+    permanent = await queue.enqueue("broken", {"permanent": True}, user_id=1)
+    retried, permanent = await wait_for(queue, retried.id), await wait_for(queue, permanent.id)
+    await queue.stop()
+
+    assert (retried.status, retried.attempts, retried.error) == (JobStatus.failed, 3, "boom")
+    assert (permanent.status, permanent.attempts, permanent.error) == (JobStatus.failed, 1, "Image not found")
+    assert failures == [{"permanent": True}, {"permanent": False}]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped_per_type(queue):
+    running, peak = 0, 0
+
+    async def slow(payload):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    queue.register("slow", slow, max_concurrency=2, max_retries=0)
+    queue.register("idle", slow, max_concurrency=1, max_retries=0)
+    jobs = [await queue.enqueue("slow", {}, user_id=1) for _ in range(6)]
+    stats = await queue.stats()
+    for job in jobs:
+        await wait_for(queue, job.id)
+    await queue.stop()
+
+    assert peak == 2
+    assert stats["slow"]["queued"] == 6 and stats["slow"]["max_concurrency"] == 2
+    assert stats["idle"]["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_a_failing_failure_hook(queue):
+    def on_failure(payload):
+        raise RuntimeError("cleanup failed")
+
+    async def handler(payload):
+        if payload["fail"]:
+            raise PermanentJobError("bad input")
+        return "ok"
+
+    queue.register("hooked", handler, max_concurrency=1, max_retries=0, on_failure=on_failure)
+    await queue.enqueue("hooked", {"fail": True}, user_id=1)
+    job = await queue.enqueue("hooked", {"fail": False}, user_id=1)
+    done = await wait_for(queue, job.id)
+    await queue.stop()
+
+    assert done.status == JobStatus.succeeded
+
+
+@pytest.mark.asyncio
+async def test_expired_jobs_are_dropped():
+    queue = MemoryJobQueue(retry_backoff=0.01, ttl=60)
+    queue.register("noop", lambda payload: None, max_concurrency=1, max_retries=0)
+    old = Job(id="old", type="noop", user_id=1, payload={}, updated_at=time.time() - 120)
+    await queue.save(old)
+    await queue.save(Job(id="new", type="noop", user_id=1, payload={}))
+
+    assert await queue.get("old") is None and await queue.get("new") is not None
+
+
+@pytest.mark.asyncio
+async def test_enqueue_rejects_unknown_type(queue):
+    with pytest.raises(ValueError):
+        await queue.enqueue("missing", {}, user_id=1)
+
+
+@pytest.fixture(scope="module")
+def owner(client):
+    with TestingSessionLocal() as session:
+        user = User(username="worker", email="worker@gmail.com", password="secret", confirmed=True, role="user")
+        other = User(username="stranger", email="stranger@gmail.com", password="secret", confirmed=True,
+                     role="user")
+        session.add_all([user, other])
+        session.flush()
+        image = Image(url="http://example.com/queued.jpg", public_id="photo_share/queued", user_id=user.id,
+                      description="Queued")
+        session.add(image)
+        session.commit()
+        for instance in (user, other):
+            session.refresh(instance)
+            session.expunge(instance)
+        image_id = image.id
+
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    with patch.object(photo_jobs, "session_factory", AsyncTestingSessionLocal), patch.object(job_queue, "start"):
+        yield user, other, image_id
+    del app.dependency_overrides[auth_service.get_current_user]
+
+
+def test_background_transformation_is_polled_to_its_result(client, owner):
+    user, other, image_id = owner
+
+    response = client.post(f"/api/images/change_size?image_id={image_id}&width=300&background=true")
+
+    assert response.status_code == 202, response.text
+    job_id = response.json()["id"]
+    assert response.headers["location"] == f"/api/jobs/{job_id}"
+    assert client.get(f"/api/jobs/{job_id}").json()["status"] == JobStatus.queued
+
+    asyncio.run(job_queue.run_job(job_queue.jobs[job_id]))
+
+    job = client.get(f"/api/jobs/{job_id}").json()
+    assert job["status"] == JobStatus.succeeded, job
+    assert job["result"]["image"]["transformation"] == [{"width": 300, "crop": "pad"}]
+    with TestingSessionLocal() as session:
+        assert session.query(ImageDerivative).filter_by(source_image_id=image_id).count() == 1
+
+    app.dependency_overrides[auth_service.get_current_user] = lambda: other
+    try:
+        assert client.get(f"/api/jobs/{job_id}").status_code == 404
+    finally:
+        app.dependency_overrides[auth_service.get_current_user] = lambda: user
+
+
+def test_background_upload_removes_spooled_file(client, owner, cloudinary_calls):
+    response = client.post("/api/images/upload?description=Later&background=true",
+                           files={"file": ("photo.jpg", b"\xff\xd8\xff\xe0 image", "image/jpeg")})
+
+    assert response.status_code == 202, response.text
+    job = job_queue.jobs[response.json()["id"]]
+    with open(job.payload["path"], "rb") as spooled:
+        assert spooled.read() == b"\xff\xd8\xff\xe0 image"
+
+    asyncio.run(job_queue.run_job(job))
+
+    result = client.get(f"/api/jobs/{job.id}").json()
+    assert result["status"] == JobStatus.succeeded, result
+    assert result["result"]["description"] == "Later"
+    assert [call["content"] for call in cloudinary_calls] == [b"\xff\xd8\xff\xe0 image"]
+    with pytest.raises(FileNotFoundError):
+        open(job.payload["path"], "rb")
+
+
+def test_background_job_on_missing_image_fails_without_retries(client, owner):
+    response = client.post("/api/qr_code/image_links/?background=true", json={"id": 999999})
+
+    job = job_queue.jobs[response.json()["id"]]
+    asyncio.run(job_queue.run_job(job))
+
+    result = client.get(f"/api/jobs/{job.id}").json()
+    assert (result["status"], result["attempts"], result["error"]) == (JobStatus.failed, 1, "Image not found")
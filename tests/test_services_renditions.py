@@ -0,0 +1,126 @@
+import asyncio
+import base64
+import struct
+import zlib
+from io import BytesIO
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from PIL import Image as PILImage
+
+from main import app
+from src.commands.backfill_renditions import backfill
+from src.entity.models import Image, User
+from src.services.auth_service import auth_service
+from src.services.image_cache_service import image_cache
+from src.services.renditions import RENDITIONS, render_placeholder, rendition_urls
+from src.services.storage_service import storage
+from tests.conftest import AsyncTestingSessionLocal, TestingSessionLocal
+
+
+def make_photo(size=(1200, 800)) -> bytes:
+    output = BytesIO()
+    PILImage.new("RGB", size, (30, 90, 160)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+def make_bomb(side: int = 20000) -> bytes:
+    """
+    A valid black 1-bit PNG whose dimensions are past Pillow's decompression bomb limit, under 50 KB encoded.
+    """
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = zlib.compress(bytes(side // 8 + 1) * side, 9)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", side, side, 1, 0, 0, 0, 0))
+            + chunk(b"IDAT", rows) + chunk(b"IEND", b""))
+
+
+def test_placeholder_is_a_tiny_preview():
+    placeholder = render_placeholder(BytesIO(make_photo()))
+    prefix, data = placeholder.split(",")
+    preview = PILImage.open(BytesIO(base64.b64decode(data)))
+
+    assert prefix == "data:image/webp;base64"
+    assert len(placeholder) < 500
+    assert (preview.format, preview.size) == ("WEBP", (16, 11))
+    assert render_placeholder(BytesIO(b"\xff\xd8\xff\xe0 not really a jpeg")) is None
+
+
+def test_placeholder_refuses_decompression_bombs():
+    assert render_placeholder(BytesIO(make_bomb())) is None
+
+
+def test_renditions_scale_after_the_transformation():
+    urls = rendition_urls("photo_share/cat", [{"effect": "grayscale"}])
+    assert list(urls) == list(RENDITIONS)
+    assert urls["thumbnail"] == storage.url("photo_share/cat",
+                                            transformation=[{"effect": "grayscale"}, {"width": 320, "crop": "limit"}])
+
+
+@pytest.fixture(scope="module")
+def photographer(client):
+    with TestingSessionLocal() as session:
+        user = User(username="lens", email="lens@gmail.com", password="secret", confirmed=True, role="user")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    yield user
+    del app.dependency_overrides[auth_service.get_current_user]
+
+
+def test_upload_returns_renditions_and_placeholder(client, photographer):
+    uploaded = client.post("/api/images/upload?description=harbour",
+                           files={"file": ("harbour.jpg", make_photo(), "image/jpeg")})
+    listed = client.get(f"/api/images/{uploaded.json()['id']}")
+
+    assert uploaded.status_code == 201, uploaded.text
+    assert uploaded.json()["placeholder"].startswith("data:image/webp;base64,")
+    assert uploaded.json()["renditions"] == rendition_urls(uploaded.json()["public_id"])
+    assert "c_limit,w_320" in uploaded.json()["renditions"]["thumbnail"]
+    assert {key: listed.json()[key] for key in ("renditions", "placeholder")} == \
+           {key: uploaded.json()[key] for key in ("renditions", "placeholder")}
+
+
+def test_backfill_fills_in_existing_images(client, photographer):
+    with TestingSessionLocal() as session:
+        original = Image(url="http://old/1", public_id="photo_share/old", description="old", user_id=photographer.id)
+        copy = Image(url="http://old/1", public_id="photo_share/old", description="copy", user_id=photographer.id)
+        derived = Image(url="http://old/1/gray", public_id="photo_share/old", description="gray",
+                        user_id=photographer.id, transformation=[{"effect": "grayscale"}])
+        session.add_all([original, copy, derived])
+        session.commit()
+        ids = [original.id, copy.id, derived.id]
+
+    with (patch.object(storage, "get", AsyncMock(return_value=make_photo())) as get,
+          patch.object(image_cache, "invalidate", AsyncMock()) as invalidate):
+        updated = asyncio.run(backfill(AsyncTestingSessionLocal, batch_size=2))
+        again = asyncio.run(backfill(AsyncTestingSessionLocal, batch_size=2))
+
+    assert (updated, again) == (3, 0)
+    assert get.await_count == 1
+    assert sorted(image_id for call in invalidate.await_args_list for image_id in call.args) == sorted(ids)
+    with TestingSessionLocal() as session:
+        original, copy, derived = [session.get(Image, image_id) for image_id in ids]
+        assert original.renditions == rendition_urls("photo_share/old")
+        assert derived.renditions == rendition_urls("photo_share/old", [{"effect": "grayscale"}])
+        assert original.placeholder.startswith("data:image/webp") and copy.placeholder == original.placeholder
+        assert derived.placeholder is None
+
+
+def test_oversized_uploads_are_stored_without_placeholder(client, photographer):
+    bomb = make_bomb()
+    single = client.post("/api/images/upload?description=bomb", files={"file": ("bomb.png", bomb, "image/png")})
+    bulk = client.post("/api/images/upload/bulk", files=[("files", ("bomb.png", bomb, "image/png")),
+                                                         ("files", ("harbour.jpg", make_photo((640, 480)),
+                                                                    "image/jpeg"))])
+
+    assert single.status_code == 201, single.text
+    assert single.json()["placeholder"] is None
+    assert bulk.status_code == 200, bulk.text
+    assert [item["status_code"] for item in bulk.json()] == [200, 201]
+    assert bulk.json()[0]["image"]["id"] == single.json()["id"]
+    assert bulk.json()[1]["image"]["placeholder"].startswith("data:image/webp;base64,")
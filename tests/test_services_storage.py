@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from main import app
+from src.services.storage_service import LocalStorage, get_storage, transformation_to_string
+from src.utils.file_response import RangeFileResponse, parse_range
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    return LocalStorage(str(tmp_path), "/api/storage")
+
+
+@pytest.fixture
+def storage_client(local_storage):
+    app.dependency_overrides[get_storage] = lambda: local_storage
+    yield TestClient(app)
+    del app.dependency_overrides[get_storage]
+
+
+@pytest.mark.asyncio
+async def test_put_get_delete(local_storage):
+    stored = await local_storage.put(PNG, "photo_share/a b")
+
+    assert stored.url == f"/api/storage/photo_share/a%20b?v={stored.version}"
+    assert await local_storage.get("photo_share/a b") == PNG
+
+    await local_storage.delete("photo_share/a b")
+    with pytest.raises(HTTPException) as exc:
+        await local_storage.get("photo_share/a b")
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_put_refuses_to_overwrite(local_storage):
+    await local_storage.put(b"first", "avatars/user")
+    with pytest.raises(HTTPException) as exc:
+        await local_storage.put(b"second", "avatars/user")
+    assert exc.value.status_code == 409
+
+    await local_storage.put(b"second", "avatars/user", overwrite=True)
+    assert await local_storage.get("avatars/user") == b"second"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_overwrites_of_one_path(local_storage):
+    contents = [bytes([i]) * 4096 for i in range(8)]
+    await asyncio.gather(*(local_storage.put(content, "photo_share/cat", overwrite=True) for content in contents))
+
+    assert await local_storage.get("photo_share/cat") in contents
+    assert [file.name for file in local_storage.path("photo_share/cat").parent.iterdir()] == ["cat"]
+
+
+def test_path_stays_inside_root(local_storage):
+    with pytest.raises(HTTPException):
+        local_storage.path("../outside")
+
+
+def test_transformation_to_string_is_canonical():
+    assert transformation_to_string({"width": 300, "crop": "pad"}) == "c_pad,w_300"
+    assert transformation_to_string({"crop": "pad", "width": 300}) == "c_pad,w_300"
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=90-500", (90, 99)),
+    ("bytes=0-1,5-6", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.asyncio
+async def test_serve_whole_file(local_storage, storage_client):
+    await local_storage.put(PNG, "photo_share/image")
+
+    response = storage_client.get("/api/storage/photo_share/image")
+
+    assert response.status_code == 200
+    assert response.content == PNG
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+@pytest.mark.asyncio
+async def test_serve_range(local_storage, storage_client):
+    await local_storage.put(PNG, "photo_share/image")
+
+    response = storage_client.get("/api/storage/photo_share/image", headers={"Range": "bytes=8-15"})
+
+    assert response.status_code == 206
+    assert response.content == PNG[8:16]
+    assert response.headers["content-range"] == f"bytes 8-15/{len(PNG)}"
+
+
+@pytest.mark.asyncio
+async def test_serve_unsatisfiable_range(local_storage, storage_client):
+    await local_storage.put(PNG, "photo_share/image")
+
+    response = storage_client.get("/api/storage/photo_share/image", headers={"Range": f"bytes={len(PNG)}-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(PNG)}"
+
+
+def test_serve_missing_file(storage_client):
+    assert storage_client.get("/api/storage/photo_share/missing").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_zero_copy_send(local_storage):
+    await local_storage.put(PNG, "photo_share/image")
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    response = RangeFileResponse(local_storage.path("photo_share/image"), range_header="bytes=4-")
+    scope = {"type": "http", "method": "GET", "extensions": {"http.response.zerocopysend": {}}}
+    await response(scope, None, send)
+
+    assert messages[0]["status"] == 206
+    assert messages[1]["type"] == "http.response.zerocopysend"
+    assert (messages[1]["offset"], messages[1]["count"]) == (4, len(PNG) - 4)
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from main import app
+from src.entity.models import User
+from src.services.auth_service import auth_service
+from src.services.upload_session_service import UploadSessions, upload_sessions
+from tests.conftest import TestingSessionLocal
+
+
+PHOTO = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 40
+
+
+async def stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    return UploadSessions(str(tmp_path), ttl=60, max_size=len(PHOTO))
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_assembled_in_order(sessions):
+    session = await sessions.create(user_id=1, size=len(PHOTO), description="chunked")
+
+    session = await sessions.append(session, 0, stream(PHOTO[:10], PHOTO[10:4000]))
+    with pytest.raises(HTTPException) as stale:
+        await sessions.append(session, 0, stream(PHOTO[:10]))
+    session = await sessions.append(session, 4000, stream(PHOTO[4000:]))
+    upload = await sessions.open(await sessions.get(session.id, user_id=1))
+
+    assert stale.value.status_code == 409
+    assert (upload.media_type, upload.size, upload.sha256) == ("image/jpeg", len(PHOTO),
+                                                               hashlib.sha256(PHOTO).hexdigest())
+    assert upload.file.read() == PHOTO
+    upload.close()
+
+
+@pytest.mark.asyncio
+async def test_invalid_sessions_and_chunks_are_refused(sessions):
+    with pytest.raises(HTTPException) as too_large:
+        await sessions.create(user_id=1, size=len(PHOTO) + 1, description=None)
+    session = await sessions.create(user_id=1, size=100, description=None)
+    with pytest.raises(HTTPException) as past_end:
+        await sessions.append(session, 0, stream(PHOTO[:101]))
+    with pytest.raises(HTTPException) as other_user:
+        await sessions.get(session.id, user_id=2)
+    with pytest.raises(HTTPException) as incomplete:
+        await sessions.open(await sessions.get(session.id, user_id=1))
+    text = await sessions.create(user_id=1, size=100, description=None)
+    with pytest.raises(HTTPException) as not_an_image:
+        await sessions.append(text, 0, stream(b"plain text, ", b"not an image"))
+    with pytest.raises(HTTPException) as removed:
+        await sessions.get(text.id, user_id=1)
+
+    errors = (too_large, past_end, other_user, incomplete, not_an_image, removed)
+    assert [err.value.status_code for err in errors] == [413, 413, 404, 409, 415, 404]
+
+
+@pytest.mark.asyncio
+async def test_abandoned_sessions_are_cleaned_up(sessions, tmp_path):
+    abandoned = await sessions.create(user_id=1, size=len(PHOTO), description=None)
+    active = await sessions.create(user_id=1, size=len(PHOTO), description=None)
+    abandoned = await sessions.append(abandoned, 0, stream(PHOTO[:100]))
+    abandoned.updated_at = time.time() - 120
+    sessions._save(abandoned)
+    os.utime(tmp_path / abandoned.id / "data", (abandoned.updated_at, abandoned.updated_at))
+
+    assert await sessions.cleanup() == 1
+    assert sorted(os.listdir(tmp_path)) == [active.id]
+
+
+@pytest.fixture(scope="module")
+def uploader(client):
+    with TestingSessionLocal() as session:
+        user = User(username="mobile", email="mobile@gmail.com", password="secret", confirmed=True, role="user")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+
+    app.dependency_overrides[auth_service.get_current_user] = lambda: user
+    yield user
+    del app.dependency_overrides[auth_service.get_current_user]
+
+
+def test_resumable_upload_is_finalized_into_an_image(client, uploader, cloudinary_calls, tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_sessions, "root", tmp_path)
+
+    created = client.post("/api/images/uploads", json={"size": len(PHOTO), "description": "from the train"})
+    upload_id = created.json()["id"]
+    first = client.put(f"/api/images/uploads/{upload_id}?offset=0", content=PHOTO[:6000])
+    resumed = client.get(f"/api/images/uploads/{upload_id}")
+    early = client.post(f"/api/images/uploads/{upload_id}/finalize")
+    last = client.put(f"/api/images/uploads/{upload_id}?offset={resumed.json()['offset']}", content=PHOTO[6000:])
+    image = client.post(f"/api/images/uploads/{upload_id}/finalize")
+
+    assert created.status_code == 201 and created.headers["location"] == f"/api/images/uploads/{upload_id}"
+    assert (first.json()["offset"], resumed.headers["upload-offset"]) == (6000, "6000")
+    assert early.status_code == 409
+    assert last.json()["offset"] == len(PHOTO)
+    assert image.status_code == 201, image.text
+    assert image.json()["description"] == "from the train"
+    assert [call["content"] for call in cloudinary_calls] == [PHOTO]
+    assert os.listdir(tmp_path) == []
+    assert client.get(f"/api/images/uploads/{upload_id}").status_code == 404
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.utils.bounded_executor import BoundedExecutor
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_off_the_loop():
+    executor = BoundedExecutor(max_workers=1)
+
+    result = await executor.run(lambda value: (value, threading.get_ident()), 42)
+
+    assert result[0] == 42
+    assert result[1] != threading.get_ident()
+    assert executor.completed == 1
+    assert executor.running == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_caps_concurrency_and_records_queue_depth():
+    executor = BoundedExecutor(max_workers=2)
+    release = threading.Event()
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        release.wait(5)
+        with lock:
+            active.pop()
+
+    tasks = [asyncio.create_task(executor.run(work)) for _ in range(5)]
+    await asyncio.sleep(0.05)
+    assert executor.running == 2
+    assert executor.queued == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert max(peak) == 2
+    assert executor.peak_queued == 3
+    assert executor.queued == 0
+    snapshot = executor.snapshot()
+    assert snapshot["completed"] == 5
+    assert snapshot["wait_time"]["count"] == 5
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_errors_and_frees_the_slot():
+    executor = BoundedExecutor(max_workers=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await executor.run(fail)
+    assert await executor.run(lambda: "ok") == "ok"
+    assert executor.running == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_the_slot_until_the_call_ends():
+    executor = BoundedExecutor(max_workers=1)
+    release = threading.Event()
+
+    caller = asyncio.create_task(executor.run(release.wait, 5))
+    await asyncio.sleep(0.05)
+    caller.cancel()
+    await asyncio.sleep(0.05)
+    waiting = asyncio.create_task(executor.run(lambda: "next"))
+    await asyncio.sleep(0.05)
+
+    assert caller.cancelled()
+    assert executor.running == 1 and executor.queued == 1 and not waiting.done()
+    release.set()
+    assert await waiting == "next"
+    assert executor.running == 0
+    executor.shutdown()
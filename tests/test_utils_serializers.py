@@ -0,0 +1,38 @@
+import json
+from typing import List
+
+import orjson
+import pytest
+from pydantic import BaseModel, TypeAdapter
+
+from src.entity.models import Comment, Image, Tag
+from src.schemas.photo_schemas import ImageAllResponse
+from src.schemas.tag_schemas import TagResponse
+from src.utils.serializers import compile_serializer
+
+
+def make_image(image_id: int) -> Image:
+    return Image(id=image_id, user_id=3, url=f"http://img/{image_id}", description="harbour at dusk", qr_url=None,
+                 renditions={"thumbnail": f"http://img/{image_id}?t=c_limit,w_320"}, placeholder="data:image/webp",
+                 tags=[Tag(id=1, tag_name="sea"), Tag(id=2, tag_name="dusk")],
+                 comment_count=1, recent_comments=[Comment(id=image_id * 10, user_id=4, comment="lovely")])
+
+
+def test_matches_pydantic_serialization():
+    rows = [make_image(1), make_image(2)]
+    rows[1].recent_comments = []
+
+    compiled = orjson.dumps([compile_serializer(ImageAllResponse)(row) for row in rows])
+    expected = TypeAdapter(List[ImageAllResponse]).dump_json(
+        TypeAdapter(List[ImageAllResponse]).validate_python(rows, from_attributes=True))
+
+    assert json.loads(compiled) == json.loads(expected)
+    assert orjson.dumps(compile_serializer(TagResponse)(Tag(id=7, tag_name="sea"))) == b'{"tag_name":"sea","id":7}'
+
+
+def test_unplannable_fields_are_refused():
+    class Ambiguous(BaseModel):
+        value: int | str
+
+    with pytest.raises(TypeError):
+        compile_serializer(Ambiguous)
@@ -0,0 +1,93 @@
+import hashlib
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.utils.upload_stream import receive_upload, receive_uploads
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 24
+
+
+@pytest.fixture(scope="module")
+def upload_client():
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        upload = await receive_upload(request, "file", max_size=4096, spool_threshold=1024)
+        try:
+            return {"filename": upload.filename, "media_type": upload.media_type, "size": upload.size,
+                    "sha256": upload.sha256, "on_disk": upload.file._rolled, "content": upload.file.read().hex()}
+        finally:
+            upload.close()
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("size", [len(PNG), 3000])
+def test_upload_is_hashed_and_spooled(upload_client, size):
+    content = PNG + b"\x01" * (size - len(PNG))
+
+    response = upload_client.post("/upload", data={"note": "ignored"},
+                                  files={"file": ("photo.png", content, "application/octet-stream")})
+
+    assert response.status_code == 200, response.text
+    assert response.json() == {"filename": "photo.png", "media_type": "image/png", "size": size,
+                               "sha256": hashlib.sha256(content).hexdigest(), "on_disk": size > 1024,
+                               "content": content.hex()}
+
+
+def test_type_is_checked_on_content_not_name(upload_client):
+    response = upload_client.post("/upload", files={"file": ("photo.png", b"#!/bin/sh\nrm -rf /\n", "image/png")})
+    assert response.status_code == 415
+
+
+def test_oversized_upload_is_refused(upload_client):
+    body = PNG + b"\x01" * 5000
+    response = upload_client.post("/upload", files={"file": ("photo.png", body, "image/png")})
+    assert response.status_code == 413
+
+
+def test_oversized_upload_without_length_is_refused_while_streaming(upload_client):
+    boundary = "limit"
+    head = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.png\"\r\n\r\n").encode()
+
+    def body():
+        yield head + PNG
+        for _ in range(10):
+            yield b"\x01" * 1000
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = upload_client.post("/upload", content=body(),
+                                  headers={"content-type": f"multipart/form-data; boundary={boundary}"})
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("kwargs, status_code", [
+    ({"data": {"file": "not a file"}, "files": {"other": ("photo.png", PNG)}}, 422),
+    ({"json": {"file": "not a file"}}, 400),
+    ({"content": b"--x\r\nbroken", "headers": {"content-type": "multipart/form-data; boundary=y"}}, 400),
+])
+def test_malformed_requests(upload_client, kwargs, status_code):
+    assert upload_client.post("/upload", **kwargs).status_code == status_code
+
+
+def test_rejected_files_are_reported_next_to_accepted_ones():
+    app = FastAPI()
+
+    @app.post("/bulk")
+    async def bulk(request: Request):
+        uploads = await receive_uploads(request, "files", max_files=3, max_size=64, spool_threshold=1024)
+        return [{"filename": upload.filename, "status_code": getattr(upload, "status_code", 200)}
+                for upload in uploads]
+
+    response = TestClient(app).post("/bulk", files=[
+        ("files", ("a.png", PNG, "image/png")),
+        ("files", ("big.png", PNG * 3, "image/png")),
+        ("files", ("short.txt", b"hi", "text/plain")),
+    ])
+
+    assert response.json() == [{"filename": "a.png", "status_code": 200}, {"filename": "big.png", "status_code": 413},
+                               {"filename": "short.txt", "status_code": 415}]